@@ -0,0 +1,280 @@
+import numpy as np
+
+from agents.rl_agent import STATE_DIMS, N_STATES, REWARD_WEIGHTS, MASK_THRESHOLDS, merge_defaults
+
+
+class BatchRLAgent:
+    """
+    RLAgent for N parallel environments in one vectorized call.
+
+    Q is a dense array indexed by the encoded state id (see
+    agents.rl_agent.encode_state):
+
+    - per-env mode (shared_q=False): Q[N, N_STATES, A], one table per
+      environment. Row i makes exactly the decisions a scalar RLAgent
+      makes when both see the same uniforms (see sim.rng.UniformStream).
+    - shared mode (shared_q=True): Q[1, N_STATES, A], one table for all
+      environments. TD errors are computed against the pre-step table
+      and summed per (state, action), i.e. a synchronous batch update.
+
+    Every act() consumes two uniforms per environment, in RLAgent order:
+    the epsilon test, then the choice among allowed (or tied) actions.
+    """
+
+    def __init__(
+        self,
+        n_envs,
+        base_rtt,
+        actions=(-2, -1, 0, 1, 2),
+        alpha=0.1,
+        gamma=0.9,
+        epsilon=0.2,
+        epsilon_min=0.02,
+        epsilon_decay=0.995,
+        osc_penalty=0.2,
+        best_thr_ema_alpha=0.05,
+        shared_q=False,
+        rng=None,
+        reward_weights=None,
+        mask_thresholds=None,
+    ):
+        if 0 not in actions:
+            raise ValueError("actions must include 0 (fallback when masking leaves none)")
+
+        n = n_envs
+        self.n_envs = n
+        self.base_rtt = np.broadcast_to(np.asarray(base_rtt, dtype=np.float64), (n,)).copy()
+        self.actions = np.asarray(actions, dtype=np.int64)
+        self._zero_action = list(actions).index(0)
+
+        self.alpha = alpha
+        self.gamma = gamma
+
+        self.epsilon = np.full(n, float(epsilon))
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+
+        self.osc_penalty = osc_penalty
+        self.best_thr_ema_alpha = best_thr_ema_alpha
+        self.reward_weights = merge_defaults(REWARD_WEIGHTS, reward_weights, "reward weights")
+        self.mask_thresholds = merge_defaults(MASK_THRESHOLDS, mask_thresholds, "mask thresholds")
+
+        self.avg_thr = np.zeros(n)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        self.shared_q = shared_q
+        self.Q = np.zeros((1 if shared_q else n, N_STATES, len(actions)))
+        self._q_rows = np.zeros(n, dtype=np.int64) if shared_q else np.arange(n)
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # sender-side memory (prev_state == -1: no previous step)
+        self.prev_state = np.full(n, -1, dtype=np.int64)
+        self.prev_action = np.zeros(n, dtype=np.int64)        # index into actions
+        self.prev_obs = None
+        self.prev_send_rate = None
+
+        self.best_thr_ema = np.zeros(n)
+
+        self.recent_loss = np.zeros(n)
+        self.recent_loss_decay = 0.9
+
+    # --------------------------------------------------
+    # State discretization
+    # --------------------------------------------------
+
+    def _get_state(self, obs):
+        thr = obs["throughput"]
+        rate = obs["send_rate"]
+        loss = obs["loss"]
+        avg_rtt = obs["avg_rtt"]
+
+        ratio = (avg_rtt - self.base_rtt) / self.base_rtt
+        rtt = np.select(
+            [avg_rtt <= 0, ratio < 0.1, ratio < 0.4, ratio < 0.8],
+            [0, 1, 2, 3],
+            4,
+        )
+
+        eff_ratio = thr / np.maximum(rate, 1)
+        eff = np.select([eff_ratio >= 0.7, eff_ratio >= 0.4], [0, 1], 2)
+
+        if self.prev_send_rate is None:
+            trend = np.zeros(self.n_envs, dtype=np.int64)
+        else:
+            trend = np.select([rate > self.prev_send_rate, rate < self.prev_send_rate], [1, 2], 0)
+
+        delivery_ratio = thr / np.maximum(thr + loss, 1)
+        delivery = np.select([delivery_ratio >= 0.6, delivery_ratio >= 0.3], [0, 1], 2)
+
+        recent = (self.recent_loss > 0.2).astype(np.int64)
+
+        d = STATE_DIMS
+        return (((rtt * d[1] + eff) * d[2] + trend) * d[3] + delivery) * d[4] + recent
+
+    # --------------------------------------------------
+    # Reward
+    # --------------------------------------------------
+
+    def _compute_reward(self, obs):
+        p = self.prev_obs
+        c = obs
+        w = self.reward_weights
+
+        eff_p = p["throughput"] / np.maximum(p["send_rate"], 1)
+        eff_c = c["throughput"] / np.maximum(c["send_rate"], 1)
+        d_eff = eff_c - eff_p
+
+        both_rtt = (p["avg_rtt"] > 0) & (c["avg_rtt"] > 0)
+        d_rtt = np.where(both_rtt, (c["avg_rtt"] - p["avg_rtt"]) / self.base_rtt, 0.0)
+
+        del_p = p["throughput"] / np.maximum(p["throughput"] + p["loss"], 1)
+        del_c = c["throughput"] / np.maximum(c["throughput"] + c["loss"], 1)
+        d_del = del_c - del_p
+
+        reward = (
+            + w["efficiency"] * d_eff
+            + w["delivery"] * d_del
+            - w["rtt"] * d_rtt
+        )
+
+        greedy = self.epsilon == 0
+        rate_c = c["send_rate"]
+        d_rate = rate_c - p["send_rate"]
+        reward = np.select(
+            [
+                greedy & (rate_c >= 1.2 * self.avg_thr) & (c["loss"] == 0) & (p["loss"] == 0),
+                greedy & (rate_c <= 0.75 * self.avg_thr),
+                greedy & (rate_c >= 1.5 * self.avg_thr),
+            ],
+            [
+                reward - 2.0 * np.abs(d_rate),
+                reward + 0.5 * d_rate,
+                reward - 1.0 * np.abs(d_rate),
+            ],
+            reward,
+        )
+
+        reward = reward - self.osc_penalty * np.abs(self.actions[self.prev_action])
+
+        reward = np.where(del_c < 0.3, reward - w["low_delivery"] * (0.3 - del_c), reward)
+
+        loss_ratio = c["loss"] / np.maximum(rate_c, 1)
+        safe = (loss_ratio < 0.05) & (d_rtt <= 0.05) & (self.best_thr_ema > 0)
+        thr_ratio = c["throughput"] / np.maximum(self.best_thr_ema, 1e-6)
+        reward = np.select(
+            [safe & (thr_ratio < 0.85), safe & (thr_ratio > 0.95)],
+            [reward - w["anchor"] * (0.85 - thr_ratio), reward + w["anchor"] * (thr_ratio - 0.95)],
+            reward,
+        )
+
+        return reward
+
+    # --------------------------------------------------
+    # Action masking
+    # --------------------------------------------------
+
+    def _allowed_actions(self, send_rate, loss_ratio):
+        a = self.actions[None, :]
+        rate = send_rate[:, None]
+        lr = loss_ratio[:, None]
+        best = self.best_thr_ema[:, None]
+        greedy = (self.epsilon == 0)[:, None]
+        m = self.mask_thresholds
+
+        starved = (rate <= m["ramp"] * best) & (lr <= m["loss"])
+        very_starved = starved & greedy & (rate <= m["ramp_greedy"] * best)
+        heavy_loss = ~starved & (lr > m["heavy_loss"])
+        some_loss = ~starved & ~heavy_loss & (lr > m["loss"])
+        overshoot = ~starved & ~heavy_loss & ~some_loss & (rate >= m["overshoot"] * best) & greedy
+
+        allowed = np.ones((self.n_envs, len(self.actions)), dtype=bool)
+        allowed &= ~starved | (a >= 0)
+        allowed &= ~very_starved | (a > 0)
+        allowed &= ~heavy_loss | (a <= 0)
+        allowed &= ~some_loss | (a <= 1)
+        allowed &= ~overshoot | (a < 0)
+
+        empty = ~allowed.any(axis=1)
+        allowed[empty, self._zero_action] = True
+        return allowed
+
+    @staticmethod
+    def _pick(mask, u):
+        """
+        Index of the int(u * count)-th True entry of each row of mask.
+        """
+        count = mask.sum(axis=1)
+        k = (u * count).astype(np.int64)
+        return np.argmax(np.cumsum(mask, axis=1) > k[:, None], axis=1)
+
+    # --------------------------------------------------
+    # Core RL
+    # --------------------------------------------------
+
+    def act(self, observation, uniforms=None):
+        """
+        observation: dict of per-environment arrays (throughput,
+        avg_rtt, loss, send_rate), e.g. BatchEnvironment.step output.
+        uniforms: optional [N, 2] array in [0, 1); drawn from self.rng
+        when omitted.
+
+        Returns an int array of rate deltas.
+        """
+        obs = {
+            key: np.asarray(observation[key])
+            for key in ("throughput", "avg_rtt", "loss", "send_rate")
+        }
+        if uniforms is None:
+            uniforms = self.rng.random((self.n_envs, 2))
+
+        state = self._get_state(obs)
+        rows = self._q_rows
+        q_state = self.Q[rows, state]                           # [N, A]
+
+        if self.prev_obs is not None:
+            r = self._compute_reward(obs)
+            best_next = q_state.max(axis=1)
+            old = self.Q[rows, self.prev_state, self.prev_action]
+            td = self.alpha * (r + self.gamma * best_next - old)
+            if self.shared_q:
+                np.add.at(self.Q, (rows, self.prev_state, self.prev_action), td)
+            else:
+                self.Q[rows, self.prev_state, self.prev_action] = old + td
+            q_state = self.Q[rows, state]
+
+        thr = obs["throughput"]
+        self.best_thr_ema = np.maximum(
+            self.best_thr_ema,
+            (1 - self.best_thr_ema_alpha) * self.best_thr_ema
+            + self.best_thr_ema_alpha * thr,
+        )
+
+        send_rate = obs["send_rate"]
+        loss_ratio = obs["loss"] / np.maximum(send_rate, 1)
+        allowed = self._allowed_actions(send_rate, loss_ratio)
+
+        explore = uniforms[:, 0] < self.epsilon
+        best_q = np.where(allowed, q_state, -np.inf).max(axis=1)
+        ties = allowed & (q_state == best_q[:, None])
+        choice_mask = np.where(explore[:, None], allowed, ties)
+        action_idx = self._pick(choice_mask, uniforms[:, 1])
+
+        self.epsilon = np.where(
+            self.epsilon > self.epsilon_min,
+            np.maximum(self.epsilon_min, self.epsilon * self.epsilon_decay),
+            0.0,
+        )
+
+        # -------- update avg throughput --------
+        self.avg_thr = (self.steps * self.avg_thr + thr) / (self.steps + 1)
+        self.steps += 1
+
+        self.recent_loss = np.where(obs["loss"] > 0, 1.0, self.recent_loss * self.recent_loss_decay)
+
+        self.prev_state = state
+        self.prev_action = action_idx
+        self.prev_obs = obs
+        self.prev_send_rate = send_rate
+
+        return self.actions[action_idx]
@@ -0,0 +1,164 @@
+from array import array
+
+from agents.base_agent import BaseAgent
+from agents.rl_agent import STATE_DIMS, N_STATES, MASK_THRESHOLDS, encode_state, merge_defaults
+
+
+# Action-masking regimes of RLAgent.act at epsilon == 0
+# (thresholds from agents.rl_agent.MASK_THRESHOLDS)
+REGIME_RAMP = 0         # well below best throughput, little loss: a > 0
+REGIME_RECOVER = 1      # below best throughput, little loss: a >= 0
+REGIME_HEAVY_LOSS = 2   # heavy loss: a <= 0
+REGIME_LOSS = 3         # some loss: a <= 1
+REGIME_OVERSHOOT = 4    # rate well above best throughput: a < 0
+REGIME_FREE = 5         # no mask
+N_REGIMES = 6
+
+
+def masking_regime(send_rate, loss_ratio, best_thr_ema, thresholds=MASK_THRESHOLDS):
+    """
+    RLAgent.act's action mask at epsilon == 0, as a regime id.
+    """
+    m = thresholds
+    if send_rate <= m["ramp"] * best_thr_ema and loss_ratio <= m["loss"]:
+        if send_rate <= m["ramp_greedy"] * best_thr_ema:
+            return REGIME_RAMP
+        return REGIME_RECOVER
+    if loss_ratio > m["heavy_loss"]:
+        return REGIME_HEAVY_LOSS
+    if loss_ratio > m["loss"]:
+        return REGIME_LOSS
+    if send_rate >= m["overshoot"] * best_thr_ema:
+        return REGIME_OVERSHOOT
+    return REGIME_FREE
+
+
+def regime_actions(actions, regime):
+    """
+    Actions RLAgent allows in a regime ([0] if the mask removes all).
+    """
+    keep = {
+        REGIME_RAMP: lambda a: a > 0,
+        REGIME_RECOVER: lambda a: a >= 0,
+        REGIME_HEAVY_LOSS: lambda a: a <= 0,
+        REGIME_LOSS: lambda a: a <= 1,
+        REGIME_OVERSHOOT: lambda a: a < 0,
+        REGIME_FREE: lambda a: True,
+    }[regime]
+    return [a for a in actions if keep(a)] or [0]
+
+
+def _state_tuples():
+    for rtt in range(STATE_DIMS[0]):
+        for eff in range(STATE_DIMS[1]):
+            for trend in range(STATE_DIMS[2]):
+                for delivery in range(STATE_DIMS[3]):
+                    for recent in range(STATE_DIMS[4]):
+                        yield (rtt, eff, trend, delivery, recent)
+
+
+class FrozenPolicy(BaseAgent):
+    """
+    Inference-only export of an RLAgent (see RLAgent.freeze).
+
+    table[state_id * N_REGIMES + regime] holds the greedy action for
+    every discretized state and masking regime, precomputed from Q.
+    act() repeats RLAgent's discretization with scalar arithmetic and
+    answers with one index into the table: no Q updates, rewards,
+    lists or random draws. It behaves like the agent with learn=False
+    and epsilon=0, except that ties between equal Q values are broken
+    deterministically (smallest |action|, then lowest) instead of at
+    random. States never visited by the agent count as all-zero rows.
+
+    Runtime memory (best throughput EMA, recent-loss trace, previous
+    send rate) starts from the agent's values at export; reset()
+    clears it for a fresh connection.
+    """
+
+    def __init__(self, table, base_rtt, best_thr_ema_alpha=0.05, recent_loss_decay=0.9, mask_thresholds=None):
+        if len(table) != N_STATES * N_REGIMES:
+            raise ValueError(f"table must have {N_STATES * N_REGIMES} entries, got {len(table)}")
+        self.table = table if isinstance(table, array) else array("i", table)
+        self.base_rtt = base_rtt
+        self.best_thr_ema_alpha = best_thr_ema_alpha
+        self.recent_loss_decay = recent_loss_decay
+
+        self.mask_thresholds = merge_defaults(MASK_THRESHOLDS, mask_thresholds, "mask thresholds")
+        m = self.mask_thresholds
+        self._ramp, self._ramp_greedy = m["ramp"], m["ramp_greedy"]
+        self._heavy_loss, self._loss, self._overshoot = m["heavy_loss"], m["loss"], m["overshoot"]
+        self.reset()
+
+    def reset(self):
+        self.best_thr_ema = 0.0
+        self.recent_loss = 0.0
+        self.prev_send_rate = None
+
+    @classmethod
+    def from_q(cls, Q, actions, base_rtt, **kwargs):
+        """
+        Build the table from an RLAgent-style Q ({state tuple: {action: value}}).
+        """
+        zero = dict.fromkeys(actions, 0.0)
+        table = array("i", bytes(4 * N_STATES * N_REGIMES))
+        for state in _state_tuples():
+            q = Q.get(state, zero)
+            base = encode_state(state) * N_REGIMES
+            for regime in range(N_REGIMES):
+                allowed = regime_actions(actions, regime)
+                table[base + regime] = max(allowed, key=lambda a: (q.get(a, 0.0), -abs(a), -a))
+        return cls(table, base_rtt, **kwargs)
+
+    # --------------------------------------------------
+    # Inference
+    # --------------------------------------------------
+
+    def act(self, observation):
+        thr = observation["throughput"]
+        send_rate = observation["send_rate"]
+        loss = observation["loss"]
+        avg_rtt = observation["avg_rtt"]
+
+        # state, as RLAgent._get_state
+        if avg_rtt <= 0:
+            s = 0
+        else:
+            ratio = (avg_rtt - self.base_rtt) / self.base_rtt
+            s = 1 if ratio < 0.1 else 2 if ratio < 0.4 else 3 if ratio < 0.8 else 4
+
+        ratio = thr / max(send_rate, 1)
+        s = s * 3 + (0 if ratio >= 0.7 else 1 if ratio >= 0.4 else 2)
+
+        prev = self.prev_send_rate
+        s = s * 3 + (0 if prev is None or send_rate == prev else 1 if send_rate > prev else 2)
+
+        delivery = thr / max(thr + loss, 1)
+        s = s * 3 + (0 if delivery >= 0.6 else 1 if delivery >= 0.3 else 2)
+        s = s * 2 + (1 if self.recent_loss > 0.2 else 0)
+
+        # masking regime, as RLAgent.act at epsilon == 0
+        a = self.best_thr_ema_alpha
+        best = self.best_thr_ema
+        ema = (1 - a) * best + a * thr
+        if ema > best:
+            best = self.best_thr_ema = ema
+
+        loss_ratio = loss / max(send_rate, 1)
+        if send_rate <= self._ramp * best and loss_ratio <= self._loss:
+            regime = REGIME_RAMP if send_rate <= self._ramp_greedy * best else REGIME_RECOVER
+        elif loss_ratio > self._heavy_loss:
+            regime = REGIME_HEAVY_LOSS
+        elif loss_ratio > self._loss:
+            regime = REGIME_LOSS
+        elif send_rate >= self._overshoot * best:
+            regime = REGIME_OVERSHOOT
+        else:
+            regime = REGIME_FREE
+
+        if loss > 0:
+            self.recent_loss = 1.0
+        else:
+            self.recent_loss *= self.recent_loss_decay
+        self.prev_send_rate = send_rate
+
+        return self.table[s * N_REGIMES + regime]
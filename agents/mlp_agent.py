@@ -0,0 +1,306 @@
+import os
+import tempfile
+
+import numpy as np
+
+from agents.base_agent import BaseAgent
+from agents.frozen_policy import (
+    REGIME_RAMP, REGIME_RECOVER, REGIME_HEAVY_LOSS, REGIME_LOSS, REGIME_OVERSHOOT, REGIME_FREE,
+    N_REGIMES, regime_actions,
+)
+from agents.rl_agent import MASK_THRESHOLDS, merge_defaults
+
+
+# Continuous features, all relative to the link (base_rtt, send rate),
+# so one model carries over between links. Clipped to [lo, hi].
+FEATURES = (
+    ("efficiency", 0.0, 1.5),       # throughput / send_rate
+    ("delivery", 0.0, 1.0),         # throughput / (throughput + loss)
+    ("loss_ratio", 0.0, 1.0),       # loss / send_rate
+    ("rtt_inflation", 0.0, 4.0),    # avg_rtt / base_rtt - 1
+    ("rttvar", 0.0, 4.0),           # rttvar / base_rtt
+    ("bdp_fill", 0.0, 4.0),         # in_flight / (send_rate * base_rtt)
+    ("ack_clock", 0.0, 4.0),        # ack_interarrival * send_rate (1 = ACKs keep pace)
+    ("rate_trend", -1.0, 1.0),      # relative send-rate change
+    ("anchor", 0.0, 2.0),           # throughput / best-throughput EMA
+    ("overshoot", 0.0, 4.0),        # send_rate / best-throughput EMA
+)
+N_FEATURES = len(FEATURES)
+_LO = np.array([lo for _, lo, _ in FEATURES])
+_HI = np.array([hi for _, _, hi in FEATURES])
+
+# Reward: throughput against the best-throughput EMA, minus loss,
+# queueing and sending above the best throughput
+REWARD_WEIGHTS = {
+    "throughput": 1.0,
+    "loss": 2.0,
+    "rtt": 0.5,
+    "overshoot": 1.0,
+}
+
+
+class MLPAgent(BaseAgent):
+    """
+    Q-learning with function approximation over continuous features.
+
+    Q(x, .) is a one-hidden-layer tanh network (hidden=0: linear),
+    x the FEATURES of an observation, including the Sender's rttvar,
+    in_flight and ack_interarrival metrics. Parameters are shared by
+    n_envs environments: act_batch() takes the per-environment arrays
+    of BatchEnvironment.step and runs one forward pass (and one
+    semi-gradient TD update, averaged over environments) for all of
+    them. act() is the n_envs=1 case on a scalar observation.
+
+    Rewards are computed per step as
+      w_thr * thr / best - w_loss * loss_ratio - w_rtt * rtt_inflation
+      - w_overshoot * max(0, send_rate / best - 1)
+    (best: best-throughput EMA)
+    and TD errors are clipped to +-td_clip. Actions (greedy, explored
+    and in the TD target) are restricted by RLAgent's loss-regime mask
+    at epsilon 0 (agents.frozen_policy.masking_regime, with
+    mask_thresholds overriding MASK_THRESHOLDS). learn=False skips the
+    update (inference only); set epsilon=0 for greedy actions.
+
+    rng is a `random`-compatible source, as for the other agents; one
+    draw from it seeds the NumPy Generator used for weight init and
+    exploration (a Generator is also accepted and used directly).
+
+    The model is params (a dict of small float arrays); save() / load()
+    write it with np.savez.
+    """
+
+    def __init__(
+        self,
+        base_rtt,
+        n_envs=1,
+        actions=(-2, -1, 0, 1, 2),
+        hidden=16,
+        lr=0.01,
+        gamma=0.9,
+        epsilon=0.2,
+        epsilon_min=0.02,
+        epsilon_decay=0.995,
+        best_thr_ema_alpha=0.05,
+        td_clip=1.0,
+        rng=None,
+        learn=True,
+        params=None,
+        reward_weights=None,
+        mask_thresholds=None,
+    ):
+        self.n_envs = n_envs
+        self.base_rtt = np.broadcast_to(np.asarray(base_rtt, dtype=np.float64), (n_envs,)).copy()
+        self.actions = np.asarray(actions, dtype=np.int64)
+        self.hidden = hidden
+
+        self.lr = lr
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+        self.best_thr_ema_alpha = best_thr_ema_alpha
+        self.td_clip = td_clip
+        self.learn = learn
+
+        self.reward_weights = merge_defaults(REWARD_WEIGHTS, reward_weights, "reward weights")
+        self.mask_thresholds = merge_defaults(MASK_THRESHOLDS, mask_thresholds, "mask thresholds")
+
+        # allowed[regime, action index]
+        self._allowed = np.array([
+            [a in regime_actions(actions, regime) for a in actions]
+            for regime in range(N_REGIMES)
+        ])
+
+        if rng is None or isinstance(rng, np.random.Generator):
+            self.rng = rng if rng is not None else np.random.default_rng()
+        else:
+            self.rng = np.random.default_rng(int(rng.random() * 2 ** 53))
+        self.params = params if params is not None else self.init_params(hidden, len(actions), self.rng)
+        self.reset()
+
+    @staticmethod
+    def init_params(hidden, n_actions, rng):
+        """
+        Small random weights (W1, b1 only when hidden > 0), zero output bias.
+        """
+        if hidden:
+            return {
+                "W1": rng.normal(0.0, 1.0 / np.sqrt(N_FEATURES), (N_FEATURES, hidden)),
+                "b1": np.zeros(hidden),
+                "W2": rng.normal(0.0, 0.1 / np.sqrt(hidden), (hidden, n_actions)),
+                "b2": np.zeros(n_actions),
+            }
+        return {
+            "W2": np.zeros((N_FEATURES, n_actions)),
+            "b2": np.zeros(n_actions),
+        }
+
+    def reset(self):
+        """
+        Clear per-connection memory (the model is kept).
+        """
+        n = self.n_envs
+        self.prev_x = None
+        self.prev_action = np.zeros(n, dtype=np.int64)      # index into actions
+        self.prev_send_rate = None
+        self.best_thr_ema = np.zeros(n)
+
+    # --------------------------------------------------
+    # Features / network
+    # --------------------------------------------------
+
+    def features(self, obs):
+        """
+        [n_envs, N_FEATURES] feature matrix of per-env metric arrays.
+        """
+        thr = np.asarray(obs["throughput"], dtype=np.float64)
+        rate = np.maximum(np.asarray(obs["send_rate"], dtype=np.float64), 1.0)
+        loss = np.asarray(obs["loss"], dtype=np.float64)
+        avg_rtt = np.asarray(obs["avg_rtt"], dtype=np.float64)
+        base = self.base_rtt
+
+        prev = self.prev_send_rate if self.prev_send_rate is not None else rate
+        x = np.empty((self.n_envs, N_FEATURES))
+        x[:, 0] = thr / rate
+        x[:, 1] = thr / np.maximum(thr + loss, 1.0)
+        x[:, 2] = loss / rate
+        x[:, 3] = np.where(avg_rtt > 0, avg_rtt / base - 1.0, 0.0)
+        x[:, 4] = np.asarray(obs.get("rttvar", 0.0)) / base
+        x[:, 5] = np.asarray(obs.get("in_flight", 0)) / (rate * base)
+        x[:, 6] = np.asarray(obs.get("ack_interarrival", 0.0)) * rate
+        x[:, 7] = (rate - prev) / prev
+        best = self.best_thr_ema
+        x[:, 8] = np.divide(thr, best, out=np.ones(self.n_envs), where=best > 0)
+        x[:, 9] = np.divide(rate, best, out=np.ones(self.n_envs), where=best > 0)
+        np.clip(x, _LO, _HI, out=x)
+
+        self.prev_send_rate = rate
+        return x
+
+    def forward(self, x):
+        """
+        (hidden activations, Q values [len(x), n_actions]).
+        """
+        p = self.params
+        h = np.tanh(x @ p["W1"] + p["b1"]) if self.hidden else x
+        return h, h @ p["W2"] + p["b2"]
+
+    def allowed(self, x):
+        """
+        [len(x), n_actions] action mask from the loss_ratio and
+        overshoot features (masking_regime, vectorized).
+        """
+        m = self.mask_thresholds
+        loss_ratio, over = x[:, 2], x[:, 9]     # over == 1 until a throughput is seen
+        # lowest priority first
+        regime = np.where(over >= m["overshoot"], REGIME_OVERSHOOT, REGIME_FREE)
+        regime = np.where(loss_ratio > m["loss"], REGIME_LOSS, regime)
+        regime = np.where(loss_ratio > m["heavy_loss"], REGIME_HEAVY_LOSS, regime)
+        low = (over <= m["ramp"]) & (loss_ratio <= m["loss"])
+        regime = np.where(low, np.where(over <= m["ramp_greedy"], REGIME_RAMP, REGIME_RECOVER), regime)
+        return self._allowed[regime]
+
+    # --------------------------------------------------
+    # Acting / learning
+    # --------------------------------------------------
+
+    def act_batch(self, obs):
+        """
+        Rate deltas (int array, one per env) for a dict of per-env arrays.
+        """
+        n = self.n_envs
+        x = self.features(obs)
+
+        thr = np.asarray(obs["throughput"], dtype=np.float64)
+        a = self.best_thr_ema_alpha
+        self.best_thr_ema = np.maximum(self.best_thr_ema, (1 - a) * self.best_thr_ema + a * thr)
+
+        allowed = self.allowed(x)
+        if self.learn and self.prev_x is not None:
+            # one pass over previous and current features
+            h, q = self.forward(np.concatenate((self.prev_x, x)))
+            q_next = np.where(allowed, q[n:], -np.inf)
+            self._update(self.prev_x, h[:n], q[:n], self._reward(x), q_next.max(axis=1))
+        else:
+            q_next = np.where(allowed, self.forward(x)[1], -np.inf)
+
+        action = q_next.argmax(axis=1)
+        explore = self.rng.random(n) < self.epsilon
+        if explore.any():
+            # uniform among the allowed actions
+            u = self.rng.random((int(explore.sum()), len(self.actions)))
+            action[explore] = (u * allowed[explore]).argmax(axis=1)
+        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+        self.prev_x = x
+        self.prev_action = action
+        return self.actions[action]
+
+    def act(self, observation):
+        return int(self.act_batch(observation)[0])
+
+    def _reward(self, x):
+        w = self.reward_weights
+        return (
+            w["throughput"] * x[:, 8]
+            - w["loss"] * x[:, 2]
+            - w["rtt"] * x[:, 3]
+            - w["overshoot"] * np.maximum(x[:, 9] - 1.0, 0.0)
+        )
+
+    def _update(self, x, h, q, reward, q_next_max):
+        """
+        Semi-gradient Q-learning step on Q(x, prev_action), averaged over envs.
+        """
+        n = len(x)
+        p = self.params
+        taken = q[np.arange(n), self.prev_action]
+        td = np.clip(reward + self.gamma * q_next_max - taken, -self.td_clip, self.td_clip)
+
+        g = np.zeros_like(q)
+        g[np.arange(n), self.prev_action] = td * (self.lr / n)
+        if self.hidden:
+            dh = (g @ p["W2"].T) * (1 - h * h)
+            p["W1"] += x.T @ dh
+            p["b1"] += dh.sum(axis=0)
+        p["W2"] += h.T @ g
+        p["b2"] += g.sum(axis=0)
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+
+    def save(self, path, dtype="float32"):
+        """
+        Write params, actions and hidden size with np.savez (to a
+        temporary name, renamed into place).
+        """
+        arrays = {k: v.astype(dtype) for k, v in self.params.items()}
+        arrays["actions"] = self.actions
+        arrays["hidden"] = self.hidden
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @classmethod
+    def load(cls, path, base_rtt, **kwargs):
+        """
+        Agent with the params of a file written by save(); keyword
+        arguments go to the constructor. A given actions or hidden must
+        match the file's.
+        """
+        with np.load(path) as data:
+            params = {k: data[k].astype(np.float64) for k in data.files if k not in ("actions", "hidden")}
+            saved = {"actions": tuple(int(a) for a in data["actions"]), "hidden": int(data["hidden"])}
+        for name, value in saved.items():
+            given = kwargs.pop(name, value)
+            if (tuple(given) if name == "actions" else given) != value:
+                raise ValueError(f"{path}: model has {name}={value}, not {given}")
+        return cls(base_rtt, params=params, **saved, **kwargs)
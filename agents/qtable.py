@@ -0,0 +1,100 @@
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+
+# File layout (little-endian):
+#
+#   0   header (64 bytes, HEADER below)
+#         magic "RLQT", version, dtype code, n_states, n_actions,
+#         base_rtt, best_thr_ema, avg_thr, epsilon, recent_loss, steps,
+#         data_offset
+#   64  actions      int16[n_actions]
+#       visited      uint8[n_states]  (1 = state present in the Q dict)
+#       padding to a 64-byte boundary
+#   data_offset
+#       Q            dtype[n_states, n_actions], row = encoded state id
+#
+# Readers reject other magics and newer versions.
+
+MAGIC = b"RLQT"
+VERSION = 1
+HEADER = struct.Struct("<4sHBxHHdddddqI")
+
+DTYPES = {0: np.float64, 1: np.float32, 2: np.float16}
+DTYPE_CODES = {np.dtype(t): code for code, t in DTYPES.items()}
+
+ANCHOR_FIELDS = ("base_rtt", "best_thr_ema", "avg_thr", "epsilon", "recent_loss", "steps")
+
+
+def save_q(path, q, actions, visited, anchor, dtype=np.float32):
+    """
+    Write a dense Q array (n_states x n_actions), its action values,
+    visited-state mask and anchor values (dict with ANCHOR_FIELDS) to
+    path. The file is written to a temporary name and renamed into
+    place.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"dtype must be one of {sorted(t.name for t in DTYPE_CODES)}")
+    q = np.ascontiguousarray(q, dtype=dtype)
+    n_states, n_actions = q.shape
+
+    tail = np.asarray(actions, dtype="<i2").tobytes() + np.asarray(visited, dtype=np.uint8).tobytes()
+    data_offset = -(-(HEADER.size + len(tail)) // 64) * 64
+    header = HEADER.pack(
+        MAGIC, VERSION, DTYPE_CODES[dtype], n_states, n_actions,
+        *(float(anchor[f]) for f in ANCHOR_FIELDS[:-1]), int(anchor["steps"]),
+        data_offset,
+    )
+    blob = header + tail
+    blob += bytes(data_offset - len(blob))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+            f.write(q.astype(q.dtype.newbyteorder("<"), copy=False).tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_q(path, mmap=False):
+    """
+    Read a file written by save_q. Returns (q, meta) where q is the
+    [n_states, n_actions] array (a read-only memmap with mmap=True)
+    and meta holds actions, visited and the anchor fields. A table
+    over the 270 RLAgent states is a few KB, which one read() loads
+    faster than np.memmap maps it.
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise ValueError(f"{path}: truncated Q-table header")
+        magic, version, code, n_states, n_actions, *anchor, data_offset = HEADER.unpack(head)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a Q-table file")
+        if version > VERSION:
+            raise ValueError(f"{path}: Q-table format version {version} is newer than supported ({VERSION})")
+        actions = np.frombuffer(f.read(2 * n_actions), dtype="<i2")
+        visited = np.frombuffer(f.read(n_states), dtype=np.uint8).astype(bool)
+
+        dtype = np.dtype(DTYPES[code]).newbyteorder("<")
+        shape = (n_states, n_actions)
+        if mmap:
+            q = np.memmap(path, dtype=dtype, mode="r", offset=data_offset, shape=shape)
+        else:
+            f.seek(data_offset)
+            q = np.fromfile(f, dtype=dtype, count=n_states * n_actions).reshape(shape)
+
+    meta = dict(zip(ANCHOR_FIELDS, anchor))
+    meta["steps"] = int(meta["steps"])
+    meta["actions"] = tuple(int(a) for a in actions)
+    meta["visited"] = visited
+    meta["version"] = version
+    return q, meta
@@ -1,7 +1,145 @@
 import random
+
+import numpy as np
+
 from agents.base_agent import BaseAgent
 
 
+# Discretized state: (rtt, efficiency, rate trend, delivery, recent loss)
+STATE_DIMS = (5, 3, 3, 3, 2)
+N_STATES = 5 * 3 * 3 * 3 * 2
+
+
+def encode_state(state):
+    """
+    Map a discretized state tuple to a dense id in [0, N_STATES).
+    """
+    rtt, eff, trend, delivery, recent = state
+    return (((rtt * 3 + eff) * 3 + trend) * 3 + delivery) * 2 + recent
+
+
+def decode_state(state_id):
+    """
+    Inverse of encode_state.
+    """
+    state = []
+    for dim in reversed(STATE_DIMS):
+        state_id, digit = divmod(state_id, dim)
+        state.append(digit)
+    return tuple(reversed(state))
+
+
+# state tuple of every id, for loading dense tables back into Q
+STATES = tuple(decode_state(i) for i in range(N_STATES))
+STATE_IDS = {state: i for i, state in enumerate(STATES)}
+
+# Reward term weights (RLAgent(reward_weights=...) overrides any subset)
+REWARD_WEIGHTS = {
+    "efficiency": 1.89,     # change in throughput / send_rate
+    "delivery": 1.55,       # change in delivered / (delivered + lost)
+    "rtt": 1.06,            # change in RTT, relative to base_rtt
+    "low_delivery": 2.0,    # penalty per unit of delivery below 0.3
+    "anchor": 1.5,          # throughput vs the best-throughput EMA
+}
+
+# Action-masking thresholds (RLAgent(mask_thresholds=...) overrides any subset)
+MASK_THRESHOLDS = {
+    "ramp": 0.70,           # rate <= ramp * best and little loss: no decreases
+    "ramp_greedy": 0.6,     # ... and rate <= this at epsilon 0: increases only
+    "heavy_loss": 0.15,     # loss ratio above this: no increases
+    "loss": 0.08,           # loss ratio above this: at most +1 ("little loss" below)
+    "overshoot": 1.5,       # rate >= overshoot * best at epsilon 0: decreases only
+}
+
+
+def merge_defaults(defaults, given, what):
+    """
+    defaults updated with given (None: no overrides); unknown keys raise.
+    """
+    merged = dict(defaults)
+    if given:
+        unknown = set(given) - set(defaults)
+        if unknown:
+            raise ValueError(f"unknown {what}: {sorted(unknown)} (expected some of {sorted(defaults)})")
+        merged.update(given)
+    return merged
+
+
+class _LazyQ(dict):
+    """
+    RLAgent Q dict backed by a dense [N_STATES, n_actions] array (as
+    read by agents.qtable.load_q): a visited state's row dict is built
+    on first access, so loading does not pay for rows never used.
+    Iteration, len() and the view methods build the remaining rows
+    first (other dict methods see only the rows built so far).
+    """
+
+    def __init__(self, q, visited, actions):
+        super().__init__()
+        self._q = q
+        self._actions = actions
+        self._pending = visited.tolist()        # by state id: row not built yet
+        self._n_pending = int(visited.sum())
+
+    def _take(self, state):
+        sid = STATE_IDS.get(state)
+        if sid is None or not self._pending[sid]:
+            return None
+        self._pending[sid] = False
+        self._n_pending -= 1
+        return sid
+
+    def __missing__(self, state):
+        sid = self._take(state)
+        if sid is None:
+            raise KeyError(state)
+        row = dict(zip(self._actions, self._q[sid].tolist()))
+        dict.__setitem__(self, state, row)
+        return row
+
+    def __contains__(self, state):
+        if dict.__contains__(self, state):
+            return True
+        sid = STATE_IDS.get(state)
+        return sid is not None and self._pending[sid]
+
+    def get(self, state, default=None):
+        return self[state] if state in self else default
+
+    def __setitem__(self, state, row):
+        self._take(state)
+        dict.__setitem__(self, state, row)
+
+    def __delitem__(self, state):
+        if self._take(state) is None:
+            dict.__delitem__(self, state)
+
+    def _fill(self):
+        if self._n_pending:
+            for sid, pending in enumerate(self._pending):
+                if pending:
+                    self[STATES[sid]]
+
+    def __iter__(self):
+        self._fill()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        return dict.__len__(self) + self._n_pending
+
+    def keys(self):
+        self._fill()
+        return dict.keys(self)
+
+    def values(self):
+        self._fill()
+        return dict.values(self)
+
+    def items(self):
+        self._fill()
+        return dict.items(self)
+
+
 class RLAgent(BaseAgent):
     """
     Tabular Q-learning agent with:
@@ -11,6 +149,14 @@ class RLAgent(BaseAgent):
     - Loss-regime action masking
     - Throughput anchoring to self-observed best (EMA-based, scale-free)
     - Minimal temporal context (recent loss bit)
+
+    learn=False disables Q updates (inference only): no rewards are
+    computed and unseen states are read as all-zero rows without being
+    added to Q. Masking and exploration are unchanged, so set
+    epsilon=0 for pure exploitation.
+
+    reward_weights and mask_thresholds override entries of
+    REWARD_WEIGHTS and MASK_THRESHOLDS (see experiments/sweep.py).
     """
 
     def __init__(
@@ -25,7 +171,11 @@ class RLAgent(BaseAgent):
         osc_penalty=0.2,
         best_thr_ema_alpha=0.05,
         avg_thr=0,
-        steps=0
+        steps=0,
+        rng=None,
+        learn=True,
+        reward_weights=None,
+        mask_thresholds=None,
     ):
         self.base_rtt = base_rtt
         self.actions = actions
@@ -39,10 +189,16 @@ class RLAgent(BaseAgent):
 
         self.osc_penalty = osc_penalty
         self.best_thr_ema_alpha = best_thr_ema_alpha
+        self.reward_weights = merge_defaults(REWARD_WEIGHTS, reward_weights, "reward weights")
+        self.mask_thresholds = merge_defaults(MASK_THRESHOLDS, mask_thresholds, "mask thresholds")
 
         self.avg_thr = 0
         self.steps = 0
 
+        # source of exploration / tie-break randomness
+        self.rng = rng if rng is not None else random
+
+        self.learn = learn
         self.Q = {}
 
         # sender-side memory
@@ -126,6 +282,7 @@ class RLAgent(BaseAgent):
 
         p = self.prev_obs
         c = obs
+        w = self.reward_weights
 
         eff_p = p["throughput"] / max(p["send_rate"], 1)
         eff_c = c["throughput"] / max(c["send_rate"], 1)
@@ -141,9 +298,9 @@ class RLAgent(BaseAgent):
         d_del = del_c - del_p
 
         reward = (
-            + 1.89 * d_eff
-            + 1.55 * d_del
-            - 1.06 * d_rtt
+            + w["efficiency"] * d_eff
+            + w["delivery"] * d_del
+            - w["rtt"] * d_rtt
         )
 
         if self.epsilon == 0 and c["send_rate"] >= 1.2 * self.avg_thr and c["loss"] == 0 and p["loss"] == 0:
@@ -158,7 +315,7 @@ class RLAgent(BaseAgent):
             reward -= self.osc_penalty * abs(self.prev_action)
 
         if del_c < 0.3:
-            reward -= 2.0 * (0.3 - del_c)
+            reward -= w["low_delivery"] * (0.3 - del_c)
 
         loss_ratio = c["loss"] / max(c["send_rate"], 1)
         safe = (loss_ratio < 0.05) and (d_rtt <= 0.05)
@@ -166,9 +323,9 @@ class RLAgent(BaseAgent):
         if safe and self.best_thr_ema > 0:
             thr_ratio = c["throughput"] / max(self.best_thr_ema, 1e-6)
             if thr_ratio < 0.85:
-                reward -= 1.5 * (0.85 - thr_ratio)
+                reward -= w["anchor"] * (0.85 - thr_ratio)
             elif thr_ratio > 0.95:
-                reward += 1.5 * (thr_ratio - 0.95)
+                reward += w["anchor"] * (thr_ratio - 0.95)
 
         return reward
 
@@ -180,21 +337,106 @@ class RLAgent(BaseAgent):
         if s not in self.Q:
             self.Q[s] = {a: 0.0 for a in self.actions}
 
+    def save(self, path, dtype="float32"):
+        """
+        Write Q and the anchor state (best_thr_ema, avg_thr, epsilon,
+        steps, recent_loss, base_rtt) in the binary format of
+        agents.qtable; dtype is float64, float32 or float16.
+        """
+        from agents.qtable import save_q
+
+        q = np.zeros((N_STATES, len(self.actions)))
+        visited = np.zeros(N_STATES, dtype=bool)
+        for state, values in self.Q.items():
+            sid = encode_state(state)
+            q[sid] = [values[a] for a in self.actions]
+            visited[sid] = True
+
+        anchor = {
+            "base_rtt": self.base_rtt,
+            "best_thr_ema": self.best_thr_ema,
+            "avg_thr": self.avg_thr,
+            "epsilon": self.epsilon,
+            "recent_loss": self.recent_loss,
+            "steps": self.steps,
+        }
+        save_q(path, q, self.actions, visited, anchor, dtype=dtype)
+
+    @classmethod
+    def load(cls, path, base_rtt=None, mmap=False, **kwargs):
+        """
+        Warm-start an agent from a file written by save(). base_rtt
+        overrides the saved one (states are relative to base_rtt, so a
+        table carries over between links); other keyword arguments go
+        to the constructor, epsilon defaulting to the saved one. A
+        given actions must match the file's. Q holds the visited
+        states; their row dicts are built on first use.
+
+        The table is a few KB, so reading it (mmap=False) is faster
+        than setting up a memory map; mmap=True maps the file instead.
+        """
+        from agents.qtable import load_q
+
+        q, meta = load_q(path, mmap=mmap)
+        actions = meta["actions"]
+        if "actions" in kwargs and tuple(kwargs.pop("actions")) != actions:
+            raise ValueError(f"{path}: table has actions {actions}, not the given ones")
+        kwargs.setdefault("epsilon", meta["epsilon"])
+        agent = cls(
+            base_rtt=meta["base_rtt"] if base_rtt is None else base_rtt,
+            actions=actions,
+            **kwargs,
+        )
+
+        agent.Q = _LazyQ(q, meta["visited"], actions)
+        agent.best_thr_ema = meta["best_thr_ema"]
+        agent.avg_thr = meta["avg_thr"]
+        agent.steps = meta["steps"]
+        agent.recent_loss = meta["recent_loss"]
+        return agent
+
+    def freeze(self):
+        """
+        Export the greedy policy as an agents.frozen_policy.FrozenPolicy
+        lookup table, carrying over the current runtime memory.
+        """
+        from agents.frozen_policy import FrozenPolicy
+
+        policy = FrozenPolicy.from_q(
+            self.Q,
+            self.actions,
+            self.base_rtt,
+            best_thr_ema_alpha=self.best_thr_ema_alpha,
+            recent_loss_decay=self.recent_loss_decay,
+            mask_thresholds=self.mask_thresholds,
+        )
+        policy.best_thr_ema = self.best_thr_ema
+        policy.recent_loss = self.recent_loss
+        policy.prev_send_rate = self.prev_send_rate
+        return policy
+
     # --------------------------------------------------
     # Core RL
     # --------------------------------------------------
 
     def act(self, observation):
         state = self._get_state(observation)
-        self._ensure_state(state)
-
-        if self.prev_state is not None:
-            r = self._compute_reward(observation)
-            best_next = max(self.Q[state].values())
-            old = self.Q[self.prev_state][self.prev_action]
-            self.Q[self.prev_state][self.prev_action] = (
-                old + self.alpha * (r + self.gamma * best_next - old)
-            )
+
+        if self.learn:
+            self._ensure_state(state)
+            q = self.Q[state]
+
+            if self.prev_state is not None:
+                r = self._compute_reward(observation)
+                best_next = max(q.values())
+                old = self.Q[self.prev_state][self.prev_action]
+                self.Q[self.prev_state][self.prev_action] = (
+                    old + self.alpha * (r + self.gamma * best_next - old)
+                )
+        else:
+            q = self.Q.get(state)
+            if q is None:
+                q = dict.fromkeys(self.actions, 0.0)
 
         thr = observation["throughput"]
         self.best_thr_ema = max(
@@ -208,16 +450,17 @@ class RLAgent(BaseAgent):
         loss_ratio = loss / max(send_rate, 1)
 
         allowed_actions = list(self.actions)
+        m = self.mask_thresholds
 
-        if send_rate <= 0.70 * self.best_thr_ema and loss_ratio <= 0.08:
+        if send_rate <= m["ramp"] * self.best_thr_ema and loss_ratio <= m["loss"]:
             allowed_actions = [a for a in allowed_actions if a >= 0]
-            if self.epsilon == 0 and send_rate <= 0.6 * self.best_thr_ema:
+            if self.epsilon == 0 and send_rate <= m["ramp_greedy"] * self.best_thr_ema:
                 allowed_actions = [a for a in allowed_actions if a > 0]
-        elif loss_ratio > 0.15:
+        elif loss_ratio > m["heavy_loss"]:
             allowed_actions = [a for a in allowed_actions if a <= 0]
-        elif loss_ratio > 0.08:
+        elif loss_ratio > m["loss"]:
             allowed_actions = [a for a in allowed_actions if a <= 1]
-        elif send_rate >= 1.5 * self.best_thr_ema and self.epsilon == 0:
+        elif send_rate >= m["overshoot"] * self.best_thr_ema and self.epsilon == 0:
             allowed_actions = [a for a in allowed_actions if a < 0]
 
 
@@ -225,12 +468,12 @@ class RLAgent(BaseAgent):
         if not allowed_actions:
             allowed_actions = [0]
 
-        if random.random() < self.epsilon:
-            action = random.choice(allowed_actions)
+        if self.rng.random() < self.epsilon:
+            action = self.rng.choice(allowed_actions)
         else:
-            best_q = max(self.Q[state][a] for a in allowed_actions)
-            action = random.choice(
-                [a for a in allowed_actions if self.Q[state][a] == best_q]
+            best_q = max(q[a] for a in allowed_actions)
+            action = self.rng.choice(
+                [a for a in allowed_actions if q[a] == best_q]
             )
 
         if self.epsilon > self.epsilon_min:
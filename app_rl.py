@@ -1,19 +1,22 @@
 # Final frontend - Aesthetic & Interactive Edition
 
+import os
 import streamlit as st
-import pandas as pd
 import time
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 # Import your simulation components
-from sim.environment import Environment
-from sim.sender import Sender
-from sim.link import Link
-from sim.receiver import Receiver
-from agents.reno_agent import RenoAgent
-from agents.rl_agent import RLAgent
+from experiments.comparison import ComparisonWorker
+from metrics.cache import ResultCache
+from metrics.plots import lttb_indices, stride_indices
+
+FRAME_RATE = 10             # UI refreshes per second while a run is live
+PACED_STEP_DELAY = 0.01     # seconds per step in paced mode
+CACHE_MAX_BYTES = 64 * 1024 * 1024     # on-disk result cache cap (LRU beyond this)
+MAX_PLOT_POINTS = 600       # per line trace, after LTTB
+MAX_SCATTER_POINTS = 1500   # per correlation scatter
 
 # 1. Page Configuration & Dark Theme Style
 st.set_page_config(page_title="ANTAR-DRISHTI --> INNER VISION", layout="wide")
@@ -58,6 +61,14 @@ with st.sidebar:
     st.markdown("<h2 style='color: #00d488; font-family: monospace;'>● AGENT ARGS</h2>", unsafe_allow_html=True)
     sim_steps = st.slider("Simulation Length", 50, 5000, 300)
     ema_alpha = st.slider("RTT Smoothing (Alpha)", 0.01, 0.5, 0.1)
+    seed = int(st.number_input("Seed", min_value=0, max_value=2**31 - 1, value=0, step=1,
+                               help="Same sliders + seed replays a cached run instantly."))
+    playback = st.radio("Playback", ("Paced", "As fast as possible"),
+                        help="Paced replays at a watchable speed; otherwise the simulator runs flat out.")
+    q_path = st.text_input("Warm-start Q table", value="",
+                           help="Path to a table saved with RLAgent.save; empty trains from scratch.").strip()
+    profile = st.checkbox("Profile stages", value=False,
+                          help="Time each Environment.step stage (send, enqueue, link, ACKs...).")
 
 # 3. Header
 c1, c2 = st.columns([2, 1])
@@ -66,69 +77,86 @@ with c1:
 with c2:
     st.markdown("<div style='text-align: right; color: #8b949e; font-family: monospace; padding-top: 10px;'>SYSTEM STATUS: <span style='color: #00d488;'>ACTIVE</span></div>", unsafe_allow_html=True)
 
-# 4. Simulation Initialization
-def init_sims():
-    env_r = Environment(Sender(5), Link(capacity, queue_limit, 5.0, noise), Receiver())
-    ag_r = RenoAgent()
-    env_a = Environment(Sender(5), Link(capacity, queue_limit, 5.0, noise), Receiver())
-    ag_a = RLAgent(base_rtt=5.0)
-    return env_r, ag_r, env_a, ag_a
-
-# 5. Dashboard Setup
+# 4. Dashboard Setup
 if 'run' not in st.session_state: st.session_state.run = False
 
-def start_sim(): st.session_state.run = True
+def start_sim():
+    # Simulation runs on a background thread; this script only renders
+    old = st.session_state.get('worker')
+    if old is not None: old.stop()
+    st.session_state.worker = None
+
+    cache = ResultCache(max_bytes=CACHE_MAX_BYTES)
+    params = dict(noise=noise, capacity=capacity, queue_limit=queue_limit,
+                  sim_steps=sim_steps, ema_alpha=ema_alpha, seed=seed)
+    if q_path:
+        if not os.path.exists(q_path):
+            st.error(f"No Q table at {q_path}")
+            st.session_state.run = False
+            return
+        params.update(q_path=os.path.abspath(q_path), q_mtime=os.path.getmtime(q_path))
+    # cached runs carry no timings: always simulate when profiling
+    st.session_state.cached = None if profile else cache.get(params)
+    if st.session_state.cached is None:
+        step_delay = PACED_STEP_DELAY if playback == "Paced" else 0.0
+        st.session_state.worker = ComparisonWorker(
+            noise, capacity, queue_limit, sim_steps, ema_alpha, step_delay, seed,
+            on_done=lambda snap: cache.put(params, snap), profile=profile, q_path=q_path or None,
+        ).start()
+    st.session_state.run = True
 
 st.button("INITIATE NEURAL COMPARISON", on_click=start_sim, use_container_width=True)
 
 if st.session_state.run:
-    env_r, ag_r, env_a, ag_a = init_sims()
-    
+    worker = st.session_state.worker
+    cached = st.session_state.cached
+
     # Static row for metrics (avoids the 1000-column bug)
     st.markdown("<div class='card-label'>Live Performance Averages</div>", unsafe_allow_html=True)
     m_cols = st.columns(6)
     m_placeholders = [col.empty() for col in m_cols]
+    status = st.empty()
 
     # Chart Area
     plot_time = st.empty()
     st.markdown("---")
     plot_corr = st.empty()
-
-    history = []
-    ema_r, ema_a = 5.0, 5.0
-    totals = {"L_Thr": 0, "L_Rate": 0, "L_EMA": 0, "A_Thr": 0, "A_Rate": 0, "A_EMA": 0}
-
-    for t in range(1, sim_steps + 1):
-        m_r = env_r.step()
-        m_a = env_a.step()
-
-        if m_r['avg_rtt'] > 0: ema_r = (1 - ema_alpha) * ema_r + ema_alpha * m_r['avg_rtt']
-        if m_a['avg_rtt'] > 0: ema_a = (1 - ema_alpha) * ema_a + ema_alpha * m_a['avg_rtt']
-
-        env_r.sender.adjust_rate(ag_r.act(m_r))
-        env_a.sender.adjust_rate(ag_a.act(m_a))
-
-        # Log & Sum for Averages
-        totals["L_Thr"] += m_r['throughput']; totals["L_Rate"] += m_r['send_rate']; totals["L_EMA"] += ema_r
-        totals["A_Thr"] += m_a['throughput']; totals["A_Rate"] += m_a['send_rate']; totals["A_EMA"] += ema_a
-
-        history.append({
-            "t": t, "L_Thr": m_r['throughput'], "A_Thr": m_a['throughput'],
-            "L_Rate": m_r['send_rate'], "A_Rate": m_a['send_rate'],
-            "L_EMA": ema_r, "A_EMA": ema_a,
-            "L_Loss": m_r['loss'], "A_Loss": m_a['loss']
-        })
-
-        # Update Metric Cards In-Place
+    prof_table = st.empty()
+
+    # --- Figures are built once; refreshes only swap trace data ---
+    colors = {'L': '#ff4b4b', 'A': '#00d488'}
+
+    fig_time = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                             subplot_titles=("Throughput", "Send Rate", "EMA RTT", "Packet Loss"))
+    # (column, row, line style) per trace, in fig_time.data order
+    time_traces = [
+        ('L_Thr', 1, dict(color=colors['L'])), ('A_Thr', 1, dict(color=colors['A'])),
+        ('L_Rate', 2, dict(color=colors['L'], dash='dot')), ('A_Rate', 2, dict(color=colors['A'], dash='dot')),
+        ('L_EMA', 3, dict(color=colors['L'], width=1)), ('A_EMA', 3, dict(color=colors['A'], width=1)),
+        ('L_Loss', 4, dict(color=colors['L'], width=2)), ('A_Loss', 4, dict(color=colors['A'], width=2)),
+    ]
+    for col, row, line in time_traces:
+        name = 'Legacy' if col.startswith('L') else 'AI'
+        fig_time.add_trace(go.Scatter(x=[], y=[], name=name, line=line), row=row, col=1)
+    fig_time.update_layout(height=900, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                          font_color="#8b949e", showlegend=False, margin=dict(l=10, r=10, t=40, b=10))
+
+    fig_corr = make_subplots(rows=1, cols=2, subplot_titles=("Legacy Analysis", "AI Analysis"))
+    fig_corr.add_trace(go.Scatter(x=[], y=[], mode='markers', marker=dict(color=colors['L'], opacity=0.4)), row=1, col=1)
+    fig_corr.add_trace(go.Scatter(x=[], y=[], mode='markers', marker=dict(color=colors['A'], opacity=0.4)), row=1, col=2)
+    fig_corr.update_layout(height=350, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color="#8b949e", showlegend=False)
+
+    def render(snap):
+        avg = snap["averages"]
         card_contents = [
-            ("Legacy Thr", totals["L_Thr"]/t, "#ff4b4b", "legacy"),
-            ("Legacy CWND", totals["L_Rate"]/t, "#ff4b4b", "legacy"),
-            ("Legacy RTT", totals["L_EMA"]/t, "#ff4b4b", "legacy"),
-            ("AI Thr", totals["A_Thr"]/t, "#00d488", "ai"),
-            ("AI CWND", totals["A_Rate"]/t, "#00d488", "ai"),
-            ("AI RTT", totals["A_EMA"]/t, "#00d488", "ai"),
+            ("Legacy Thr", avg["L_Thr"], "#ff4b4b", "legacy"),
+            ("Legacy CWND", avg["L_Rate"], "#ff4b4b", "legacy"),
+            ("Legacy RTT", avg["L_EMA"], "#ff4b4b", "legacy"),
+            ("AI Thr", avg["A_Thr"], "#00d488", "ai"),
+            ("AI CWND", avg["A_Rate"], "#00d488", "ai"),
+            ("AI RTT", avg["A_EMA"], "#00d488", "ai"),
         ]
-        
+
         for i, (label, val, color, style) in enumerate(card_contents):
             m_placeholders[i].markdown(f"""
                 <div class="metric-card {style}-card">
@@ -137,37 +165,43 @@ if st.session_state.run:
                 </div>
             """, unsafe_allow_html=True)
 
-        if t % 10 == 0 or t == sim_steps:
-            df = pd.DataFrame(history)
-            
-            # --- Subplots Logic (Same as your request but styled) ---
-            fig_time = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.05,
-                                     subplot_titles=("Throughput", "Send Rate", "EMA RTT", "Packet Loss"))
-            
-            colors = {'L': '#ff4b4b', 'A': '#00d488'}
-            
-            # Throughput
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['L_Thr'], name='Legacy', line=dict(color=colors['L'])), row=1, col=1)
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['A_Thr'], name='AI', line=dict(color=colors['A'])), row=1, col=1)
-            # Send Rate
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['L_Rate'], name='Legacy', line=dict(color=colors['L'], dash='dot')), row=2, col=1)
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['A_Rate'], name='AI', line=dict(color=colors['A'], dash='dot')), row=2, col=1)
-            # RTT
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['L_EMA'], name='Legacy', line=dict(color=colors['L'], width=1)), row=3, col=1)
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['A_EMA'], name='AI', line=dict(color=colors['A'], width=1)), row=3, col=1)
-            # Loss
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['L_Loss'], name='Legacy', line=dict(color=colors['L'], width=2)), row=4, col=1)
-            fig_time.add_trace(go.Scatter(x=df['t'], y=df['A_Loss'], name='AI', line=dict(color=colors['A'], width=2)), row=4, col=1)
-            
-            fig_time.update_layout(height=900, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', 
-                                  font_color="#8b949e", showlegend=False, margin=dict(l=10, r=10, t=40, b=10))
-            plot_time.plotly_chart(fig_time, use_container_width=True)
-
-            # Correlation Plots
-            fig_corr = make_subplots(rows=1, cols=2, subplot_titles=("Legacy Analysis", "AI Analysis"))
-            fig_corr.add_trace(go.Scatter(x=df['L_EMA'], y=df['L_Rate'], mode='markers', marker=dict(color=colors['L'], opacity=0.4)), row=1, col=1)
-            fig_corr.add_trace(go.Scatter(x=df['A_EMA'], y=df['A_Rate'], mode='markers', marker=dict(color=colors['A'], opacity=0.4)), row=1, col=2)
-            fig_corr.update_layout(height=350, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color="#8b949e", showlegend=False)
-            plot_corr.plotly_chart(fig_corr, use_container_width=True)
-
-        time.sleep(0.01)
\ No newline at end of file
+        source = " // CACHED" if snap is cached else ""
+        status.markdown(f"<div class='card-label'>STEP {snap['t']} / {snap['sim_steps']} "
+                        f"// SIM TIME {snap['elapsed']:.2f}s{source}</div>", unsafe_allow_html=True)
+
+        if snap["t"] == 0:
+            return
+        columns = snap["columns"]
+
+        # LTTB keeps every redraw at <= MAX_PLOT_POINTS per trace
+        ts = columns['t']
+        for trace, (col, _, _) in zip(fig_time.data, time_traces):
+            ys = columns[col]
+            idx = lttb_indices(ts, ys, MAX_PLOT_POINTS)
+            trace.x, trace.y = ts[idx], ys[idx]
+        plot_time.plotly_chart(fig_time, use_container_width=True)
+
+        # Correlation Plots
+        idx = stride_indices(len(ts), MAX_SCATTER_POINTS)
+        fig_corr.data[0].x, fig_corr.data[0].y = columns['L_EMA'][idx], columns['L_Rate'][idx]
+        fig_corr.data[1].x, fig_corr.data[1].y = columns['A_EMA'][idx], columns['A_Rate'][idx]
+        plot_corr.plotly_chart(fig_corr, use_container_width=True)
+
+        # Where time goes (profiled runs only; they never come from the cache)
+        if "profile" in snap:
+            rows = [
+                {"Stage": stage, "Agent": name, "Mean us": s["mean_ns"] / 1000,
+                 "p99 us": s["p99_ns"] / 1000, "Share %": 100 * s["share"]}
+                for name, stats in snap["profile"].items()
+                for stage, s in stats.items()
+            ]
+            prof_table.table(rows)
+
+    if cached is not None:
+        render(cached)
+    else:
+        # Poll the worker at a fixed frame rate, then draw the final state once
+        while not worker.done:
+            render(worker.snapshot())
+            time.sleep(1 / FRAME_RATE)
+        render(worker.snapshot())
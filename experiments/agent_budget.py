@@ -0,0 +1,182 @@
+# experiments/agent_budget.py
+#
+# Deployment budget check for agents (README: <= 5 ms inference per
+# step, <= 5 MB model).
+#
+# Records one observation stream from a seeded Environment driven by a
+# learning RLAgent, then replays it through each agent under test:
+#   rl          the recording agent, still learning (deep copy)
+#   rl-frozen   same Q table, learn=False, epsilon=0 (inference only)
+#   rl-table    RLAgent.freeze(): precomputed FrozenPolicy lookup table
+#   reno        RenoAgent baseline
+#   mlp         MLPAgent (untrained, learning: forward pass and TD update)
+# Any BaseAgent can be added to AGENTS.
+#
+# Per agent it reports act() latency p50 / p99 / p99.9 / max, memory
+# allocated per call (tracemalloc; transient peak and retained), and the
+# pickled model size (the Q table or network parameters where there
+# are some, else the agent).
+# Exit status is 1 if any agent's p99.9 latency or model size is over
+# budget.
+#
+#   python -m experiments.agent_budget [--steps N] [--latency-ms 5] [--model-mb 5]
+
+import argparse
+import copy
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+from agents.mlp_agent import MLPAgent
+
+
+STEPS = 20_000
+ALLOC_STEPS = 2_000         # tracemalloc pass (slow)
+BASE_RTT = 6.0
+SEED = 0
+
+LATENCY_BUDGET_MS = 5.0     # on p99.9
+MODEL_BUDGET_MB = 5.0
+
+
+def record_stream(steps, seed=SEED):
+    """
+    Observations from a closed-loop run, and the agent that made them.
+    """
+    rng = random.Random(seed)
+    link = Link(6, 30, BASE_RTT, 0.02, rng=rng)
+    env = Environment(Sender(5), link, Receiver(rng=rng))
+    agent = RLAgent(base_rtt=BASE_RTT, rng=rng)
+
+    stream = []
+    for _ in range(steps):
+        obs = env.step()
+        stream.append(obs)
+        env.sender.adjust_rate(agent.act(obs))
+    return stream, agent
+
+
+def frozen(agent):
+    clone = copy.deepcopy(agent)
+    clone.learn = False
+    clone.epsilon = 0
+    return clone
+
+
+AGENTS = {
+    "rl": copy.deepcopy,
+    "rl-frozen": frozen,
+    "rl-table": lambda trained: trained.freeze(),
+    "reno": lambda trained: RenoAgent(),
+    "mlp": lambda trained: MLPAgent(BASE_RTT, rng=random.Random(SEED)),
+}
+
+
+# --------------------------------------------------
+# Measurements
+# --------------------------------------------------
+
+def latencies_ns(agent, stream):
+    now = time.perf_counter_ns
+    act = agent.act
+    out = np.empty(len(stream), dtype=np.int64)
+    for i, obs in enumerate(stream):
+        t0 = now()
+        act(obs)
+        out[i] = now() - t0
+    return out
+
+
+def allocations(agent, stream):
+    """
+    Mean bytes per act() call: transient peak above the pre-call level,
+    and retained after the call.
+    """
+    transient = retained = 0
+    tracemalloc.start()
+    try:
+        for obs in stream:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            agent.act(obs)
+            current, peak = tracemalloc.get_traced_memory()
+            transient += peak - before
+            retained += current - before
+    finally:
+        tracemalloc.stop()
+    n = max(len(stream), 1)
+    return transient / n, retained / n
+
+
+def model_bytes(agent):
+    # first model attribute present (an empty Q still counts)
+    model = next(
+        (m for m in (getattr(agent, name, None) for name in ("Q", "params", "table")) if m is not None),
+        agent,
+    )
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def measure(name, agent, stream, alloc_steps):
+    lat = latencies_ns(agent, stream)
+    p50, p99, p999 = np.percentile(lat, [50, 99, 99.9])
+    transient, retained = allocations(agent, stream[:alloc_steps])
+    return {
+        "agent": name,
+        "p50_us": p50 / 1e3,
+        "p99_us": p99 / 1e3,
+        "p999_us": p999 / 1e3,
+        "max_us": lat.max() / 1e3,
+        "alloc_bytes": transient,
+        "retained_bytes": retained,
+        "model_bytes": model_bytes(agent),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent inference / model-size budget check")
+    parser.add_argument("--steps", type=int, default=STEPS)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_BUDGET_MS)
+    parser.add_argument("--model-mb", type=float, default=MODEL_BUDGET_MB)
+    parser.add_argument("--agents", nargs="+", default=list(AGENTS), choices=list(AGENTS))
+    args = parser.parse_args()
+
+    stream, trained = record_stream(args.steps)
+    latency_ns = args.latency_ms * 1e6
+    model_limit = args.model_mb * 1024 * 1024
+
+    print(f"{args.steps} observations; budget p99.9 <= {args.latency_ms} ms, model <= {args.model_mb} MB\n")
+    print(f"{'Agent':<10} | {'p50 us':>7} | {'p99 us':>7} | {'p99.9 us':>8} | {'max us':>8} | "
+          f"{'B/call':>7} | {'kept B':>7} | {'model B':>9} | Budget")
+    print("-" * 96)
+
+    failed = False
+    for name in args.agents:
+        r = measure(name, AGENTS[name](trained), stream, ALLOC_STEPS)
+        over = []
+        if r["p999_us"] * 1e3 > latency_ns:
+            over.append("latency")
+        if r["model_bytes"] > model_limit:
+            over.append("model")
+        failed |= bool(over)
+        print(
+            f"{name:<10} | {r['p50_us']:>7.2f} | {r['p99_us']:>7.2f} | {r['p999_us']:>8.2f} | "
+            f"{r['max_us']:>8.1f} | {r['alloc_bytes']:>7.0f} | {r['retained_bytes']:>7.1f} | "
+            f"{r['model_bytes']:>9,} | {'OVER: ' + ', '.join(over) if over else 'ok'}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
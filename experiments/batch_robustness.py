@@ -0,0 +1,97 @@
+# experiments/batch_robustness.py
+#
+# Robustness sweep on the vectorized BatchEnvironment: NUM_ENVS
+# randomized links (same ranges as robustness_test.py) stepped in
+# lockstep under a vectorized Reno (AIMD) policy or BatchRLAgent.
+
+import time
+
+import numpy as np
+
+from sim.batch import BatchEnvironment
+from agents.batch_rl_agent import BatchRLAgent
+
+
+NUM_ENVS = 10_000
+TOTAL_STEPS = 1000
+WARMUP = 200        # steps excluded from the summary
+SEED = 0
+AGENT = "rl"        # "reno" or "rl"
+SHARED_Q = False    # rl only: one Q-table for all envs
+
+
+def make_random_batch(n, rng, seed):
+    capacity = rng.integers(2, 9, n)
+    queue_limit = rng.integers(8, 41, n)
+    base_rtt = rng.uniform(4.0, 10.0, n)
+    noise_prob = rng.uniform(0.01, 0.05, n)
+
+    env = BatchEnvironment(
+        capacity=capacity,
+        queue_limit=queue_limit,
+        base_rtt=base_rtt,
+        noise_prob=noise_prob,
+        seed=seed,
+    )
+    return env, base_rtt
+
+
+def reno_actions(metrics, increase_step=1, decrease_factor=0.5):
+    """
+    RenoAgent.act applied to every environment at once.
+    """
+    rate = metrics["send_rate"]
+    decreased = np.maximum(1, (rate * decrease_factor).astype(np.int64)) - rate
+    return np.where(metrics["loss"] > 0, decreased, increase_step)
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+    env, base_rtt = make_random_batch(NUM_ENVS, rng, SEED + 1)
+
+    if AGENT == "rl":
+        agent = BatchRLAgent(
+            NUM_ENVS,
+            base_rtt=base_rtt,
+            epsilon=0.2,
+            epsilon_min=0.02,
+            epsilon_decay=0.995,
+            shared_q=SHARED_Q,
+            rng=np.random.default_rng(SEED + 2),
+        )
+        policy = agent.act
+    else:
+        policy = reno_actions
+
+    thr = np.zeros(NUM_ENVS)
+    loss = np.zeros(NUM_ENVS)
+    rtt_sum = np.zeros(NUM_ENVS)
+    rtt_n = np.zeros(NUM_ENVS)
+
+    start = time.perf_counter()
+    actions = None
+    for step in range(TOTAL_STEPS):
+        metrics = env.step(actions)
+        actions = policy(metrics)
+
+        if step >= WARMUP:
+            thr += metrics["throughput"]
+            loss += metrics["loss"]
+            has_rtt = metrics["throughput"] > 0
+            rtt_sum += np.where(has_rtt, metrics["avg_rtt"], 0.0)
+            rtt_n += has_rtt
+    elapsed = time.perf_counter() - start
+
+    steps = TOTAL_STEPS - WARMUP
+    util = thr / steps / env.capacity
+
+    print(f"=== {AGENT}: {NUM_ENVS} envs x {TOTAL_STEPS} steps in {elapsed:.1f}s "
+          f"({NUM_ENVS * TOTAL_STEPS / elapsed:,.0f} env-steps/s) ===")
+    print(f"Avg Throughput  : {np.mean(thr / steps):.2f}")
+    print(f"Avg Utilization : {np.mean(util):.2f}")
+    print(f"Avg RTT         : {np.sum(rtt_sum) / max(np.sum(rtt_n), 1):.2f}")
+    print(f"Avg Loss        : {np.mean(loss / steps):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# experiments/bench_in_flight.py
+#
+# Micro-benchmark for Sender in-flight bookkeeping.
+# Drives a Sender directly with a fixed ACK delay so the in-flight
+# set holds ~ACK_DELAY * send_rate packets, then reports the cost of
+# send + receive_acks + detect_loss per step and per packet.
+#
+# With O(1) membership/removal the per-packet cost should stay flat
+# as send_rate grows (a list-backed in_flight grows linearly).
+
+import time
+from collections import deque
+
+from sim.sender import Sender
+
+
+SEND_RATES = (10, 50, 100, 500, 1000, 2000)
+ACK_DELAY = 8        # timesteps between send and ACK
+STEPS = 400
+WARMUP = 50
+
+
+def bench(send_rate):
+    sender = Sender(initial_rate=send_rate)
+    pipe = deque()
+    elapsed = 0.0
+
+    for t in range(WARMUP + STEPS):
+        start = time.perf_counter()
+
+        packets = sender.send(t)
+        pipe.append(packets)
+        acked = pipe.popleft() if len(pipe) > ACK_DELAY else []
+        sender.receive_acks(acked, t)
+        sender.detect_loss(t)
+        sender.get_metrics()
+
+        if t >= WARMUP:
+            elapsed += time.perf_counter() - start
+
+    ns_step = elapsed / STEPS * 1e9
+    return ns_step, ns_step / send_rate, len(sender.in_flight)
+
+
+def main():
+    print(f"{'Rate':>6} | {'InFlight':>8} | {'us/step':>9} | {'ns/pkt':>7}")
+    print("-" * 42)
+    for rate in SEND_RATES:
+        ns_step, ns_pkt, in_flight = bench(rate)
+        print(
+            f"{rate:>6} | "
+            f"{in_flight:>8} | "
+            f"{ns_step / 1000:>9.1f} | "
+            f"{ns_pkt:>7.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# experiments/bench_packet_memory.py
+#
+# Memory benchmark for the Packet representation.
+# Runs the same seeded 5000-step, capacity-20 Reno simulation twice:
+# once with sim.packet.Packet (slotted) and once with a dict-backed
+# packet class equivalent to the pre-__slots__ Packet, and reports the
+# tracemalloc peak and per-packet size of each.
+
+import random
+import time
+import tracemalloc
+
+import sim.sender
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.packet import Packet
+from agents.reno_agent import RenoAgent
+
+
+STEPS = 5000
+CAPACITY = 20
+QUEUE_LIMIT = 100
+BASE_RTT = 10.0
+NOISE_PROB = 0.01
+SEED = 0
+
+
+class DictPacket:
+    """
+    Packet as it was before __slots__: attributes in an instance dict.
+    """
+
+    def __init__(self, send_time: int, seq: int):
+        self.send_time = send_time
+        self.seq = seq
+
+
+def packet_size(cls, n=10_000):
+    """
+    Traced bytes per live packet (the ints are small and cached).
+    """
+    tracemalloc.start()
+    packets = [cls(send_time=0, seq=0) for _ in range(n)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del packets
+    return size / n
+
+
+def run(packet_cls):
+    """
+    Returns (tracemalloc peak bytes, elapsed seconds, packets sent).
+    """
+    saved = sim.sender.Packet
+    sim.sender.Packet = packet_cls
+    try:
+        rng = random.Random(SEED)
+        sender = Sender(initial_rate=CAPACITY)
+        link = Link(CAPACITY, QUEUE_LIMIT, BASE_RTT, NOISE_PROB, rng=rng)
+        env = Environment(sender, link, Receiver(rng=rng))
+        agent = RenoAgent()
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for _ in range(STEPS):
+            metrics = env.step()
+            sender.adjust_rate(agent.act(metrics))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        sim.sender.Packet = saved
+
+    return peak, elapsed, sender.next_seq
+
+
+def main():
+    print(f"{STEPS} steps, capacity {CAPACITY}, seed {SEED}\n")
+    print(f"{'Packet':<12} | {'B/pkt':>6} | {'Peak KiB':>9} | {'Sent':>7} | {'Time s':>7}")
+    print("-" * 53)
+
+    peaks = {}
+    for name, cls in (("dict", DictPacket), ("__slots__", Packet)):
+        peak, elapsed, sent = run(cls)
+        peaks[name] = peak
+        print(
+            f"{name:<12} | "
+            f"{packet_size(cls):>6.0f} | "
+            f"{peak / 1024:>9.1f} | "
+            f"{sent:>7} | "
+            f"{elapsed:>7.2f}"
+        )
+
+    print(f"\nPeak reduction: {1 - peaks['__slots__'] / peaks['dict']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
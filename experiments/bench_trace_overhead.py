@@ -0,0 +1,61 @@
+# experiments/bench_trace_overhead.py
+#
+# Cost of recording every Environment.step into a TraceRecorder.
+# Runs the same seeded Reno simulation with and without a recorder
+# attached (chunked .npz output to a temp dir) and reports the
+# per-step overhead. Target: < 5% of step time.
+
+import random
+import tempfile
+import time
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from agents.reno_agent import RenoAgent
+from metrics.trace import TraceRecorder
+
+
+STEPS = 200_000
+CAPACITY = 8
+CHUNK_SIZE = 65536
+REPEATS = 3
+SEED = 0
+
+
+def run(recorder):
+    rng = random.Random(SEED)
+    link = Link(CAPACITY, 40, 6.0, 0.02, rng=rng)
+    env = Environment(Sender(CAPACITY), link, Receiver(rng=rng), recorder=recorder)
+    agent = RenoAgent()
+
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        metrics = env.step()
+        action = agent.act(metrics)
+        env.sender.adjust_rate(action)
+        if recorder is not None:
+            recorder.record_action(action)
+    if recorder is not None:
+        recorder.close()
+    return time.perf_counter() - start
+
+
+def main():
+    base, traced = [], []
+    for _ in range(REPEATS):
+        base.append(run(None))
+        with tempfile.TemporaryDirectory() as path:
+            traced.append(run(TraceRecorder(path, chunk_size=CHUNK_SIZE)))
+
+    base_us = min(base) / STEPS * 1e6
+    traced_us = min(traced) / STEPS * 1e6
+    print(f"{STEPS} steps, capacity {CAPACITY}, chunk {CHUNK_SIZE} (best of {REPEATS})")
+    print(f"no recorder : {base_us:.2f} us/step")
+    print(f"recorder    : {traced_us:.2f} us/step")
+    print(f"overhead    : {traced_us - base_us:.2f} us/step ({traced_us / base_us - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
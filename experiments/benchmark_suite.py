@@ -0,0 +1,268 @@
+# experiments/benchmark_suite.py
+#
+# Simulator throughput benchmarks with regression tracking.
+#
+#   python -m experiments.benchmark_suite run --out bench.json
+#   python -m experiments.benchmark_suite compare baseline.json bench.json
+#
+# `run` sweeps capacity x queue_limit x noise_prob x steps, driving a seeded
+# Environment with an RLAgent, and records per config:
+#   steps_per_sec, packets_per_sec      whole loop (step + act)
+#   ns_per_step[component]              Environment.step, Link.step,
+#                                       Sender.receive_acks,
+#                                       Receiver.get_acks, RLAgent.act
+#   peak_kib                            tracemalloc peak (separate pass)
+# Component times come from per-instance timing wrappers, with the
+# wrapper's own cost (calibrated on a no-op) subtracted.
+#
+# `compare` matches configs by key and flags any ns/step or peak_kib
+# that grew by more than --threshold; exit status 1 on regression.
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from agents.rl_agent import RLAgent
+
+
+CAPACITIES = (1, 10, 100, 1000)
+QUEUE_FACTORS = (2, 10)             # queue_limit = factor * capacity
+NOISE_PROBS = (0.01, 0.05)
+STEP_COUNTS = (500, 2000)
+QUICK_STEPS = (300,)
+MEMORY_STEPS = 500
+REPEATS = 3
+BASE_RTT = 6.0
+SEED = 0
+THRESHOLD = 0.10
+
+COMPONENTS = ("env_step", "link_step", "sender_receive_acks", "receiver_get_acks", "agent_act")
+
+
+# --------------------------------------------------
+# Timing wrappers
+# --------------------------------------------------
+
+class _Timed:
+    """
+    Callable replacing a bound method; accumulates its wall time.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.total = 0.0
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = self.fn(*args, **kwargs)
+        self.total += time.perf_counter() - start
+        self.calls += 1
+        return result
+
+
+def _wrapper_overhead(n=200_000):
+    timed = _Timed(lambda: None)
+    for _ in range(n):
+        timed()
+    return timed.total / n
+
+
+def make_run(capacity, queue_limit, noise_prob):
+    rng = random.Random(SEED)
+    link = Link(capacity, queue_limit, BASE_RTT, noise_prob, rng=rng)
+    env = Environment(Sender(capacity), link, Receiver(rng=rng))
+    agent = RLAgent(base_rtt=BASE_RTT, rng=rng)
+    return env, agent
+
+
+def drive(env, agent, steps):
+    step, act, adjust = env.step, agent.act, env.sender.adjust_rate
+    for _ in range(steps):
+        adjust(act(step()))
+
+
+def time_config(capacity, queue_limit, noise_prob, steps, overhead):
+    env, agent = make_run(capacity, queue_limit, noise_prob)
+
+    timers = {
+        "link_step": (env.link, "step"),
+        "sender_receive_acks": (env.sender, "receive_acks"),
+        "receiver_get_acks": (env.receiver, "get_acks"),
+        "agent_act": (agent, "act"),
+    }
+    wrapped = {}
+    for name, (obj, attr) in timers.items():
+        wrapped[name] = _Timed(getattr(obj, attr))
+        setattr(obj, attr, wrapped[name])
+    wrapped["env_step"] = _Timed(env.step)
+    env.step = wrapped["env_step"]
+
+    start = time.perf_counter()
+    drive(env, agent, steps)
+    elapsed = time.perf_counter() - start
+
+    # wrappers nested inside env.step add their overhead to it too
+    nested = 3
+    ns = {}
+    for name, timed in wrapped.items():
+        own = timed.total / steps - overhead
+        if name == "env_step":
+            own -= nested * overhead
+        ns[name] = max(own, 0.0) * 1e9
+
+    packets = env.sender.next_seq
+    return elapsed - len(wrapped) * steps * overhead, packets, ns
+
+
+def peak_memory(capacity, queue_limit, noise_prob, steps):
+    env, agent = make_run(capacity, queue_limit, noise_prob)
+    tracemalloc.start()
+    drive(env, agent, steps)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def config_key(config):
+    return (
+        f"cap={config['capacity']},q={config['queue_limit']},"
+        f"noise={config['noise_prob']},steps={config['steps']}"
+    )
+
+
+# --------------------------------------------------
+# Commands
+# --------------------------------------------------
+
+def run(out, step_counts=STEP_COUNTS, repeats=REPEATS):
+    overhead = _wrapper_overhead()
+    results = []
+
+    print(f"{'Config':<38} | {'steps/s':>9} | {'pkts/s':>10} | {'env ns':>9} | {'agent ns':>9} | {'peak KiB':>9}")
+    print("-" * 98)
+    for capacity in CAPACITIES:
+        for factor in QUEUE_FACTORS:
+            for noise_prob in NOISE_PROBS:
+                for steps in step_counts:
+                    config = {
+                        "capacity": capacity,
+                        "queue_limit": factor * capacity,
+                        "noise_prob": noise_prob,
+                        "steps": steps,
+                    }
+
+                    best = None
+                    for _ in range(repeats):
+                        elapsed, packets, ns = time_config(**config, overhead=overhead)
+                        if best is None or elapsed < best[0]:
+                            best = (elapsed, packets, ns)
+                    elapsed, packets, ns = best
+                    memory_steps = min(steps, MEMORY_STEPS)
+                    peak = peak_memory(capacity, factor * capacity, noise_prob, memory_steps)
+
+                    result = {
+                        "key": config_key(config),
+                        "config": config,
+                        "steps_per_sec": steps / elapsed,
+                        "packets_per_sec": packets / elapsed,
+                        "ns_per_step": ns,
+                        "peak_kib": peak,
+                        "memory_steps": memory_steps,
+                    }
+                    results.append(result)
+                    print(
+                        f"{result['key']:<38} | "
+                        f"{result['steps_per_sec']:>9,.0f} | "
+                        f"{result['packets_per_sec']:>10,.0f} | "
+                        f"{ns['env_step']:>9,.0f} | "
+                        f"{ns['agent_act']:>9,.0f} | "
+                        f"{peak:>9,.1f}"
+                    )
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "step_counts": list(step_counts),
+            "repeats": repeats,
+            "seed": SEED,
+            "wrapper_overhead_ns": overhead * 1e9,
+        },
+        "results": results,
+    }
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out}")
+
+
+def compare(baseline_path, current_path, threshold=THRESHOLD):
+    with open(baseline_path) as f:
+        baseline = {r["key"]: r for r in json.load(f)["results"]}
+    with open(current_path) as f:
+        current = {r["key"]: r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'Config':<38} | {'Metric':<24} | {'Base':>10} | {'Now':>10} | {'Change':>8}")
+    print("-" * 102)
+    for key, now in current.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<38} | (no baseline)")
+            continue
+
+        metrics = [(f"{c} ns", base["ns_per_step"][c], now["ns_per_step"][c]) for c in COMPONENTS]
+        metrics.append(("peak KiB", base["peak_kib"], now["peak_kib"]))
+        for name, b, n in metrics:
+            change = (n - b) / b if b else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{key:<38} | {name:<24} | {b:>10,.0f} | {n:>10,.0f} | {change:>+7.1%}{flag}")
+
+    missing = sorted(set(baseline) - set(current))
+    for key in missing:
+        print(f"{key:<38} | (missing from current run)")
+
+    print(f"\n{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulator benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run the sweep and write a JSON report")
+    p_run.add_argument("--out", default="bench.json")
+    p_run.add_argument("--steps", type=int, nargs="+", default=list(STEP_COUNTS))
+    p_run.add_argument("--repeats", type=int, default=REPEATS)
+    p_run.add_argument("--quick", action="store_true", help=f"{QUICK_STEPS[0]} steps, 1 repeat")
+
+    p_cmp = sub.add_parser("compare", help="diff a report against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=THRESHOLD,
+                       help="relative slowdown flagged as a regression (default 0.10)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if args.quick:
+            args.steps, args.repeats = QUICK_STEPS, 1
+        run(args.out, args.steps, args.repeats)
+        return 0
+    return compare(args.baseline, args.current, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# experiments/check_batch_rl_parity.py
+#
+# Checks that BatchRLAgent (per-env Q) makes exactly the decisions of
+# N scalar RLAgents when both consume the same uniforms. Scalar
+# environments generate the observations; every step the batch agent
+# sees the stacked observations and must return the scalar actions.
+
+import random
+
+import numpy as np
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.rng import UniformStream
+from agents.rl_agent import RLAgent, N_STATES, encode_state
+from agents.batch_rl_agent import BatchRLAgent
+
+
+NUM_ENVS = 16
+TOTAL_STEPS = 1500
+SEED = 7
+
+OBS_KEYS = ("throughput", "avg_rtt", "loss", "send_rate")
+
+
+def dense_q(agent):
+    q = np.zeros((N_STATES, len(agent.actions)))
+    for state, values in agent.Q.items():
+        q[encode_state(state)] = [values[a] for a in agent.actions]
+    return q
+
+
+def main():
+    random.seed(SEED)
+    uniforms = np.random.default_rng(SEED).random((TOTAL_STEPS, NUM_ENVS, 2))
+
+    envs, agents, base_rtts = [], [], []
+    for i in range(NUM_ENVS):
+        capacity = random.randint(2, 8)
+        base_rtt = random.uniform(4.0, 10.0)
+        link = Link(capacity, random.randint(8, 40), base_rtt, random.uniform(0.01, 0.05))
+        envs.append(Environment(Sender(capacity), link, Receiver()))
+        agents.append(RLAgent(base_rtt=base_rtt, rng=UniformStream(uniforms[:, i, :].ravel())))
+        base_rtts.append(base_rtt)
+
+    batch = BatchRLAgent(NUM_ENVS, base_rtt=base_rtts)
+
+    mismatches = 0
+    for step in range(TOTAL_STEPS):
+        observations = []
+        for env in envs:
+            metrics = env.step()
+            observations.append({k: metrics[k] for k in OBS_KEYS})
+
+        scalar_actions = [agent.act(obs) for agent, obs in zip(agents, observations)]
+        stacked = {k: np.array([obs[k] for obs in observations]) for k in OBS_KEYS}
+        batch_actions = batch.act(stacked, uniforms=uniforms[step])
+
+        mismatches += int(np.sum(batch_actions != np.array(scalar_actions)))
+        for env, action in zip(envs, scalar_actions):
+            env.sender.adjust_rate(action)
+
+    q_equal = all(
+        np.array_equal(dense_q(agent), batch.Q[i]) for i, agent in enumerate(agents)
+    )
+
+    print(f"Action mismatches : {mismatches} / {NUM_ENVS * TOTAL_STEPS}")
+    print(f"Q tables identical: {q_equal}")
+    if mismatches or not q_equal:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
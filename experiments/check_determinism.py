@@ -0,0 +1,142 @@
+# experiments/check_determinism.py
+#
+# Determinism checks for seeded simulations, over Reno and RL runs in
+# packet and cohort mode, with both RNG kinds (random.Random and the
+# NumPy-backed sim.rng.BufferedRNG):
+#
+#   repeat       same seed twice -> identical trajectories
+#   seed         different seeds -> different trajectories
+#   interleaved  two runs stepped alternately -> same as run alone
+#   threads      runs on a thread pool -> same as run serially
+#   global       Random(seed) injected everywhere == the module-level
+#                `random` after random.seed(seed) (stdlib, packet mode)
+#
+# Exits non-zero if any check fails.
+
+import hashlib
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.rng import BufferedRNG
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+
+
+TOTAL_STEPS = 2000
+SEEDS = (0, 1, 2, 3)
+THREADS = 4
+
+RNG_KINDS = {
+    "stdlib": random.Random,
+    "numpy": BufferedRNG,
+}
+
+
+def make_run(agent_kind, rng, cohort=False):
+    """
+    One seeded environment + agent, every component drawing from rng.
+    rng=None leaves all components on the module-level `random`.
+    """
+    sender = Sender(initial_rate=5, cohort=cohort)
+    link = Link(
+        capacity=6,
+        queue_limit=20,
+        base_rtt=6.0,
+        noise_prob=0.03,
+        cohort=cohort,
+        rng=rng,
+    )
+    receiver = Receiver(cohort=cohort, rng=rng)
+    env = Environment(sender, link, receiver)
+
+    if agent_kind == "rl":
+        agent = RLAgent(base_rtt=6.0, rng=rng)
+    else:
+        agent = RenoAgent()
+    return env, agent
+
+
+def stepper(env, agent):
+    """
+    Generator yielding one metrics line per step.
+    """
+    for _ in range(TOTAL_STEPS):
+        metrics = env.step()
+        obs = {k: metrics[k] for k in ("throughput", "avg_rtt", "loss", "send_rate")}
+        action = agent.act(obs)
+        env.sender.adjust_rate(action)
+        yield repr((sorted(metrics.items()), action))
+
+
+def digest(lines):
+    h = hashlib.sha256()
+    for line in lines:
+        h.update(line.encode())
+    return h.hexdigest()
+
+
+def run_digest(agent_kind, rng_kind, seed, cohort=False):
+    rng = RNG_KINDS[rng_kind](seed)
+    return digest(stepper(*make_run(agent_kind, rng, cohort)))
+
+
+def check_interleaved(agent_kind, rng_kind, cohort):
+    a = stepper(*make_run(agent_kind, RNG_KINDS[rng_kind](SEEDS[0]), cohort))
+    b = stepper(*make_run(agent_kind, RNG_KINDS[rng_kind](SEEDS[1]), cohort))
+    lines_a, lines_b = [], []
+    for line_a, line_b in zip(a, b):
+        lines_a.append(line_a)
+        lines_b.append(line_b)
+    return (
+        digest(lines_a) == run_digest(agent_kind, rng_kind, SEEDS[0], cohort)
+        and digest(lines_b) == run_digest(agent_kind, rng_kind, SEEDS[1], cohort)
+    )
+
+
+def check_threads(agent_kind, rng_kind, cohort):
+    serial = [run_digest(agent_kind, rng_kind, s, cohort) for s in SEEDS]
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        threaded = list(pool.map(
+            lambda s: run_digest(agent_kind, rng_kind, s, cohort), SEEDS
+        ))
+    return serial == threaded
+
+
+def check_global(agent_kind):
+    random.seed(SEEDS[0])
+    via_global = digest(stepper(*make_run(agent_kind, None)))
+    return via_global == run_digest(agent_kind, "stdlib", SEEDS[0])
+
+
+def main():
+    failures = 0
+
+    def report(name, ok):
+        nonlocal failures
+        failures += not ok
+        print(f"{name:<40} {'ok' if ok else 'FAIL'}")
+
+    for agent_kind in ("reno", "rl"):
+        for rng_kind in RNG_KINDS:
+            for cohort in (False, True):
+                mode = "cohort" if cohort else "packet"
+                tag = f"{agent_kind}/{rng_kind}/{mode}"
+
+                first = run_digest(agent_kind, rng_kind, SEEDS[0], cohort)
+                report(f"{tag} repeat", first == run_digest(agent_kind, rng_kind, SEEDS[0], cohort))
+                report(f"{tag} seed", first != run_digest(agent_kind, rng_kind, SEEDS[1], cohort))
+                report(f"{tag} interleaved", check_interleaved(agent_kind, rng_kind, cohort))
+                report(f"{tag} threads", check_threads(agent_kind, rng_kind, cohort))
+
+        report(f"{agent_kind}/stdlib/packet global", check_global(agent_kind))
+
+    if failures:
+        raise SystemExit(f"{failures} determinism check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# experiments/check_frozen_parity.py
+#
+# Checks that FrozenPolicy (RLAgent.freeze) makes the decisions of the
+# learning agent with updates disabled (learn=False, epsilon=0).
+#
+# For each link: train an RLAgent closed-loop, then drive a fresh
+# environment with the reference agent while the frozen policy sees the
+# same observations. Every step the two must agree, or the frozen
+# action must tie the reference's on Q (the reference breaks ties at
+# random, the table deterministically). Runtime memory (best throughput
+# EMA, recent loss, previous rate) must stay identical throughout.
+# Also reports act() time and tracemalloc bytes per call for both.
+
+import copy
+import random
+import sys
+import time
+import tracemalloc
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from agents.rl_agent import RLAgent
+
+
+TRAIN_STEPS = 20_000
+EVAL_STEPS = 20_000
+SEED = 0
+
+# (capacity, queue_limit, base_rtt, noise_prob)
+LINKS = (
+    (6, 30, 6.0, 0.02),
+    (2, 10, 8.0, 0.1),
+    (20, 100, 4.0, 0.01),
+    (4, 15, 5.0, 0.2),
+)
+
+
+def make_env(capacity, queue_limit, base_rtt, noise_prob, rng):
+    link = Link(capacity, queue_limit, base_rtt, noise_prob, rng=rng)
+    return Environment(Sender(5), link, Receiver(rng=rng))
+
+
+def check(link_params, seed):
+    base_rtt = link_params[2]
+    rng = random.Random(seed)
+    env = make_env(*link_params, rng)
+    agent = RLAgent(base_rtt=base_rtt, rng=rng)
+    for _ in range(TRAIN_STEPS):
+        env.sender.adjust_rate(agent.act(env.step()))
+
+    reference = copy.deepcopy(agent)
+    reference.learn = False
+    reference.epsilon = 0
+    frozen = agent.freeze()
+
+    rng = random.Random(seed + 1)
+    reference.rng = rng
+    env = make_env(*link_params, rng)
+    zero = dict.fromkeys(reference.actions, 0.0)
+
+    exact = ties = failures = 0
+    for _ in range(EVAL_STEPS):
+        obs = env.step()
+        state = reference._get_state(obs)
+        a_ref = reference.act(obs)
+        a_frz = frozen.act(obs)
+
+        if a_ref == a_frz:
+            exact += 1
+        else:
+            q = reference.Q.get(state, zero)
+            if q[a_ref] == q[a_frz]:
+                ties += 1
+            else:
+                failures += 1
+
+        if (frozen.best_thr_ema, frozen.recent_loss, frozen.prev_send_rate) != \
+                (reference.best_thr_ema, reference.recent_loss, reference.prev_send_rate):
+            failures += 1
+        env.sender.adjust_rate(a_ref)
+
+    return exact, ties, failures, reference, frozen
+
+
+def per_call(agent, stream):
+    start = time.perf_counter()
+    for obs in stream:
+        agent.act(obs)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for obs in stream:
+        agent.act(obs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed / len(stream) * 1e6, (peak - before)
+
+
+def main():
+    print(f"{'Link':<22} | {'Exact':>6} | {'Ties':>5} | {'Fail':>4}")
+    print("-" * 46)
+    total_failures = 0
+    for i, params in enumerate(LINKS):
+        exact, ties, failures, reference, frozen = check(params, SEED + 10 * i)
+        total_failures += failures
+        print(f"{str(params):<22} | {exact:>6} | {ties:>5} | {failures:>4}")
+
+    # timing: the last link's agents on a fresh stream from that link
+    rng = random.Random(SEED)
+    env = make_env(*LINKS[-1], rng)
+    stream = [env.step() for _ in range(EVAL_STEPS)]
+    ref_us, ref_peak = per_call(reference, stream)
+    frz_us, frz_peak = per_call(frozen, stream)
+    print(f"\nact(): reference {ref_us:.2f} us/call (peak {ref_peak} B over the stream), "
+          f"frozen {frz_us:.2f} us/call (peak {frz_peak} B)")
+    print(f"table: {len(frozen.table)} entries, {frozen.table.itemsize * len(frozen.table)} bytes")
+
+    print("\nOK" if total_failures == 0 else f"\n{total_failures} FAILURES")
+    return 1 if total_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# experiments/comparison.py
+#
+# Reno-vs-RL side-by-side run, as driven by the dashboard (app_rl.py).
+#
+# ComparisonWorker steps both environments on a background thread and
+# publishes into a HistoryBuffer under a lock; the UI polls snapshot()
+# at its own frame rate. step_delay=0 runs as fast as the simulator
+# allows; step_delay > 0 paces the run for live viewing.
+#
+# Each environment draws from its own random.Random seeded from `seed`,
+# so a (parameters, seed) pair always produces the same run; the
+# dashboard caches finished runs on that key (metrics/cache.py).
+#
+# q_path warm-starts the RL agent from a table saved with RLAgent.save.
+#
+# profile=True attaches a sim.profiling.StageProfiler to each
+# environment and adds per-stage timings to snapshot().
+#
+# Run directly for a headless comparison.
+
+import random
+import threading
+import time
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.profiling import StageProfiler
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+from metrics.logger import HistoryBuffer
+
+
+HISTORY_COLUMNS = ("t", "L_Thr", "A_Thr", "L_Rate", "A_Rate", "L_EMA", "A_EMA", "L_Loss", "A_Loss")
+TOTAL_KEYS = ("L_Thr", "L_Rate", "L_EMA", "A_Thr", "A_Rate", "A_EMA")
+HISTORY_CAPACITY = 5000     # rows kept (oldest dropped beyond this)
+
+BASE_RTT = 5.0
+SEED = 0
+
+
+def make_env(noise, capacity, queue_limit, rng, profiler=None):
+    link = Link(capacity, queue_limit, BASE_RTT, noise, rng=rng)
+    return Environment(Sender(5), link, Receiver(rng=rng), profiler=profiler)
+
+
+def init_sims(noise, capacity, queue_limit, seed=SEED, profilers=(None, None), q_path=None):
+    rng_r = random.Random(f"{seed}:reno")
+    rng_a = random.Random(f"{seed}:rl")
+    env_r = make_env(noise, capacity, queue_limit, rng_r, profilers[0])
+    ag_r = RenoAgent()
+    env_a = make_env(noise, capacity, queue_limit, rng_a, profilers[1])
+    if q_path:
+        ag_a = RLAgent.load(q_path, base_rtt=BASE_RTT, rng=rng_a)
+    else:
+        ag_a = RLAgent(base_rtt=BASE_RTT, rng=rng_a)
+    return env_r, ag_r, env_a, ag_a
+
+
+class ComparisonWorker:
+    """
+    Runs the Reno and RL environments in lockstep on a daemon thread.
+
+    snapshot() is safe to call from any thread at any time; it returns
+    copies, so the caller never sees a half-written step. on_done, if
+    given, is called on the worker thread with the final snapshot of a
+    run that was not stopped early.
+
+    With profile=True, snapshot() also carries per-stage timings of
+    each environment; they may trail the step count by one step while
+    the run is live.
+    """
+
+    def __init__(
+        self,
+        noise,
+        capacity,
+        queue_limit,
+        sim_steps,
+        ema_alpha,
+        step_delay=0.0,
+        seed=SEED,
+        on_done=None,
+        profile=False,
+        q_path=None,
+    ):
+        self.sim_steps = sim_steps
+        self.ema_alpha = ema_alpha
+        self.step_delay = step_delay
+        self.on_done = on_done
+
+        self.profilers = (StageProfiler(), StageProfiler()) if profile else None
+        self.sims = init_sims(noise, capacity, queue_limit, seed, self.profilers or (None, None), q_path)
+        self.history = HistoryBuffer(HISTORY_COLUMNS, capacity=min(sim_steps, HISTORY_CAPACITY))
+        self.totals = dict.fromkeys(TOTAL_KEYS, 0.0)
+        self.t = 0
+        self.elapsed = 0.0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    # --------------------------------------------------
+    # Control
+    # --------------------------------------------------
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def done(self):
+        return not self._thread.is_alive() and self._thread.ident is not None
+
+    # --------------------------------------------------
+    # Simulation loop
+    # --------------------------------------------------
+
+    def _run(self):
+        env_r, ag_r, env_a, ag_a = self.sims
+        alpha = self.ema_alpha
+        ema_r, ema_a = BASE_RTT, BASE_RTT
+        totals = self.totals
+
+        start = time.perf_counter()
+        for t in range(1, self.sim_steps + 1):
+            if self._stop.is_set():
+                break
+
+            m_r = env_r.step()
+            m_a = env_a.step()
+
+            if m_r['avg_rtt'] > 0: ema_r = (1 - alpha) * ema_r + alpha * m_r['avg_rtt']
+            if m_a['avg_rtt'] > 0: ema_a = (1 - alpha) * ema_a + alpha * m_a['avg_rtt']
+
+            env_r.sender.adjust_rate(ag_r.act(m_r))
+            env_a.sender.adjust_rate(ag_a.act(m_a))
+
+            with self._lock:
+                totals["L_Thr"] += m_r['throughput']; totals["L_Rate"] += m_r['send_rate']; totals["L_EMA"] += ema_r
+                totals["A_Thr"] += m_a['throughput']; totals["A_Rate"] += m_a['send_rate']; totals["A_EMA"] += ema_a
+
+                self.history.append({
+                    "t": t, "L_Thr": m_r['throughput'], "A_Thr": m_a['throughput'],
+                    "L_Rate": m_r['send_rate'], "A_Rate": m_a['send_rate'],
+                    "L_EMA": ema_r, "A_EMA": ema_a,
+                    "L_Loss": m_r['loss'], "A_Loss": m_a['loss']
+                })
+                self.t = t
+                self.elapsed = time.perf_counter() - start
+
+            if self.step_delay:
+                time.sleep(self.step_delay)
+
+        if self.on_done is not None and not self._stop.is_set():
+            self.on_done(self.snapshot())
+
+    # --------------------------------------------------
+    # UI side
+    # --------------------------------------------------
+
+    def snapshot(self):
+        """
+        Consistent copy of the run so far:
+          t: steps completed
+          sim_steps: steps requested
+          averages: per-step mean of each TOTAL_KEYS entry
+          columns: {name: array} of retained history, oldest first
+          elapsed: simulation wall time in seconds
+          profile: {"reno": stats, "rl": stats} from
+                   StageProfiler.stats() (profile=True only)
+        """
+        with self._lock:
+            t = self.t
+            averages = {k: v / max(t, 1) for k, v in self.totals.items()}
+            columns = {name: self.history.column(name).copy() for name in HISTORY_COLUMNS}
+            elapsed = self.elapsed
+        snap = {
+            "t": t,
+            "sim_steps": self.sim_steps,
+            "averages": averages,
+            "columns": columns,
+            "elapsed": elapsed,
+        }
+        if self.profilers is not None:
+            snap["profile"] = {
+                "reno": self.profilers[0].stats(),
+                "rl": self.profilers[1].stats(),
+            }
+        return snap
+
+
+def main(noise=0.2, capacity=4, queue_limit=15, sim_steps=5000, ema_alpha=0.1, seed=SEED, profile=False):
+    worker = ComparisonWorker(noise, capacity, queue_limit, sim_steps, ema_alpha, seed=seed, profile=profile).start()
+    while not worker.done:
+        time.sleep(0.1)
+
+    snap = worker.snapshot()
+    print(f"{snap['t']} steps in {snap['elapsed']:.2f}s")
+    for key, val in snap["averages"].items():
+        print(f"{key:<7}: {val:.2f}")
+
+    if profile:
+        for name, prof in zip(("Reno", "RL"), worker.profilers):
+            print(f"\n{name} environment")
+            print(prof.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+# experiments/distributed_train.py
+#
+# Distributed training of one RLAgent Q table over many random links.
+#
+# M worker processes train in rounds. In every round each worker:
+#   1. copies the global Q table (shared memory) into a local RLAgent Q
+#   2. runs --envs-per-round fresh random links (robustness_test's
+#      make_random_environment) for --steps steps each, carrying its
+#      local Q from link to link
+#   3. writes its local Q and its per-(state, action) update counts for
+#      the round into its own slot of shared memory
+# The coordinator (this process) then merges the slots:
+#   Q[s, a] = sum_w n_w[s, a] * Q_w[s, a] / sum_w n_w[s, a]
+# (pairs nobody updated keep their value) and releases the next round.
+# Only dense float arrays cross processes, through
+# multiprocessing.shared_memory; rounds are separated by two barriers.
+#
+# Exploration decays per round: every link's agent starts at the
+# round's epsilon and decays it per step as RLAgent does (to
+# epsilon_min, then 0), so each link ends greedy, under RLAgent's
+# epsilon-0 masks and reward terms, as the table runs after loading.
+# The merged table is saved with the agents.qtable format, so it can be
+# warm-started anywhere RLAgent.load is accepted
+# (robustness_test.WARM_START, parallel_robustness --warm-start, the
+# dashboard). --eval N compares it, frozen, with agents learning from
+# scratch on N held-out links.
+#
+# The best-throughput EMA drives RLAgent's action masks (loaded at 0
+# with epsilon 0, the overshoot mask allows only decreases and the rate
+# collapses), and it is per link. Every agent, in the workers and in
+# --eval, therefore starts with best_thr_ema at its link's capacity
+# (link_anchor). The saved anchor is only a link-independent default:
+# a nominal base_rtt (pass the real one to RLAgent.load) and the mean
+# best-throughput / average-throughput EMAs of the last round's links.
+#
+# The exit status is 1 if the merged table, frozen, does not beat the
+# mean throughput / capacity of agents learning from scratch on the
+# --eval links.
+#
+# A watchdog thread aborts the round barrier if a worker dies (signal,
+# OOM kill), so the coordinator and the other workers do not wait
+# forever.
+#
+#   python -m experiments.distributed_train [--workers M] [--rounds R] [--out q.bin]
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from multiprocessing import Barrier, Process
+from threading import BrokenBarrierError
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from agents.rl_agent import RLAgent, N_STATES, STATES, encode_state
+from agents.qtable import save_q
+from experiments.robustness_test import make_random_environment
+
+
+ACTIONS = (-2, -1, 0, 1, 2)
+
+ROUNDS = 20
+ENVS_PER_ROUND = 8              # links per worker per round
+STEPS = 500                     # steps per link
+EPSILON = 0.2                   # round 0 exploration
+EPSILON_DECAY = 0.85            # per round
+EPSILON_MIN = 0.02
+SEED = 0
+
+EVAL_ENVS = 20
+EVAL_STEPS = 1000
+
+WATCH_INTERVAL = 1.0            # seconds between worker liveness checks
+
+
+# --------------------------------------------------
+# Shared memory
+# --------------------------------------------------
+
+def shared_array(shape, dtype=np.float64, name=None):
+    """
+    (array, SharedMemory) view of a new (name=None) or existing block.
+    """
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    shm = SharedMemory(name=name, create=name is None, size=size if name is None else 0)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf), shm
+
+
+def link_anchor(agent, env):
+    """
+    Start agent's best-throughput EMA at the link's capacity (packets
+    per step, the best throughput the link can deliver).
+    """
+    agent.best_thr_ema = float(env.link.capacity)
+
+
+def to_dict(q, visited):
+    return {
+        STATES[sid]: dict(zip(ACTIONS, row))
+        for sid, row in zip(np.flatnonzero(visited).tolist(), q[visited].tolist())
+    }
+
+
+# --------------------------------------------------
+# Worker
+# --------------------------------------------------
+
+def worker(index, names, n_workers, rounds, envs_per_round, steps, seed, barrier):
+    q_global, shm_g = shared_array((N_STATES, len(ACTIONS)), name=names["q"])
+    visited, shm_v = shared_array((N_STATES,), dtype=np.bool_, name=names["visited"])
+    q_slots, shm_q = shared_array((n_workers, N_STATES, len(ACTIONS)), name=names["slots"])
+    n_slots, shm_n = shared_array((n_workers, N_STATES, len(ACTIONS)), name=names["counts"])
+    stats, shm_s = shared_array((n_workers, 4), name=names["stats"])
+
+    action_index = {a: i for i, a in enumerate(ACTIONS)}
+    try:
+        for rnd in range(rounds):
+            epsilon = max(EPSILON_MIN, EPSILON * EPSILON_DECAY ** rnd)
+            Q = to_dict(q_global, visited)
+            counts = n_slots[index]
+            counts[:] = 0
+            util_sum = 0.0
+            util_n = 0
+            best_sum = avg_sum = 0.0
+
+            for k in range(envs_per_round):
+                rng = random.Random(f"{seed}:{index}:{rnd}:{k}")
+                env, base_rtt = make_random_environment(rng)
+                agent = RLAgent(base_rtt=base_rtt, actions=ACTIONS, epsilon=epsilon, rng=rng)
+                agent.Q = Q
+                link_anchor(agent, env)
+                capacity = env.link.capacity
+
+                for _ in range(steps):
+                    metrics = env.step()
+                    prev_state, prev_action = agent.prev_state, agent.prev_action
+                    env.sender.adjust_rate(agent.act(metrics))
+                    if prev_state is not None:
+                        counts[encode_state(prev_state), action_index[prev_action]] += 1
+                    util_sum += metrics["throughput"] / capacity
+                    util_n += 1
+                best_sum += agent.best_thr_ema
+                avg_sum += agent.avg_thr
+
+            slot = q_slots[index]
+            for state, values in Q.items():
+                slot[encode_state(state)] = [values[a] for a in ACTIONS]
+            stats[index] = (util_sum, util_n, best_sum / envs_per_round, avg_sum / envs_per_round)
+
+            barrier.wait()      # round done
+            barrier.wait()      # merged
+    except BaseException:
+        barrier.abort()         # unblock the coordinator and the other workers
+        raise
+    finally:
+        for shm in (shm_g, shm_v, shm_q, shm_n, shm_s):
+            shm.close()
+
+
+# --------------------------------------------------
+# Coordinator
+# --------------------------------------------------
+
+def merge(q_global, visited, q_slots, n_slots, total_counts):
+    """
+    Visit-count-weighted average of the worker tables into q_global.
+    """
+    n = n_slots.sum(axis=0)
+    updated = n > 0
+    weighted = (n_slots * q_slots).sum(axis=0)
+    q_global[updated] = weighted[updated] / n[updated]
+    total_counts += n
+    visited |= total_counts.sum(axis=1) > 0
+    return int(n.sum())
+
+
+def watch(procs, barrier, done):
+    """
+    Abort the barrier once any worker has exited with an error.
+    """
+    while not done.wait(WATCH_INTERVAL):
+        if any(p.exitcode not in (None, 0) for p in procs):
+            barrier.abort()
+            return
+
+
+def train(n_workers, rounds, envs_per_round, steps, seed):
+    shape = (N_STATES, len(ACTIONS))
+    q_global, shm_g = shared_array(shape)
+    visited, shm_v = shared_array((N_STATES,), dtype=np.bool_)
+    q_slots, shm_q = shared_array((n_workers,) + shape)
+    n_slots, shm_n = shared_array((n_workers,) + shape)
+    stats, shm_s = shared_array((n_workers, 4))
+    blocks = (shm_g, shm_v, shm_q, shm_n, shm_s)
+    q_global[:] = 0
+    visited[:] = False
+    total_counts = np.zeros(shape)
+
+    names = {"q": shm_g.name, "visited": shm_v.name, "slots": shm_q.name, "counts": shm_n.name, "stats": shm_s.name}
+    barrier = Barrier(n_workers + 1)
+    procs = [
+        Process(target=worker, args=(i, names, n_workers, rounds, envs_per_round, steps, seed, barrier))
+        for i in range(n_workers)
+    ]
+
+    print(f"{n_workers} workers x {envs_per_round} links x {steps} steps per round, {rounds} rounds\n")
+    print(f"{'Round':>5} | {'Epsilon':>7} | {'Updates':>8} | {'States':>6} | {'Util':>5} | {'Time':>6}")
+    print("-" * 50)
+    done = threading.Event()
+    watchdog = threading.Thread(target=watch, args=(procs, barrier, done), daemon=True)
+    try:
+        for p in procs:
+            p.start()
+        watchdog.start()
+        start = time.perf_counter()
+        for rnd in range(rounds):
+            t0 = time.perf_counter()
+            try:
+                barrier.wait()
+                updates = merge(q_global, visited, q_slots, n_slots, total_counts)
+                util = stats[:, 0].sum() / max(stats[:, 1].sum(), 1)
+                epsilon = max(EPSILON_MIN, EPSILON * EPSILON_DECAY ** rnd)
+                barrier.wait()
+            except BrokenBarrierError:
+                codes = {i: p.exitcode for i, p in enumerate(procs) if p.exitcode not in (None, 0)}
+                raise RuntimeError(f"round {rnd} aborted; failed workers (index: exit code): {codes}") from None
+            print(f"{rnd:>5} | {epsilon:>7.3f} | {updates:>8} | {int(visited.sum()):>6} | "
+                  f"{util:>5.2f} | {time.perf_counter() - t0:>5.1f}s")
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        links = n_workers * rounds * envs_per_round
+        print(f"\n{links} links, {links * steps:,} steps in {elapsed:.1f}s")
+        anchor = dict(
+            base_rtt=7.0,       # nominal, mid-range of the random links
+            best_thr_ema=stats[:, 2].mean(),
+            avg_thr=stats[:, 3].mean(),
+            epsilon=0.0,
+            recent_loss=0.0,
+            steps=0,
+        )
+        return q_global.copy(), visited.copy(), anchor
+    finally:
+        done.set()
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+# --------------------------------------------------
+# Evaluation
+# --------------------------------------------------
+
+def run_eval(agent, env, steps):
+    capacity = env.link.capacity
+    util, loss = [], []
+    for step in range(steps):
+        metrics = env.step()
+        env.sender.adjust_rate(agent.act(metrics))
+        if step >= steps // 2:
+            util.append(metrics["throughput"] / capacity)
+            loss.append(metrics["loss"])
+    return statistics.mean(util), statistics.mean(loss)
+
+
+def evaluate(path, n_envs, steps, seed):
+    rows = {"merged (frozen)": [], "from scratch": []}
+    for i in range(n_envs):
+        for name in rows:
+            rng = random.Random(f"{seed}:eval:{i}")
+            env, base_rtt = make_random_environment(rng)
+            if name == "from scratch":
+                agent = RLAgent(base_rtt=base_rtt, rng=rng)
+            else:
+                agent = RLAgent.load(path, base_rtt=base_rtt, rng=rng, learn=False)
+                link_anchor(agent, env)
+            rows[name].append(run_eval(agent, env, steps))
+
+    print(f"\nHeld-out: {n_envs} links x {steps} steps (second half)")
+    utils = {}
+    for name, results in rows.items():
+        utils[name] = statistics.mean(u for u, _ in results)
+        loss = statistics.mean(l for _, l in results)
+        print(f"  {name:<16} util={utils[name]:.3f} loss={loss:.3f}")
+    return utils["merged (frozen)"], utils["from scratch"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed RLAgent training with a merged shared Q table")
+    parser.add_argument("--workers", type=int, default=None, help="default: os.cpu_count()")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--envs-per-round", type=int, default=ENVS_PER_ROUND)
+    parser.add_argument("--steps", type=int, default=STEPS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default="rl_q.bin")
+    parser.add_argument("--eval", type=int, default=EVAL_ENVS, help="held-out links (0: skip)")
+    args = parser.parse_args()
+
+    n_workers = args.workers or os.cpu_count()
+    q, visited, anchor = train(n_workers, args.rounds, args.envs_per_round, args.steps, args.seed)
+
+    save_q(args.out, q, ACTIONS, visited, anchor)
+    print(f"saved {int(visited.sum())} states to {args.out} "
+          f"(anchor best_thr_ema={anchor['best_thr_ema']:.2f}, avg_thr={anchor['avg_thr']:.2f})")
+
+    if args.eval:
+        merged, scratch = evaluate(args.out, args.eval, EVAL_STEPS, args.seed)
+        if merged <= scratch:
+            print(f"FAIL: merged table util {merged:.3f} does not beat learning from scratch ({scratch:.3f})")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# experiments/parallel_robustness.py
+#
+# robustness_test.py fanned out over a process pool.
+#
+# Every environment draws all of its randomness (link parameters,
+# wireless loss, ACK jitter/loss, exploration) from its own
+# random.Random seeded from (seed, env index), so an environment's
+# trajectory does not depend on which worker runs it or when. Per-env
+# reports are printed as workers finish; the global summary is built
+# in env-index order and is identical for any worker count.
+#
+# --rng numpy swaps the per-env random.Random for sim.rng.BufferedRNG
+# (NumPy Generator seeded from [seed, index], block-drawn uniforms).
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sim.rng import BufferedRNG
+from agents.rl_agent import RLAgent
+from experiments.robustness_test import (
+    NUM_ENVS,
+    PRINT_LAST,
+    make_random_environment,
+    print_env_report,
+    print_global_summary,
+    run_single_env,
+)
+
+
+SEED = 0
+RNG_KIND = "stdlib"     # or "numpy"
+
+
+def env_rng(seed, index, kind=RNG_KIND):
+    """
+    Independent, reproducible RNG stream for one environment.
+    """
+    if kind == "numpy":
+        return BufferedRNG([seed, index])
+    return random.Random(f"{seed}:{index}")
+
+
+def run_env(seed, index, kind=RNG_KIND, warm_start=None):
+    """
+    Worker entry point: build, run and summarize one environment.
+    Only the printed tail and the stabilized series cross the process
+    boundary, not the full history.
+    """
+    rng = env_rng(seed, index, kind)
+    env, base_rtt = make_random_environment(rng)
+
+    if warm_start is not None:
+        agent = RLAgent.load(warm_start, base_rtt=base_rtt, epsilon_min=0.02, epsilon_decay=0.995, rng=rng)
+    else:
+        agent = RLAgent(
+            base_rtt=base_rtt,
+            epsilon=0.2,
+            epsilon_min=0.02,
+            epsilon_decay=0.995,
+            rng=rng,
+        )
+
+    (
+        _thr,
+        _ema_rtt,
+        _loss,
+        _util,
+        history,
+        stab_thr,
+        stab_loss,
+        stab_util,
+        stab_rtt,
+    ) = run_single_env(env, agent)
+
+    return {
+        "index": index,
+        "capacity": env.link.capacity,
+        "tail": history[-PRINT_LAST:],
+        "stab": (stab_thr, stab_loss, stab_util, stab_rtt),
+    }
+
+
+def main(num_envs=NUM_ENVS, workers=None, seed=SEED, rng_kind=RNG_KIND, warm_start=None):
+    workers = workers or os.cpu_count()
+    results = {}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_env, seed, i, rng_kind, warm_start) for i in range(num_envs)]
+
+        for future in as_completed(futures):
+            res = future.result()
+            results[res["index"]] = res
+            print_env_report(res["index"], res["capacity"], res["tail"], *res["stab"])
+    elapsed = time.perf_counter() - start
+
+    all_thr, all_rtt, all_loss, all_util = [], [], [], []
+    for i in range(num_envs):
+        stab_thr, stab_loss, stab_util, stab_rtt = results[i]["stab"]
+        all_thr.extend(stab_thr)
+        all_loss.extend(stab_loss)
+        all_util.extend(stab_util)
+        all_rtt.extend(stab_rtt)
+
+    print_global_summary(all_thr, all_rtt, all_loss, all_util)
+    print(f"\n{num_envs} envs on {workers} workers in {elapsed:.1f}s (seed={seed}, rng={rng_kind})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel robustness test")
+    parser.add_argument("--envs", type=int, default=NUM_ENVS)
+    parser.add_argument("--workers", type=int, default=None, help="default: os.cpu_count()")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--rng", choices=("stdlib", "numpy"), default=RNG_KIND)
+    parser.add_argument("--warm-start", default=None, help="Q table saved with RLAgent.save")
+    args = parser.parse_args()
+
+    main(num_envs=args.envs, workers=args.workers, seed=args.seed, rng_kind=args.rng, warm_start=args.warm_start)
@@ -0,0 +1,57 @@
+# experiments/profile_stages.py
+#
+# Where Environment.step spends its time: runs RL over a few link sizes
+# (packet and cohort mode) with a sim.profiling.StageProfiler attached
+# and prints the per-stage table and counters for each.
+#
+#   python -m experiments.profile_stages [--steps N]
+
+import argparse
+import random
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.profiling import StageProfiler
+from agents.rl_agent import RLAgent
+
+
+STEPS = 5000
+BASE_RTT = 6.0
+NOISE_PROB = 0.02
+SEED = 0
+
+# (capacity, queue_limit)
+LINKS = ((4, 20), (100, 500), (1000, 5000))
+
+
+def profile(capacity, queue_limit, cohort, steps):
+    rng = random.Random(SEED)
+    prof = StageProfiler()
+    env = Environment(
+        Sender(capacity, cohort=cohort),
+        Link(capacity, queue_limit, BASE_RTT, NOISE_PROB, cohort=cohort, rng=rng),
+        Receiver(cohort=cohort, rng=rng),
+        profiler=prof,
+    )
+    agent = RLAgent(base_rtt=BASE_RTT, rng=rng)
+    for _ in range(steps):
+        env.sender.adjust_rate(agent.act(env.step()))
+    return prof
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage Environment.step profile")
+    parser.add_argument("--steps", type=int, default=STEPS)
+    args = parser.parse_args()
+
+    for capacity, queue_limit in LINKS:
+        for cohort in (False, True):
+            mode = "cohort" if cohort else "packet"
+            print(f"\n=== capacity={capacity} queue_limit={queue_limit} {mode} mode ===")
+            print(profile(capacity, queue_limit, cohort, args.steps).summary())
+
+
+if __name__ == "__main__":
+    main()
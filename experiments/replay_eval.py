@@ -0,0 +1,127 @@
+# experiments/replay_eval.py
+#
+# Offline policy evaluation against traces on disk.
+#
+# 1. Generates a link-conditions trace (per-step capacity + uniform
+#    draws) and records one RL run on it as a metrics trace (npy).
+# 2. Open loop: each policy sees the recorded observations
+#    (sim.replay.TraceReplay) and we report how often it agrees with
+#    the recorded actions.
+# 3. Closed loop: each policy drives a live Sender over the recorded
+#    conditions (sim.replay.ConditionsReplay), so all policies face the
+#    same capacity changes and the same loss/jitter draws.
+#
+# Evaluations run on a process pool; workers get only the trace paths
+# and memory-map the files themselves.
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sim.sender import Sender
+from sim.replay import TraceReplay, ConditionsReplay, generate_conditions
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+from metrics.trace import TraceRecorder
+
+
+STEPS = 20_000
+SEGMENT = 1000          # steps between capacity changes
+QUEUE_LIMIT = 20
+BASE_RTT = 6.0
+NOISE_PROB = 0.03
+SEED = 0
+
+OBS_KEYS = ("throughput", "avg_rtt", "loss", "send_rate")
+
+
+def make_agent(kind, seed=SEED):
+    if kind == "reno":
+        return RenoAgent()
+    return RLAgent(base_rtt=BASE_RTT, rng=random.Random(seed))
+
+
+def run_closed_loop(conditions, kind, recorder=None):
+    env = ConditionsReplay(conditions, Sender(initial_rate=5), recorder=recorder)
+    agent = make_agent(kind)
+
+    thr, rtt, loss = [], [], []
+    for _ in range(env.steps):
+        metrics = env.step()
+        action = agent.act({k: metrics[k] for k in OBS_KEYS})
+        env.sender.adjust_rate(action)
+        if recorder is not None:
+            recorder.record_action(action)
+
+        thr.append(metrics["throughput"])
+        loss.append(metrics["loss"])
+        if metrics["avg_rtt"] > 0:
+            rtt.append(metrics["avg_rtt"])
+
+    return {
+        "thr": statistics.mean(thr),
+        "rtt": statistics.mean(rtt),
+        "loss": statistics.mean(loss),
+        "util": sum(thr) / int(np.sum(env.capacity)),
+    }
+
+
+def run_open_loop(trace, kind):
+    replay = TraceReplay(trace)
+    agent = make_agent(kind)
+
+    agree = 0
+    while not replay.done:
+        metrics = replay.step()
+        action = agent.act({k: metrics[k] for k in OBS_KEYS})
+        agree += action == replay.recorded_action()
+
+    return {"agree": agree / len(replay)}
+
+
+def main(steps=STEPS, workers=None, seed=SEED):
+    rng = np.random.default_rng(seed)
+    capacity = np.repeat(rng.integers(2, 9, steps // SEGMENT + 1), SEGMENT)[:steps]
+
+    with tempfile.TemporaryDirectory() as root:
+        conditions = os.path.join(root, "conditions")
+        trace = os.path.join(root, "rl_trace")
+
+        generate_conditions(conditions, capacity, QUEUE_LIMIT, BASE_RTT, NOISE_PROB, seed=seed)
+        with TraceRecorder(trace, format="npy") as recorder:
+            recorded = run_closed_loop(conditions, "rl", recorder)
+
+        kinds = ("reno", "rl")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            closed = dict(zip(kinds, pool.map(run_closed_loop, [conditions] * 2, kinds)))
+            opened = dict(zip(kinds, pool.map(run_open_loop, [trace] * 2, kinds)))
+
+    print(f"=== {steps} steps, capacity changes every {SEGMENT} (seed={seed}) ===")
+    print(f"{'Policy':<6} | {'Thr':>5} | {'Util':>5} | {'RTT':>6} | {'Loss':>5} | {'Agree':>6}")
+    print("-" * 48)
+    for kind in kinds:
+        c, o = closed[kind], opened[kind]
+        print(
+            f"{kind:<6} | "
+            f"{c['thr']:>5.2f} | "
+            f"{c['util']:>5.2f} | "
+            f"{c['rtt']:>6.2f} | "
+            f"{c['loss']:>5.2f} | "
+            f"{o['agree']:>6.1%}"
+        )
+    print(f"\nreplayed rl run identical to recorded run: {closed['rl'] == recorded}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline evaluation on recorded traces")
+    parser.add_argument("--steps", type=int, default=STEPS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    main(steps=args.steps, workers=args.workers, seed=args.seed)
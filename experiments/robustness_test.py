@@ -1,5 +1,6 @@
 # experiments/robustness_test.py
 
+import os
 import random
 import statistics
 
@@ -8,6 +9,7 @@ from sim.sender import Sender
 from sim.link import Link
 from sim.receiver import Receiver
 from agents.rl_agent import RLAgent
+from metrics.trace import TraceRecorder
 
 
 NUM_ENVS = 10
@@ -16,12 +18,16 @@ PRINT_LAST = 15
 
 EMA_ALPHA = 0.1   # RTT smoothing factor
 
+TRACE_DIR = None  # e.g. "traces/robustness": record env_XX/ traces (metrics.trace)
+WARM_START = None  # e.g. "models/rl_q.bin": start every agent from a saved table (RLAgent.save)
+SAVE_Q = None      # e.g. "models/rl_q.bin": save the last env's trained agent here
 
-def make_random_environment():
-    capacity = random.randint(2, 8)
-    queue_limit = random.randint(8, 40)
-    base_rtt = random.uniform(4.0, 10.0)
-    noise_prob = random.uniform(0.01, 0.05)
+
+def make_random_environment(rng=random):
+    capacity = rng.randint(2, 8)
+    queue_limit = rng.randint(8, 40)
+    base_rtt = rng.uniform(4.0, 10.0)
+    noise_prob = rng.uniform(0.01, 0.05)
 
     sender = Sender(initial_rate=capacity)
     link = Link(
@@ -29,14 +35,18 @@ def make_random_environment():
         queue_limit=queue_limit,
         base_rtt=base_rtt,
         noise_prob=noise_prob,
+        rng=rng,
     )
-    receiver = Receiver()
+    receiver = Receiver(rng=rng)
 
     env = Environment(sender, link, receiver)
     return env, base_rtt
 
 
-def run_single_env(env, agent):
+def run_single_env(env, agent, recorder=None):
+    if recorder is not None:
+        env.attach(recorder)
+
     thr, loss, util = [], [], []
     ema_rtt_series = []
     history = []
@@ -61,6 +71,8 @@ def run_single_env(env, agent):
 
         action = agent.act(obs)
         env.sender.adjust_rate(action)
+        if recorder is not None:
+            recorder.record_action(action)
 
         # --- EMA RTT update ---
         current_rtt = metrics["avg_rtt"]
@@ -111,12 +123,19 @@ def main():
         env, base_rtt = make_random_environment()
         capacity = env.link.capacity
 
-        agent = RLAgent(
-            base_rtt=base_rtt,
-            epsilon=0.2,
-            epsilon_min=0.02,
-            epsilon_decay=0.995,
-        )
+        if WARM_START is not None:
+            agent = RLAgent.load(WARM_START, base_rtt=base_rtt, epsilon_min=0.02, epsilon_decay=0.995)
+        else:
+            agent = RLAgent(
+                base_rtt=base_rtt,
+                epsilon=0.2,
+                epsilon_min=0.02,
+                epsilon_decay=0.995,
+            )
+
+        recorder = None
+        if TRACE_DIR is not None:
+            recorder = TraceRecorder(os.path.join(TRACE_DIR, f"env_{i:02d}"))
 
         (
             thr,
@@ -128,7 +147,9 @@ def main():
             stab_loss,
             stab_util,
             stab_rtt,
-        ) = run_single_env(env, agent)
+        ) = run_single_env(env, agent, recorder)
+        if recorder is not None:
+            recorder.close()
 
         # --- GLOBAL (stabilized only) ---
         if stab_thr:
@@ -137,35 +158,45 @@ def main():
             all_util.extend(stab_util)
             all_rtt.extend(stab_rtt)
 
-        print(f"\n=== Environment {i:02d} (capacity={capacity}) (last {PRINT_LAST} steps) ===")
-        print("Time | Rate | Thr | Cap | Util | AvgRTT | Loss | Action")
-        print("-" * 75)
-
-        for metrics, action, rtt_val in history[-PRINT_LAST:]:
-            u = metrics["delivered_packets"] / capacity
-            print(
-                f"{metrics['time']:>4} | "
-                f"{metrics['send_rate']:>4} | "
-                f"{metrics['throughput']:>3} | "
-                f"{capacity:>3} | "
-                f"{u:>4.2f} | "
-                f"{rtt_val:>6.2f} | "
-                f"{metrics['loss']:>4} | "
-                f"{action:>6}"
-            )
+        print_env_report(i, capacity, history[-PRINT_LAST:], stab_thr, stab_loss, stab_util, stab_rtt)
 
-        if stab_thr:
-            print(
-                f"Env {i:02d} Stabilized Avg → "
-                f"Thr={statistics.mean(stab_thr):.2f}, "
-                f"Util={statistics.mean(stab_util):.2f}, "
-                f"RTT={statistics.mean(stab_rtt):.2f}, "
-                f"Loss={statistics.mean(stab_loss):.2f}"
-            )
-        else:
-            print(f"Env {i:02d} Stabilized Avg → (no stabilized steps)")
+    print_global_summary(all_thr, all_rtt, all_loss, all_util)
+
+    if SAVE_Q is not None:
+        agent.save(SAVE_Q)
+
+
+def print_env_report(i, capacity, history_tail, stab_thr, stab_loss, stab_util, stab_rtt):
+    print(f"\n=== Environment {i:02d} (capacity={capacity}) (last {PRINT_LAST} steps) ===")
+    print("Time | Rate | Thr | Cap | Util | AvgRTT | Loss | Action")
+    print("-" * 75)
+
+    for metrics, action, rtt_val in history_tail:
+        u = metrics["delivered_packets"] / capacity
+        print(
+            f"{metrics['time']:>4} | "
+            f"{metrics['send_rate']:>4} | "
+            f"{metrics['throughput']:>3} | "
+            f"{capacity:>3} | "
+            f"{u:>4.2f} | "
+            f"{rtt_val:>6.2f} | "
+            f"{metrics['loss']:>4} | "
+            f"{action:>6}"
+        )
+
+    if stab_thr:
+        print(
+            f"Env {i:02d} Stabilized Avg → "
+            f"Thr={statistics.mean(stab_thr):.2f}, "
+            f"Util={statistics.mean(stab_util):.2f}, "
+            f"RTT={statistics.mean(stab_rtt):.2f}, "
+            f"Loss={statistics.mean(stab_loss):.2f}"
+        )
+    else:
+        print(f"Env {i:02d} Stabilized Avg → (no stabilized steps)")
 
 
+def print_global_summary(all_thr, all_rtt, all_loss, all_util):
     print("\n=== GLOBAL ROBUSTNESS SUMMARY (POST-STABILIZATION) ===")
     print(f"Avg Throughput  : {statistics.mean(all_thr):.2f}")
     print(f"Avg Utilization : {statistics.mean(all_util):.2f}")
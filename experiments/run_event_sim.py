@@ -0,0 +1,71 @@
+# experiments/run_event_sim.py
+#
+# Fixed-timestep Environment vs the discrete-event engine
+# (sim.event_sim) behind its per-timestep adapter, for Reno and RL on
+# the same link settings. The event engine measures RTT without
+# rounding to timesteps, so its avg_rtt is fractional and includes
+# real serialization delay (1 / capacity per packet).
+
+import random
+import statistics
+import time
+
+from sim.environment import Environment
+from sim.event_sim import EventEnvironment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+
+
+TOTAL_STEPS = 20_000
+SEED = 0
+
+# (name, capacity, queue_limit, base_rtt, noise_prob)
+LINKS = (
+    ("default", 6, 30, 6.0, 0.02),
+    ("slow", 2, 10, 8.0, 0.01),
+)
+
+
+def run(engine, kind, capacity, queue_limit, base_rtt, noise_prob):
+    rng = random.Random(SEED)
+    parts = (Sender(2), Link(capacity, queue_limit, base_rtt, noise_prob, rng=rng), Receiver(rng=rng))
+    env = EventEnvironment(*parts) if engine == "event" else Environment(*parts)
+    agent = RenoAgent() if kind == "reno" else RLAgent(base_rtt=base_rtt, rng=rng)
+
+    thr, rtt, loss = [], [], []
+    start = time.perf_counter()
+    for _ in range(TOTAL_STEPS):
+        metrics = env.step()
+        env.sender.adjust_rate(agent.act(metrics))
+        thr.append(metrics["throughput"])
+        loss.append(metrics["loss"])
+        if metrics["avg_rtt"] > 0:
+            rtt.append(metrics["avg_rtt"])
+    elapsed = time.perf_counter() - start
+
+    events = env.sim.events_processed / TOTAL_STEPS if engine == "event" else None
+    avg_rtt = statistics.mean(rtt) if rtt else 0.0
+    return statistics.mean(thr), avg_rtt, statistics.mean(loss), elapsed, events
+
+
+def main():
+    print(f"{TOTAL_STEPS} steps per run\n")
+    print(f"{'Link':<9} | {'Agent':<5} | {'Engine':<6} | {'Thr':>5} | {'RTT':>7} | {'Loss':>5} | {'us/step':>7} | {'ev/step':>7}")
+    print("-" * 72)
+    for name, *params in LINKS:
+        for kind in ("reno", "rl"):
+            for engine in ("step", "event"):
+                thr, rtt, loss, elapsed, events = run(engine, kind, *params)
+                ev = f"{events:>7.2f}" if events is not None else f"{'-':>7}"
+                print(
+                    f"{name:<9} | {kind:<5} | {engine:<6} | "
+                    f"{thr:>5.2f} | {rtt:>7.2f} | {loss:>5.2f} | "
+                    f"{elapsed / TOTAL_STEPS * 1e6:>7.1f} | {ev}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# experiments/run_scenarios.py
+#
+# Reno vs RL under time-varying links (sim.scenario):
+#   capacity_step   capacity halves, then recovers
+#   bursty_loss     Gilbert-Elliott wireless loss
+#   mmpp_capacity   Markov-modulated capacity (2 / 4 / 8)
+#   cross_traffic   on/off competing flow sharing the queue
+#   all             all of the above at once
+#
+# Also reports the per-step cost of driving the link from a scenario.
+
+import random
+import statistics
+import time
+
+import numpy as np
+
+from sim.environment import Environment
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.scenario import (
+    Scenario,
+    ScenarioEnvironment,
+    step_schedule,
+    gilbert_elliott,
+    markov_modulated,
+    on_off,
+)
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+
+
+STEPS = 20_000
+CAPACITY = 6
+QUEUE_LIMIT = 30
+BASE_RTT = 6.0
+NOISE_PROB = 0.02
+SEED = 0
+
+TIMING_STEPS = 100_000
+TIMING_REPEATS = 3
+
+
+def make_scenarios(steps, seed):
+    rng = np.random.default_rng(seed)
+    capacity_step = step_schedule(steps, CAPACITY, {steps // 3: CAPACITY // 2, 2 * steps // 3: CAPACITY})
+    bursty = gilbert_elliott(steps, p_good_bad=0.005, p_bad_good=0.05, loss_good=0.01, loss_bad=0.25, rng=rng)
+    mmpp = markov_modulated(
+        steps,
+        levels=[2, 4, 8],
+        transition=[[0.995, 0.005, 0.0], [0.0025, 0.995, 0.0025], [0.0, 0.005, 0.995]],
+        rng=rng,
+        start=1,
+    )
+    cross = on_off(steps, rate=2, mean_on=200, mean_off=400, rng=rng)
+
+    return {
+        "capacity_step": Scenario(steps, capacity=capacity_step),
+        "bursty_loss": Scenario(steps, noise_prob=bursty),
+        "mmpp_capacity": Scenario(steps, capacity=mmpp),
+        "cross_traffic": Scenario(steps, cross_traffic=cross),
+        "all": Scenario(steps, capacity=mmpp, noise_prob=bursty, cross_traffic=cross),
+    }
+
+
+def make_env(scenario, seed):
+    rng = random.Random(seed)
+    link = Link(CAPACITY, QUEUE_LIMIT, BASE_RTT, NOISE_PROB, rng=rng)
+    env = Environment(Sender(5), link, Receiver(rng=rng)) if scenario is None else \
+        ScenarioEnvironment(Sender(5), link, Receiver(rng=rng), scenario)
+    return env, rng
+
+
+def run(scenario, kind, steps, seed):
+    env, rng = make_env(scenario, seed)
+    agent = RenoAgent() if kind == "reno" else RLAgent(base_rtt=BASE_RTT, rng=rng)
+
+    thr, rtt, loss, util = [], [], [], []
+    for _ in range(steps):
+        metrics = env.step()
+        env.sender.adjust_rate(agent.act(metrics))
+
+        thr.append(metrics["throughput"])
+        loss.append(metrics["loss"])
+        util.append(metrics["delivered_packets"] / metrics.get("capacity", CAPACITY))
+        if metrics["avg_rtt"] > 0:
+            rtt.append(metrics["avg_rtt"])
+
+    return statistics.mean(thr), statistics.mean(util), statistics.mean(rtt), statistics.mean(loss)
+
+
+def time_steps(scenario, steps):
+    best = float("inf")
+    for _ in range(TIMING_REPEATS):
+        env, _ = make_env(scenario, SEED)
+        start = time.perf_counter()
+        for _ in range(steps):
+            env.step()
+        best = min(best, time.perf_counter() - start)
+    return best / steps * 1e6
+
+
+def main():
+    print(f"{'Scenario':<14} | {'Agent':<5} | {'Thr':>5} | {'Util':>5} | {'RTT':>6} | {'Loss':>5}")
+    print("-" * 55)
+    for name, scenario in make_scenarios(STEPS, SEED).items():
+        for kind in ("reno", "rl"):
+            thr, util, rtt, loss = run(scenario, kind, STEPS, SEED)
+            print(f"{name:<14} | {kind:<5} | {thr:>5.2f} | {util:>5.2f} | {rtt:>6.2f} | {loss:>5.2f}")
+
+    # fixed-rate sender, so both runs move the same traffic
+    full = make_scenarios(TIMING_STEPS, SEED)["all"]
+    static = Scenario(TIMING_STEPS, capacity=CAPACITY, base_rtt=BASE_RTT, noise_prob=NOISE_PROB)
+    base_us = time_steps(None, TIMING_STEPS)
+    static_us = time_steps(static, TIMING_STEPS)
+    full_us = time_steps(full, TIMING_STEPS)
+    print(f"\n{TIMING_STEPS} steps (best of {TIMING_REPEATS}): plain {base_us:.2f} us/step, "
+          f"static scenario {static_us:.2f} us/step ({static_us - base_us:+.2f}), "
+          f"full scenario {full_us:.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
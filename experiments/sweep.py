@@ -0,0 +1,227 @@
+# experiments/sweep.py
+#
+# Hyperparameter search for RLAgent: reward weights, masking thresholds,
+# alpha, gamma, epsilon_decay and osc_penalty.
+#
+# Candidates are sampled from a search space (SPACE, or --space JSON)
+# and scored on the same seeded random environments as
+# robustness_test (make_random_environment), on a process pool.
+# Successive halving: every candidate runs RUNGS[0] steps per
+# environment, the best 1/eta go on to RUNGS[1] steps (re-run from
+# scratch), and so on, so poor configurations are dropped after a few
+# hundred steps. Candidate 0 is always the current defaults.
+#
+# Score per environment, over the second half of the run:
+#   mean(throughput / capacity)
+#   - LOSS_WEIGHT * mean(loss / send_rate)
+#   - RTT_WEIGHT * mean(max(0, avg_rtt / base_rtt - 1))
+# averaged over environments. Results are ranked by the last rung
+# reached, then score, printed, and written to CSV.
+#
+#   python -m experiments.sweep [--candidates 32] [--envs 8] [--out sweep.csv]
+#
+# Space file: {"name": [low, high]} (uniform), {"name": {"low": ..,
+# "high": .., "log": true}} or {"name": {"choices": [...]}}. Names are
+# RLAgent arguments, or "reward.<key>" / "mask.<key>" for entries of
+# REWARD_WEIGHTS / MASK_THRESHOLDS.
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from agents.rl_agent import RLAgent, REWARD_WEIGHTS, MASK_THRESHOLDS
+from experiments.robustness_test import make_random_environment
+
+
+SPACE = {
+    "reward.efficiency": [1.0, 3.0],
+    "reward.delivery": [0.5, 2.5],
+    "reward.rtt": [0.5, 2.0],
+    "reward.low_delivery": [0.5, 4.0],
+    "reward.anchor": [0.5, 3.0],
+    "mask.ramp": [0.6, 0.8],
+    "mask.ramp_greedy": [0.4, 0.65],
+    "mask.heavy_loss": [0.1, 0.3],
+    "mask.loss": [0.04, 0.12],
+    "mask.overshoot": [1.2, 2.0],
+    "alpha": {"low": 0.02, "high": 0.3, "log": True},
+    "gamma": [0.8, 0.99],
+    "epsilon_decay": [0.99, 0.999],
+    "osc_penalty": [0.0, 0.5],
+}
+
+DEFAULTS = {
+    **{f"reward.{k}": v for k, v in REWARD_WEIGHTS.items()},
+    **{f"mask.{k}": v for k, v in MASK_THRESHOLDS.items()},
+    "alpha": 0.1,
+    "gamma": 0.9,
+    "epsilon_decay": 0.995,
+    "osc_penalty": 0.2,
+}
+
+CANDIDATES = 32
+NUM_ENVS = 8
+RUNGS = (250, 500, 1000, 2000)      # steps per environment at each rung
+ETA = 2                             # keep the best 1/ETA at each rung
+SEED = 0
+
+LOSS_WEIGHT = 1.0
+RTT_WEIGHT = 0.25
+
+
+# --------------------------------------------------
+# Search space
+# --------------------------------------------------
+
+def sample(space, rng):
+    params = {}
+    for name, spec in space.items():
+        if isinstance(spec, dict) and "choices" in spec:
+            params[name] = rng.choice(spec["choices"])
+            continue
+        if isinstance(spec, dict):
+            low, high, log = spec["low"], spec["high"], spec.get("log", False)
+        else:
+            (low, high), log = spec, False
+        if log:
+            params[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            params[name] = rng.uniform(low, high)
+    return params
+
+
+def make_agent(params, base_rtt, rng):
+    kwargs, reward, mask = {}, {}, {}
+    for name, value in params.items():
+        group, _, key = name.rpartition(".")
+        if group == "reward":
+            reward[key] = value
+        elif group == "mask":
+            mask[key] = value
+        else:
+            kwargs[name] = value
+    return RLAgent(base_rtt=base_rtt, rng=rng, reward_weights=reward, mask_thresholds=mask, **kwargs)
+
+
+# --------------------------------------------------
+# Evaluation (worker side)
+# --------------------------------------------------
+
+def evaluate(params, env_index, steps, seed):
+    """
+    Score one candidate on one environment. The environment (link
+    parameters and its noise) and the agent draw from separate streams
+    seeded by (seed, env_index): every candidate gets the same link,
+    and the agent's draws do not shift the link's noise. Conditions
+    still diverge once candidates send different packets.
+    """
+    env, base_rtt = make_random_environment(random.Random(f"{seed}:env{env_index}"))
+    agent = make_agent(params, base_rtt, random.Random(f"{seed}:agent{env_index}"))
+    capacity = env.link.capacity
+
+    util = loss = rtt = 0.0
+    counted = 0
+    for step in range(steps):
+        metrics = env.step()
+        env.sender.adjust_rate(agent.act(metrics))
+        if step >= steps // 2:
+            counted += 1
+            util += metrics["throughput"] / capacity
+            loss += metrics["loss"] / max(metrics["send_rate"], 1)
+            if metrics["avg_rtt"] > 0:
+                rtt += max(0.0, metrics["avg_rtt"] / base_rtt - 1)
+
+    return (util - LOSS_WEIGHT * loss - RTT_WEIGHT * rtt) / max(counted, 1)
+
+
+# --------------------------------------------------
+# Successive halving
+# --------------------------------------------------
+
+def successive_halving(candidates, num_envs, rungs, eta, seed, pool):
+    """
+    Returns {candidate index: (rung reached, score at that rung)}.
+    """
+    results = {}
+    alive = list(range(len(candidates)))
+
+    for rung, steps in enumerate(rungs):
+        start = time.perf_counter()
+        futures = {
+            (c, e): pool.submit(evaluate, candidates[c], e, steps, seed)
+            for c in alive
+            for e in range(num_envs)
+        }
+        scores = {
+            c: statistics.mean(futures[c, e].result() for e in range(num_envs))
+            for c in alive
+        }
+        for c, score in scores.items():
+            results[c] = (rung, score)
+
+        print(f"rung {rung}: {len(alive):>3} candidates x {num_envs} envs x {steps} steps "
+              f"in {time.perf_counter() - start:.1f}s, best {max(scores.values()):.4f}")
+
+        if rung + 1 < len(rungs):
+            keep = max(1, len(alive) // eta)
+            alive = sorted(alive, key=lambda c: scores[c], reverse=True)[:keep]
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive-halving sweep over RLAgent hyperparameters")
+    parser.add_argument("--space", default=None, help="JSON search space (default: SPACE)")
+    parser.add_argument("--candidates", type=int, default=CANDIDATES)
+    parser.add_argument("--envs", type=int, default=NUM_ENVS)
+    parser.add_argument("--rungs", type=int, nargs="+", default=list(RUNGS), help="steps per rung")
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--workers", type=int, default=None, help="default: os.cpu_count()")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default="sweep_results.csv")
+    parser.add_argument("--top", type=int, default=10, help="rows to print")
+    args = parser.parse_args()
+
+    space = SPACE
+    if args.space is not None:
+        with open(args.space) as f:
+            space = json.load(f)
+    unknown = set(space) - set(DEFAULTS)
+    if unknown:
+        parser.error(f"unknown parameters in search space: {sorted(unknown)}")
+
+    rng = random.Random(args.seed)
+    baseline = {name: DEFAULTS[name] for name in space}
+    candidates = [baseline] + [sample(space, rng) for _ in range(args.candidates - 1)]
+
+    workers = args.workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = successive_halving(candidates, args.envs, args.rungs, args.eta, args.seed, pool)
+
+    ranked = sorted(results, key=lambda c: results[c], reverse=True)
+    names = list(space)
+    with open(args.out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "candidate", "rung", "steps", "score"] + names)
+        for rank, c in enumerate(ranked, 1):
+            rung, score = results[c]
+            writer.writerow([rank, c, rung, args.rungs[rung], f"{score:.6f}"] + [candidates[c][n] for n in names])
+
+    print(f"\n{'Rank':>4} | {'Cand':>4} | {'Steps':>5} | {'Score':>8} | Parameters")
+    print("-" * 100)
+    for rank, c in enumerate(ranked[:args.top], 1):
+        rung, score = results[c]
+        params = ", ".join(f"{n}={candidates[c][n]:.3g}" for n in names)
+        tag = " (defaults)" if c == 0 else ""
+        print(f"{rank:>4} | {c:>4} | {args.rungs[rung]:>5} | {score:>8.4f} | {params}{tag}")
+    print(f"\nwrote {len(ranked)} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# experiments/train_mlp_agent.py
+#
+# Train agents.mlp_agent.MLPAgent on the vectorized BatchEnvironment
+# (CPU only), then check it against the deployment budget.
+#
+# Training: EPOCHS rounds of NUM_ENVS fresh random links
+# (batch_robustness.make_random_batch) stepped in lockstep for STEPS
+# steps; one forward pass and one TD update per step for all links.
+# The model is saved with MLPAgent.save.
+#
+# Evaluation: the saved model (frozen, greedy) drives single
+# Environments on held-out links (robustness_test ranges) next to an
+# RLAgent learning from scratch and RenoAgent.
+#
+# Benchmark: act() latency on one observation stream
+# (agent_budget.record_stream), batched act_batch() throughput at
+# BATCH_SIZES, and the model file size. Exit status is 1 if p99.9
+# latency or model size is over budget.
+#
+#   python -m experiments.train_mlp_agent [--hidden 16] [--epochs 20] [--out mlp_agent.npz]
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from agents.mlp_agent import MLPAgent
+from agents.reno_agent import RenoAgent
+from agents.rl_agent import RLAgent
+from experiments.agent_budget import record_stream, latencies_ns, LATENCY_BUDGET_MS, MODEL_BUDGET_MB
+from experiments.batch_robustness import make_random_batch
+from experiments.distributed_train import run_eval
+from experiments.robustness_test import make_random_environment
+
+
+HIDDEN = 16
+EPOCHS = 20
+NUM_ENVS = 256
+STEPS = 500
+LR = 0.01
+EPSILON = 0.3
+EPSILON_DECAY = 0.999           # per step (shared by all envs)
+SEED = 0
+
+EVAL_ENVS = 20
+EVAL_STEPS = 1000
+
+BENCH_STEPS = 20_000
+BATCH_SIZES = (1, 100, 1_000, 10_000)
+
+
+# --------------------------------------------------
+# Training
+# --------------------------------------------------
+
+def train(hidden, epochs, num_envs, steps, seed):
+    rng = np.random.default_rng(seed)
+    agent = MLPAgent(
+        base_rtt=np.ones(num_envs),
+        n_envs=num_envs,
+        hidden=hidden,
+        lr=LR,
+        epsilon=EPSILON,
+        epsilon_decay=EPSILON_DECAY,
+        rng=np.random.default_rng(seed + 1),
+    )
+
+    print(f"{epochs} epochs x {num_envs} links x {steps} steps, hidden={hidden}\n")
+    print(f"{'Epoch':>5} | {'Epsilon':>7} | {'Util':>5} | {'Loss':>6} | {'Time':>6}")
+    print("-" * 42)
+    start = time.perf_counter()
+    for epoch in range(epochs):
+        t0 = time.perf_counter()
+        env, base_rtt = make_random_batch(num_envs, rng, seed + 2 + epoch)
+        agent.base_rtt = base_rtt
+        agent.reset()
+
+        util = loss = 0.0
+        actions = None
+        for step in range(steps):
+            metrics = env.step(actions)
+            actions = agent.act_batch(metrics)
+            if step >= steps // 2:
+                util += (metrics["throughput"] / env.capacity).mean()
+                loss += metrics["loss"].mean()
+
+        half = steps - steps // 2
+        print(f"{epoch:>5} | {agent.epsilon:>7.3f} | {util / half:>5.2f} | {loss / half:>6.3f} | "
+              f"{time.perf_counter() - t0:>5.1f}s")
+
+    links = epochs * num_envs
+    print(f"\n{links} links, {links * steps:,} env-steps in {time.perf_counter() - start:.1f}s")
+    return agent
+
+
+# --------------------------------------------------
+# Evaluation
+# --------------------------------------------------
+
+def evaluate(path, n_envs, steps, seed):
+    makers = {
+        "mlp (frozen)": lambda base_rtt, rng: MLPAgent.load(
+            path, base_rtt, epsilon=0.0, learn=False, rng=rng),
+        "rl (scratch)": lambda base_rtt, rng: RLAgent(base_rtt=base_rtt, rng=rng),
+        "reno": lambda base_rtt, rng: RenoAgent(),
+    }
+    rows = {name: [] for name in makers}
+    for i in range(n_envs):
+        for name, make in makers.items():
+            rng = random.Random(f"{seed}:eval:{i}")
+            env, base_rtt = make_random_environment(rng)
+            rows[name].append(run_eval(make(base_rtt, rng), env, steps))
+
+    print(f"\nHeld-out: {n_envs} links x {steps} steps (second half)")
+    for name, results in rows.items():
+        util = statistics.mean(u for u, _ in results)
+        loss = statistics.mean(l for _, l in results)
+        print(f"  {name:<14} util={util:.3f} loss={loss:.3f}")
+
+
+# --------------------------------------------------
+# Benchmark
+# --------------------------------------------------
+
+def benchmark(path, seed):
+    stream, _ = record_stream(BENCH_STEPS, seed)
+    agent = MLPAgent.load(path, 6.0, epsilon=0.0, learn=False, rng=np.random.default_rng(0))
+    lat = latencies_ns(agent, stream)
+    p50, p99, p999 = np.percentile(lat, [50, 99, 99.9]) / 1e3
+    print(f"\nact() on {BENCH_STEPS} observations: p50 {p50:.1f} us, p99 {p99:.1f} us, p99.9 {p999:.1f} us")
+
+    print(f"\n{'Batch':>6} | {'us/step':>8} | {'us/env':>7}")
+    print("-" * 28)
+    for n in BATCH_SIZES:
+        env, base_rtt = make_random_batch(n, np.random.default_rng(seed), seed)
+        batch = MLPAgent.load(path, base_rtt, n_envs=n, epsilon=0.0, learn=False, rng=np.random.default_rng(0))
+        metrics = [env.step() for _ in range(50)]
+        t0 = time.perf_counter()
+        for m in metrics:
+            batch.act_batch(m)
+        per_step = (time.perf_counter() - t0) / len(metrics) * 1e6
+        print(f"{n:>6} | {per_step:>8.1f} | {per_step / n:>7.3f}")
+
+    size = os.path.getsize(path)
+    print(f"\nmodel file: {size:,} bytes")
+    return p999 / 1e3 <= LATENCY_BUDGET_MS and size <= MODEL_BUDGET_MB * 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and benchmark the MLP function-approximation agent")
+    parser.add_argument("--hidden", type=int, default=HIDDEN, help="hidden units (0: linear)")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--envs", type=int, default=NUM_ENVS)
+    parser.add_argument("--steps", type=int, default=STEPS)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default="mlp_agent.npz")
+    parser.add_argument("--eval", type=int, default=EVAL_ENVS, help="held-out links (0: skip)")
+    args = parser.parse_args()
+
+    agent = train(args.hidden, args.epochs, args.envs, args.steps, args.seed)
+    agent.save(args.out)
+    print(f"saved to {args.out}")
+
+    if args.eval:
+        evaluate(args.out, args.eval, EVAL_STEPS, args.seed)
+
+    ok = benchmark(args.out, args.seed)
+    print("budget: " + ("ok" if ok else "OVER"))
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
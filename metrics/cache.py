@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "antar-drishti", "results")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ResultCache:
+    """
+    On-disk, content-addressed store of finished comparison runs.
+
+    A run is keyed by the SHA-256 of its parameters (canonical JSON), so
+    the same sliders + seed always map to the same file. Entries are
+    .npz files holding the snapshot's history columns and averages.
+    Recency is the file's mtime (touched on every hit); when the total
+    size passes max_bytes the least recently used entries are deleted.
+
+    Being plain files, entries survive Streamlit reruns, sessions and
+    restarts on the same host. Writes go through a temp file and
+    os.replace, so concurrent sessions never read a partial entry.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(params):
+        blob = json.dumps(params, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    # --------------------------------------------------
+    # Lookup / store
+    # --------------------------------------------------
+
+    def get(self, params):
+        """
+        Cached snapshot for params, or None.
+        """
+        path = self._path(self.key(params))
+        try:
+            with np.load(path) as data:
+                snap = {
+                    "t": int(data["t"]),
+                    "sim_steps": int(data["sim_steps"]),
+                    "elapsed": float(data["elapsed"]),
+                    "averages": {k[4:]: float(data[k]) for k in data.files if k.startswith("avg_")},
+                    "columns": {k[4:]: data[k] for k in data.files if k.startswith("col_")},
+                }
+            os.utime(path)                  # mark as recently used
+        except (OSError, KeyError, ValueError):
+            return None                     # missing, evicted meanwhile, or corrupt
+        return snap
+
+    def put(self, params, snap):
+        arrays = {
+            "t": snap["t"],
+            "sim_steps": snap["sim_steps"],
+            "elapsed": snap["elapsed"],
+        }
+        arrays.update({"avg_" + k: v for k, v in snap["averages"].items()})
+        arrays.update({"col_" + k: v for k, v in snap["columns"].items()})
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self._path(self.key(params)))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        self._evict()
+
+    # --------------------------------------------------
+    # LRU eviction
+    # --------------------------------------------------
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())   # oldest first
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, name in self._entries():
+            try:
+                os.unlink(os.path.join(self.directory, name))
+            except OSError:
+                pass
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def jain_index(values):
+    """
+    Jain's fairness index of a set of allocations:
+    (sum x)^2 / (n * sum x^2), 1 when all equal, 1/n when one flow
+    gets everything. Defined as 1 when every allocation is zero.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    sq = np.dot(x, x)
+    if sq == 0:
+        return 1.0
+    return float(x.sum() ** 2 / (len(x) * sq))
+
+
+class FairnessTracker:
+    """
+    Per-flow throughput accounting for a multi-flow run.
+
+    Keeps run totals per flow and a sliding window of the last `window`
+    steps, and records the Jain index of the windowed throughputs
+    every step. Memory is O(window * flows + steps).
+
+    The convergence time is the first step from which the windowed
+    index stays >= threshold for the rest of the run.
+    """
+
+    def __init__(self, n_flows, window=100, threshold=0.9):
+        self.n_flows = n_flows
+        self.window = window
+        self.threshold = threshold
+
+        self.totals = np.zeros(n_flows)
+        self._ring = np.zeros((window, n_flows))
+        self._window_sum = np.zeros(n_flows)
+        self.steps = 0
+        self.jain = []              # windowed index per step
+
+    def update(self, throughputs):
+        x = np.asarray(throughputs, dtype=np.float64)
+        slot = self.steps % self.window
+        self._window_sum += x - self._ring[slot]
+        self._ring[slot] = x
+        self.totals += x
+        self.steps += 1
+        self.jain.append(jain_index(self._window_sum))
+
+    def mean_throughput(self):
+        return self.totals / max(self.steps, 1)
+
+    def overall_jain(self):
+        """
+        Jain index of whole-run mean throughputs.
+        """
+        return jain_index(self.totals)
+
+    def convergence_time(self):
+        """
+        Step at which the windowed index settled above threshold, or
+        None if it is below threshold at the end of the run.
+        """
+        below = np.flatnonzero(np.asarray(self.jain) < self.threshold)
+        if len(below) == 0:
+            return 0
+        last = int(below[-1])
+        return None if last == self.steps - 1 else last + 1
@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class HistoryBuffer:
+    """
+    Fixed-size columnar history of per-step metrics.
+
+    Each column is a preallocated float64 ring of `capacity` rows, so
+    appending is O(1) and memory does not grow with run length. Once
+    full, the oldest rows are overwritten; column() always returns the
+    retained rows oldest-first.
+    """
+
+    def __init__(self, columns, capacity):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._data = np.zeros((len(self.columns), capacity))
+        self._index = {name: i for i, name in enumerate(self.columns)}
+        self.total = 0              # rows ever appended
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, row):
+        """
+        row: mapping with a value for every column.
+        """
+        slot = self.total % self.capacity
+        data = self._data
+        for i, name in enumerate(self.columns):
+            data[i, slot] = row[name]
+        self.total += 1
+
+    def column(self, name):
+        """
+        Retained values of one column, oldest first (a view while the
+        ring has not wrapped, a copy after).
+        """
+        row = self._data[self._index[name]]
+        if self.total <= self.capacity:
+            return row[:self.total]
+        start = self.total % self.capacity
+        return np.concatenate((row[start:], row[:start]))
+
+    def last(self, name):
+        return self._data[self._index[name], (self.total - 1) % self.capacity]
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most `threshold` points of (x, y) that
+    keep the visual shape of the series: the first and last points,
+    plus, from each of threshold - 2 equal buckets in between, the
+    point forming the largest triangle with the previously kept point
+    and the mean of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # bucket b covers [edges[b], edges[b + 1]) over points 1 .. n-2
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            avg_x = x[nlo:nhi].mean()
+            avg_y = y[nlo:nhi].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a])
+            - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        kept[b + 1] = a
+
+    return kept
+
+
+def lttb(x, y, threshold):
+    """
+    (x, y) downsampled to at most `threshold` points with LTTB.
+    """
+    idx = lttb_indices(x, y, threshold)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def stride_indices(n, max_points):
+    """
+    At most max_points evenly spaced indices into n points, always
+    including the most recent one. For scatter plots, where there is
+    no line shape for LTTB to preserve.
+    """
+    if n <= max_points:
+        return np.arange(n)
+    return np.linspace(0, n - 1, max_points).round().astype(np.int64)
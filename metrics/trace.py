@@ -0,0 +1,232 @@
+import glob
+import json
+import operator
+import os
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:         # parquet output is optional
+    pa = pq = None
+
+
+# column -> dtype, in file order
+TRACE_COLUMNS = {
+    "time": np.int64,
+    "send_rate": np.int64,
+    "throughput": np.int64,
+    "avg_rtt": np.float64,
+    "loss": np.int64,
+    "congestion_drops": np.int64,
+    "wireless_drops": np.int64,
+    "inferred_loss": np.int64,
+    "action": np.int64,
+}
+METRIC_COLUMNS = tuple(name for name in TRACE_COLUMNS if name != "action")
+
+FORMATS = ("npz", "npy", "parquet")
+DEFAULT_CHUNK_SIZE = 65536
+META_FILE = "trace.json"
+
+
+class TraceRecorder:
+    """
+    Columnar recorder for Environment.step metrics.
+
+    Rows go into one preallocated chunk of typed NumPy columns (the
+    fields of a structured array, so a step is a single row store);
+    when the chunk is full it is written out and the same buffer is
+    reused, so at most chunk_size rows are ever held in memory.
+
+    Output is a directory holding, by format:
+      npz      one file per chunk (chunk_000000.npz, ...)
+      npy      one <column>.npy per column, appended to chunk by chunk;
+               memory-mappable (see sim.replay)
+      parquet  a single trace.parquet, one row group per chunk (needs
+               pyarrow)
+    close() writes the last partial chunk and trace.json (row count,
+    chunk size, column dtypes).
+
+    The action column is filled by record_action() after the agent has
+    acted on the step just recorded; steps without one record 0.
+    """
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE, format="npz"):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, got {format!r}")
+        if format == "parquet" and pq is None:
+            raise ImportError("format='parquet' requires pyarrow")
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.format = format
+        os.makedirs(path, exist_ok=True)
+
+        self._rows = np.zeros(
+            chunk_size,
+            dtype=[(name, TRACE_COLUMNS[name]) for name in METRIC_COLUMNS],
+        )
+        self._actions = np.zeros(chunk_size, dtype=TRACE_COLUMNS["action"])
+        self._get_row = operator.itemgetter(*METRIC_COLUMNS)
+
+        self.n = 0                  # rows in the current chunk
+        self.rows = 0               # rows flushed to disk
+        self.chunks = 0
+        self._writer = None         # parquet only
+        self._files = None          # npy only: column -> open file
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows + self.n
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+
+    def record(self, metrics):
+        """
+        Append one step's metrics (an Environment.step dict).
+        """
+        n = self.n
+        if n == self.chunk_size:
+            self.flush()
+            n = 0
+        self._rows[n] = self._get_row(metrics)
+        self.n = n + 1
+
+    def record_action(self, action):
+        """
+        Set the action column of the most recently recorded step.
+        """
+        self._actions[self.n - 1] = action
+
+    def columns(self):
+        """
+        {column: array} views of the buffered (not yet flushed) rows.
+        """
+        n = self.n
+        cols = {name: self._rows[name][:n] for name in METRIC_COLUMNS}
+        cols["action"] = self._actions[:n]
+        return cols
+
+    # --------------------------------------------------
+    # Output
+    # --------------------------------------------------
+
+    def flush(self):
+        """
+        Write the buffered rows out as one chunk and empty the buffer.
+        """
+        n = self.n
+        if n == 0:
+            return
+
+        cols = self.columns()
+        if self.format == "parquet":
+            table = pa.table({name: np.ascontiguousarray(col) for name, col in cols.items()})
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(
+                    os.path.join(self.path, "trace.parquet"), table.schema
+                )
+            self._writer.write_table(table)
+        elif self.format == "npy":
+            if self._files is None:
+                self._open_npy()
+            for name, col in cols.items():
+                self._files[name].write(np.ascontiguousarray(col).tobytes())
+        else:
+            chunk_path = os.path.join(self.path, f"chunk_{self.chunks:06d}.npz")
+            np.savez(chunk_path, **cols)
+
+        self._actions[:n] = 0
+        self.rows += n
+        self.chunks += 1
+        self.n = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        if self.format == "npy":
+            if self._files is None:
+                self._open_npy()
+            for name, f in self._files.items():
+                # header is padded for growth, so rewriting it in place
+                # with the final length never shifts the data
+                f.seek(0)
+                _write_npy_header(f, TRACE_COLUMNS[name], self.rows)
+                f.close()
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(
+                {
+                    "format": self.format,
+                    "rows": self.rows,
+                    "chunk_size": self.chunk_size,
+                    "columns": {k: np.dtype(v).name for k, v in TRACE_COLUMNS.items()},
+                },
+                f,
+                indent=2,
+            )
+        self.closed = True
+
+
+    def _open_npy(self):
+        self._files = {}
+        for name, dtype in TRACE_COLUMNS.items():
+            f = open(os.path.join(self.path, f"{name}.npy"), "wb")
+            _write_npy_header(f, dtype, 0)
+            self._files[name] = f
+
+
+def _write_npy_header(f, dtype, length):
+    np.lib.format.write_array_header_1_0(
+        f,
+        {
+            "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+            "fortran_order": False,
+            "shape": (length,),
+        },
+    )
+
+
+def load_trace(path, mmap=False):
+    """
+    Read a whole recorded trace back as {column: array}.
+    For offline analysis of traces that fit in memory; npy traces can
+    instead be opened with mmap=True (read-only memory maps).
+    """
+    with open(os.path.join(path, META_FILE)) as f:
+        meta = json.load(f)
+
+    if meta["format"] == "parquet":
+        if pq is None:
+            raise ImportError("reading a parquet trace requires pyarrow")
+        table = pq.read_table(os.path.join(path, "trace.parquet"))
+        return {name: table.column(name).to_numpy() for name in meta["columns"]}
+
+    if meta["format"] == "npy":
+        mode = "r" if mmap else None
+        return {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in meta["columns"]
+        }
+
+    parts = {name: [] for name in meta["columns"]}
+    for chunk_path in sorted(glob.glob(os.path.join(path, "chunk_*.npz"))):
+        with np.load(chunk_path) as chunk:
+            for name in parts:
+                parts[name].append(chunk[name])
+    return {
+        name: np.concatenate(arrays) if arrays else np.zeros(0, dtype=meta["columns"][name])
+        for name, arrays in parts.items()
+    }
@@ -0,0 +1,404 @@
+import numpy as np
+
+
+class BatchEnvironment:
+    """
+    N independent Sender/Link/Receiver instances stepped in lockstep.
+
+    All state lives in NumPy arrays and packets are tracked as counts
+    per send timestep (one cohort per env per step), as in cohort mode:
+
+      inflight[N, H]   outstanding packets by send slot (send_time % H)
+      queue[N, H]      packets waiting in the link, by send slot
+      pending[W]       ACKs due at each ack slot, as sparse
+                       (env, send slot, count) triplets
+
+    Each env's queue and in-flight window are contiguous ranges of send
+    times, so the link serves from a per-env queue head and RTO expiry
+    advances a per-env in-flight head. Per-step work is proportional
+    to the number of live cohorts, not to N * H.
+
+    Semantics follow Environment.step (send, enqueue, link step,
+    receive, get_acks, receive_acks, detect_loss) with one binomial
+    draw per cohort for wireless loss, jitter split and ACK loss. RTT
+    samples acknowledged together are folded into srtt/rttvar in closed
+    form, oldest send slot first.
+
+    The extra Sender metrics are kept per env as well: rttvar (0 before
+    the first sample), in_flight (a running count, so no scan of
+    inflight) and the ack_interarrival EWMA.
+    """
+
+    RTO_MIN = 2
+    RTO_MAX = 50
+
+    def __init__(
+        self,
+        capacity,
+        queue_limit,
+        base_rtt,
+        noise_prob,
+        initial_rate=None,
+        ack_loss_prob=0.01,
+        ack_jitter=0.5,
+        seed=None,
+    ):
+        self.capacity = np.asarray(capacity, dtype=np.int64)
+        self.n_envs = len(self.capacity)
+        n = self.n_envs
+
+        self.queue_limit = self._per_env(queue_limit, np.int64)
+        self.base_rtt = self._per_env(base_rtt, np.float64)
+        self.noise_prob = self._per_env(noise_prob, np.float64)
+        self.ack_loss_prob = self._per_env(ack_loss_prob, np.float64)
+        self.ack_jitter = float(ack_jitter)
+
+        if initial_rate is None:
+            initial_rate = self.capacity
+        self.send_rate = self._per_env(initial_rate, np.int64)
+
+        self.rng = np.random.default_rng(seed)
+
+        # ---- ring sizes ----
+        # a queued packet waits < ceil(queue_limit / capacity) steps and
+        # its ACK is at most ceil(base_rtt + queue delay + jitter) later
+        max_wait = int(np.max(np.ceil(self.queue_limit / self.capacity)))
+        max_offset = int(np.ceil(np.max(self.base_rtt + self.queue_limit / self.capacity) + self.ack_jitter)) + 1
+        self.ack_slots = max_offset + 1
+        max_age = max(max_wait + max_offset, self.RTO_MAX) + 2
+        self.slots = 1 << (max_age - 1).bit_length()
+
+        self.inflight = np.zeros((n, self.slots), dtype=np.int64)
+        self.queue = np.zeros((n, self.slots), dtype=np.int64)
+        self.queued = np.zeros(n, dtype=np.int64)
+        self.queue_head = np.zeros(n, dtype=np.int64)       # oldest queued send time
+        self.inflight_head = np.zeros(n, dtype=np.int64)    # oldest unexpired send time
+        self.outstanding = np.zeros(n, dtype=np.int64)      # inflight row sums
+        self.pending = [[] for _ in range(self.ack_slots)]
+
+        # ---- RTT / RTO estimation (NaN = no sample yet) ----
+        self.srtt = np.full(n, np.nan)
+        self.rttvar = np.full(n, np.nan)
+        self.rto = np.full(n, 10.0)
+
+        # ---- ACK inter-arrival EWMA (Sender.ack_interarrival) ----
+        self.ack_interarrival = np.zeros(n)
+        self.last_ack_time = np.full(n, -1, dtype=np.int64)     # -1 = no ACK yet
+
+        self.time = 0
+
+    def _per_env(self, value, dtype):
+        return np.broadcast_to(np.asarray(value, dtype=dtype), (self.n_envs,)).copy()
+
+    # --------------------------------------------------
+    # Stepping
+    # --------------------------------------------------
+
+    def adjust_rate(self, deltas):
+        """
+        Vectorized Sender.adjust_rate.
+        """
+        self.send_rate = np.maximum(1, self.send_rate + np.asarray(deltas, dtype=np.int64))
+
+    def step(self, actions=None):
+        """
+        Advance all environments by one timestep.
+
+        actions: optional rate deltas chosen from the previous step's
+        metrics, applied before sending (same as calling adjust_rate
+        between steps).
+
+        Returns a dict of per-environment arrays with the same keys as
+        Environment.step.
+        """
+        if actions is not None:
+            self.adjust_rate(actions)
+
+        t = self.time
+        slot = t % self.slots
+        send_rate = self.send_rate.copy()
+
+        # 1-2. Send and enqueue
+        self.inflight[:, slot] = send_rate
+        accepted = np.minimum(send_rate, np.maximum(self.queue_limit - self.queued, 0))
+        congestion_drops = send_rate - accepted
+        self.queue[:, slot] = accepted
+        self.queued += accepted
+
+        # 3. Link: RTT from current backlog, then FIFO service
+        rtt = self.base_rtt + self.queued / self.capacity
+        rows, cols, delivered, wireless_drops = self._serve_queue(t)
+        delivered_total = np.bincount(rows, weights=delivered, minlength=self.n_envs).astype(np.int64)
+
+        # 4. Receiver schedules ACKs
+        self._schedule_acks(t, rows, cols, delivered, rtt)
+
+        # 5-6. ACKs due now reach the sender
+        acked, rtt_sum = self._deliver_acks(t)
+
+        # 7. Loss inference by RTO
+        lost = self._detect_loss(t)
+
+        self.outstanding += send_rate - acked - lost
+        self._update_ack_interarrival(t, acked)
+
+        avg_rtt = np.divide(rtt_sum, acked, out=np.zeros(self.n_envs), where=acked > 0)
+
+        self.time += 1
+
+        return {
+            "throughput": acked,
+            "avg_rtt": avg_rtt,
+            "loss": lost,
+            "send_rate": send_rate,
+            "delivered_packets": delivered_total,
+            "time": t,
+            "congestion_drops": congestion_drops,
+            "wireless_drops": wireless_drops,
+            "inferred_loss": lost,
+            "rttvar": np.nan_to_num(self.rttvar),
+            "in_flight": self.outstanding.copy(),
+            "ack_interarrival": self.ack_interarrival.copy(),
+        }
+
+    # --------------------------------------------------
+    # Stages
+    # --------------------------------------------------
+
+    def _binomial(self, counts, probs):
+        """
+        Binomial(counts[i], probs[i]) for an array of small cohorts.
+
+        Per-element Generator.binomial dominates a step at large N.
+        For small probabilities, success positions over the whole
+        packet stream are drawn with geometric gaps at the largest
+        probability and thinned per cohort; otherwise one uniform is
+        compared per packet. Both are exact.
+        """
+        total = int(counts.sum())
+        p_max = float(probs.max()) if len(probs) else 0.0
+        if total == 0 or p_max <= 0:
+            return np.zeros_like(counts)
+
+        if p_max < 0.2:
+            expected = total * p_max
+            size = int(expected + 6 * np.sqrt(expected) + 16)
+            positions = np.cumsum(self.rng.geometric(p_max, size)) - 1
+            while positions[-1] < total - 1:
+                more = np.cumsum(self.rng.geometric(p_max, size)) + positions[-1]
+                positions = np.concatenate((positions, more))
+            positions = positions[positions < total]
+
+            owner = np.searchsorted(np.cumsum(counts), positions, side="right")
+            keep = self.rng.random(len(owner)) * p_max < probs[owner]
+            return np.bincount(owner[keep], minlength=len(counts))
+
+        if total <= 16 * len(counts):
+            owner = np.repeat(np.arange(len(counts)), counts)
+            hits = self.rng.random(total) < np.repeat(probs, counts)
+            return np.bincount(owner[hits], minlength=len(counts))
+
+        return self.rng.binomial(counts, probs)
+
+    def _serve_queue(self, t):
+        """
+        Serve up to capacity packets per env from the queue head.
+        Returns delivered cohorts as (rows, slots, counts) plus
+        per-env wireless drops.
+        """
+        h = self.slots
+        budget = np.minimum(self.capacity, self.queued)
+        self.queued -= budget
+
+        out_rows, out_cols, out_counts = [], [], []
+        active = np.flatnonzero(budget)
+        while len(active):
+            cols = self.queue_head[active] % h
+            take = np.minimum(self.queue[active, cols], budget[active])
+            self.queue[active, cols] -= take
+            budget[active] -= take
+
+            served = take > 0
+            out_rows.append(active[served])
+            out_cols.append(cols[served])
+            out_counts.append(take[served])
+
+            # move past drained slots; stop once the budget is spent
+            drained = self.queue[active, cols] == 0
+            self.queue_head[active[drained]] += 1
+            active = active[(budget[active] > 0) & (self.queue_head[active] <= t)]
+
+        empty = self.queued == 0
+        self.queue_head[empty] = t + 1
+
+        if not out_rows:
+            none = np.zeros(0, dtype=np.int64)
+            return none, none, none, np.zeros(self.n_envs, dtype=np.int64)
+
+        rows = np.concatenate(out_rows)
+        cols = np.concatenate(out_cols)
+        served = np.concatenate(out_counts)
+
+        drops = self._binomial(served, self.noise_prob[rows])
+        wireless_drops = np.bincount(rows, weights=drops, minlength=self.n_envs).astype(np.int64)
+        return rows, cols, served - drops, wireless_drops
+
+    def _schedule_acks(self, t, rows, cols, counts, rtt):
+        keep = counts > 0
+        rows, cols, counts = rows[keep], cols[keep], counts[keep]
+        if len(rows) == 0:
+            return
+
+        j = self.ack_jitter
+        rtt = rtt[rows]
+        if j <= 0:
+            self._add_pending(t, np.maximum(1, np.round(rtt)), rows, cols, counts)
+            return
+
+        # ack offset = max(1, round(rtt + U(-j, j))): split each cohort
+        # over the integer offsets the jitter can reach
+        lo, hi = rtt - j, rtt + j
+        k_min = np.floor(lo + 0.5)
+        remaining = counts
+        mass = np.ones(len(rows))
+        n_offsets = int(np.ceil(2 * j)) + 1
+
+        for i in range(n_offsets):
+            k = k_min + i
+            width = np.clip(np.minimum(hi, k + 0.5) - np.maximum(lo, k - 0.5), 0.0, None)
+            prob = width / (2 * j)
+
+            if i == n_offsets - 1:
+                part = remaining
+            else:
+                ratio = np.clip(np.divide(prob, mass, out=np.zeros_like(prob), where=mass > 0), 0.0, 1.0)
+                part = self._binomial(remaining, ratio)
+                remaining = remaining - part
+                mass = mass - prob
+
+            self._add_pending(t, np.maximum(1, k), rows, cols, part)
+
+    def _add_pending(self, t, offsets, rows, cols, counts):
+        keep = counts > 0
+        if not keep.any():
+            return
+        ack_slots = (t + offsets[keep].astype(np.int64)) % self.ack_slots
+        if self.ack_slots < 2 ** 15:
+            ack_slots = ack_slots.astype(np.int16)      # radix sort below
+        rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+        # group by ack slot; the stable sort keeps each env's cohorts
+        # in delivery (oldest-first) order
+        order = np.argsort(ack_slots, kind="stable")
+        ack_slots, rows, cols, counts = ack_slots[order], rows[order], cols[order], counts[order]
+        bounds = np.flatnonzero(np.diff(ack_slots)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(ack_slots)]):
+            self.pending[ack_slots[lo]].append((rows[lo:hi], cols[lo:hi], counts[lo:hi]))
+
+    def _deliver_acks(self, t):
+        h = self.slots
+        acked_total = np.zeros(self.n_envs, dtype=np.int64)
+        rtt_sum = np.zeros(self.n_envs)
+
+        due = self.pending[t % self.ack_slots]
+        if not due:
+            return acked_total, rtt_sum
+        self.pending[t % self.ack_slots] = []
+
+        rows = np.concatenate([d[0] for d in due])
+        cols = np.concatenate([d[1] for d in due])
+        counts = np.concatenate([d[2] for d in due])
+        arrived = counts - self._binomial(counts, self.ack_loss_prob[rows])
+
+        # every ACK is for a distinct packet of its send slot, and RTO
+        # expiry clears whole slots: a slot is either still outstanding
+        # (and covers all its ACKs) or already counted lost. (env, slot)
+        # pairs are unique within a chunk but may repeat across chunks.
+        acked = np.empty_like(arrived)
+        start = 0
+        for chunk_rows, chunk_cols, _ in due:
+            end = start + len(chunk_rows)
+            outstanding = self.inflight[chunk_rows, chunk_cols]
+            acked[start:end] = np.where(outstanding > 0, arrived[start:end], 0)
+            self.inflight[chunk_rows, chunk_cols] = outstanding - acked[start:end]
+            start = end
+
+        ages = ((t - cols) % h).astype(np.float64)
+        acked_total += np.bincount(rows, weights=acked, minlength=self.n_envs).astype(np.int64)
+        rtt_sum += np.bincount(rows, weights=acked * ages, minlength=self.n_envs)
+
+        self._fold_rtt_samples(rows, ages, acked)
+        return acked_total, rtt_sum
+
+    def _fold_rtt_samples(self, rows, ages, counts):
+        keep = counts > 0
+        rows, ages, counts = rows[keep], ages[keep], counts[keep]
+        if len(rows) == 0:
+            return
+
+        # chunks are queued in delivery order and FIFO service keeps
+        # each env's slots oldest-first within a chunk, so a stable sort
+        # by env leaves rank r = each env's r-th oldest send slot
+        order = np.argsort(rows, kind="stable")
+        rows, ages, counts = rows[order], ages[order], counts[order]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        rank = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+
+        by_rank = np.argsort(rank.astype(np.int16), kind="stable")
+        bounds = np.searchsorted(rank[by_rank], np.arange(int(rank.max()) + 2))
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            sel = by_rank[lo:hi]
+            self._update_rtt_estimate(rows[sel], ages[sel], counts[sel])
+
+        updated = rows[starts]
+        self.rto[updated] = np.clip(
+            self.srtt[updated] + 4 * self.rttvar[updated],
+            self.RTO_MIN,
+            self.RTO_MAX,
+        )
+
+    def _update_rtt_estimate(self, rows, rtt, count):
+        """
+        Vectorized Sender._update_rtt_estimate: fold count[i] samples
+        of rtt[i] into environment rows[i] (rows must be unique).
+        """
+        alpha = 0.125
+        beta = 0.25
+
+        srtt = self.srtt[rows]
+        rttvar = self.rttvar[rows]
+
+        first = np.isnan(srtt)
+        srtt[first] = rtt[first]
+        rttvar[first] = rtt[first] / 2
+        n = count - first
+
+        a = (1 - alpha) ** n
+        b = (1 - beta) ** n
+        err = np.abs(srtt - rtt)
+
+        self.rttvar[rows] = b * rttvar + beta * err * (a - b) / (beta - alpha)
+        self.srtt[rows] = rtt + a * (srtt - rtt)
+
+    def _update_ack_interarrival(self, t, acked):
+        got = acked > 0
+        seen = got & (self.last_ack_time >= 0)
+        sample = (t - self.last_ack_time[seen]) / acked[seen]
+        self.ack_interarrival[seen] += 0.125 * (sample - self.ack_interarrival[seen])
+        self.last_ack_time[got] = t
+
+    def _detect_loss(self, t):
+        h = self.slots
+        lost = np.zeros(self.n_envs, dtype=np.int64)
+
+        # send times older than the RTO form a prefix of each env's
+        # in-flight window; advance the head over it
+        active = np.flatnonzero(t - self.inflight_head > self.rto)
+        while len(active):
+            cols = self.inflight_head[active] % h
+            lost[active] += self.inflight[active, cols]
+            self.inflight[active, cols] = 0
+            self.inflight_head[active] += 1
+            active = active[t - self.inflight_head[active] > self.rto[active]]
+
+        return lost
@@ -1,12 +1,22 @@
 from sim.sender import Sender
 from sim.link import Link
 from sim.receiver import Receiver
+from sim.profiling import due_count
 
 
 class Environment:
     """
     Coordinates Sender, Link, and Receiver.
     Advances time and exposes step-based interaction.
+
+    All three components must agree on packet vs cohort mode; the
+    metrics returned by step() are the same in both.
+
+    An attached recorder (e.g. metrics.trace.TraceRecorder) gets every
+    step's metrics via recorder.record(metrics).
+
+    With a profiler (sim.profiling.StageProfiler) step() also times
+    each stage into it; results are identical.
     """
 
     def __init__(
@@ -14,27 +24,68 @@ class Environment:
         sender: Sender,
         link: Link,
         receiver: Receiver,
+        recorder=None,
+        profiler=None,
     ):
         self.sender = sender
         self.link = link
         self.receiver = receiver
+        self.recorder = recorder
+        self.profiler = profiler
+
+        self.cohort = sender.cohort
+        if link.cohort != self.cohort or receiver.cohort != self.cohort:
+            raise ValueError(
+                "Sender, Link and Receiver must all use the same cohort mode"
+            )
 
         self.time = 0
 
+    def attach(self, recorder):
+        """
+        Record every subsequent step into `recorder` (None detaches).
+        """
+        self.recorder = recorder
+
     def step(self):
         """
         Advance the simulation by one timestep.
         Returns observable metrics.
         """
+        prof = self.profiler
+        if prof is not None:
+            now = prof.now
+            t0 = now()
 
         # 1. Sender sends packets
         outgoing_packets = self.sender.send(self.time)
+        if prof is not None:
+            prof.add("send", now() - t0)
+            # count now: the link may split cohorts in place
+            if self.cohort:
+                prof.count("packets_created", sum(c.count for c in outgoing_packets))
+            else:
+                prof.count("packets_created", len(outgoing_packets))
+            t0 = now()
 
         # 2. Enqueue packets into the link
         congestion_drops = self.link.enqueue(outgoing_packets)
+        if prof is not None:
+            prof.add("enqueue", now() - t0)
+            prof.high_water(self.link.queued if self.cohort else len(self.link.queue))
+            t0 = now()
 
         # 3. Link processes packets
         delivered_packets, rtt, wireless_drops = self.link.step()
+        if prof is not None:
+            prof.add("link_step", now() - t0)
+        # count before the receiver splits cohorts across ACK times
+        if self.cohort:
+            delivered_count = sum(c.count for c in delivered_packets)
+        else:
+            delivered_count = len(delivered_packets)
+        if prof is not None:
+            t0 = now()
 
         # 4. Receiver schedules ACKs
         self.receiver.receive(
@@ -42,23 +93,40 @@ class Environment:
             current_time=self.time,
             rtt=rtt
         )
+        if prof is not None:
+            prof.add("receive", now() - t0)
+            due = due_count(self.receiver, self.time)
+            t0 = now()
 
         # 5. Receiver delivers ACKs whose time has arrived
         acked_packets = self.receiver.get_acks(self.time)
-        acks_received = len(acked_packets)
+        if prof is not None:
+            prof.add("get_acks", now() - t0)
+        if self.cohort:
+            acks_received = sum(c.count for c in acked_packets)
+        else:
+            acks_received = len(acked_packets)
+        if prof is not None:
+            t0 = now()
 
         # 6. Sender processes ACKs
         self.sender.receive_acks(acked_packets, self.time)
+        if prof is not None:
+            prof.add("receive_acks", now() - t0)
+            t0 = now()
 
         # 7. Sender infers loss
         inferred_loss = self.sender.detect_loss(self.time)
+        if prof is not None:
+            prof.add("detect_loss", now() - t0)
+            t0 = now()
 
         # 8. Collect sender metrics
         metrics = self.sender.get_metrics()
 
         # --- SEMANTIC FIX ---
         metrics["throughput"] = acks_received
-        metrics["delivered_packets"] = len(delivered_packets)  
+        metrics["delivered_packets"] = delivered_count
 
         # Optional extra info (for debugging / analysis)
         metrics.update({
@@ -68,6 +136,16 @@ class Environment:
             "inferred_loss": inferred_loss,
         })
 
+        if prof is not None:
+            prof.add("get_metrics", now() - t0)
+            prof.steps += 1
+            prof.count("acks_scheduled", delivered_count)
+            prof.count("acks_delivered", acks_received)
+            prof.count("acks_dropped", due - acks_received)
+
+        if self.recorder is not None:
+            self.recorder.record(metrics)
+
         # Advance time
         self.time += 1
 
@@ -0,0 +1,199 @@
+import heapq
+
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+
+
+# event kinds; at equal times lower kinds run first (sends open a tick)
+SEND = 0
+DEPART = 1
+ACK = 2
+RTO = 3
+
+# slack added to RTO deadlines so detect_loss's strict `>` fires
+RTO_EPSILON = 1e-9
+
+
+class EventSimulator:
+    """
+    Discrete-event engine over the same Sender, Link and Receiver.
+
+    Time is continuous (float). Events live in one heap, ordered by
+    (time, kind, insertion order):
+
+      SEND    sender.send(t) at every integer t: a burst of send_rate
+              packets, as in Environment.step
+      DEPART  the link finishes transmitting its head packet; the link
+              serves one packet every 1 / capacity time units, so
+              queueing delay is real waiting time
+      ACK     an ACK reaches the sender: departure + base_rtt + jitter,
+              not rounded to a timestep
+      RTO     sender.detect_loss at the oldest send bucket's deadline
+
+    Parameters (capacity, queue_limit, base_rtt, noise_prob, ack loss
+    and jitter) and random streams are taken from link and receiver;
+    loss and jitter draws happen in the order events are processed.
+    RTT samples and the RTO are floats. Packet mode only.
+
+    Work is per event, so idle stretches (e.g. long RTTs at low rates)
+    cost nothing beyond the once-per-tick send event.
+    """
+
+    def __init__(self, sender: Sender, link: Link, receiver: Receiver):
+        if sender.cohort or link.cohort or receiver.cohort:
+            raise ValueError("EventSimulator supports packet mode only")
+
+        self.sender = sender
+        self.link = link
+        self.receiver = receiver
+
+        self.now = 0.0
+        self._events = []
+        self._counter = 0
+        self._busy = False          # link transmitting
+        self._rto_at = None         # earliest pending RTO event
+        self.events_processed = 0
+
+        # counters since the last reset_counters()
+        self.reset_counters()
+
+        self.schedule(0, SEND)
+
+    def reset_counters(self):
+        self.delivered = 0
+        self.acks_received = 0
+        self.congestion_drops = 0
+        self.wireless_drops = 0
+        self.inferred_loss = 0
+
+    def schedule(self, time, kind, payload=None):
+        self._counter += 1
+        heapq.heappush(self._events, (time, kind, self._counter, payload))
+
+    # --------------------------------------------------
+    # Event loop
+    # --------------------------------------------------
+
+    def run_until(self, end_time):
+        """
+        Process every event with time < end_time.
+        """
+        events = self._events
+        while events and events[0][0] < end_time:
+            time, kind, _, payload = heapq.heappop(events)
+            self.now = time
+            self.events_processed += 1
+
+            if kind == SEND:
+                self._on_send(time)
+            elif kind == DEPART:
+                self._on_depart(time)
+            elif kind == ACK:
+                self._on_ack(time, payload)
+            else:
+                self._on_rto(time)
+        self.now = end_time
+
+    # --------------------------------------------------
+    # Handlers
+    # --------------------------------------------------
+
+    def _on_send(self, time):
+        packets = self.sender.send(time)
+        link = self.link
+        queue = link.queue
+        for pkt in packets:
+            if len(queue) < link.queue_limit:
+                queue.append(pkt)
+            else:
+                self.congestion_drops += 1
+
+        if queue and not self._busy:
+            self._busy = True
+            self.schedule(time + 1 / link.capacity, DEPART)
+        if packets:
+            self._arm_rto()
+
+        self.schedule(time + 1, SEND)
+
+    def _on_depart(self, time):
+        link = self.link
+        receiver = self.receiver
+        pkt = link.queue.popleft()
+
+        if link.rng.random() < link.noise_prob:
+            self.wireless_drops += 1
+        else:
+            self.delivered += 1
+            rng = receiver.rng
+            jitter = rng.uniform(-receiver.ack_jitter, receiver.ack_jitter)
+            if rng.random() >= receiver.ack_loss_prob:
+                self.schedule(time + max(link.base_rtt + jitter, RTO_EPSILON), ACK, pkt)
+
+        if link.queue:
+            self.schedule(time + 1 / link.capacity, DEPART)
+        else:
+            self._busy = False
+
+    def _on_ack(self, time, pkt):
+        self.acks_received += 1
+        self.sender.receive_acks((pkt,), time)
+
+    def _on_rto(self, time):
+        if self._rto_at == time:
+            self._rto_at = None
+        self.inferred_loss += self.sender.detect_loss(time)
+        self._arm_rto()
+
+    def _arm_rto(self):
+        """
+        Make sure an RTO event is pending at or before the oldest send
+        bucket's current deadline. Stale (later) RTO events are left in
+        the heap; detect_loss is a no-op for them.
+        """
+        buckets = self.sender.send_buckets
+        if not buckets:
+            return
+        deadline = buckets[0][0] + self.sender.rto + RTO_EPSILON
+        if self._rto_at is None or deadline < self._rto_at:
+            self._rto_at = deadline
+            self.schedule(deadline, RTO)
+
+
+class EventEnvironment:
+    """
+    Per-timestep adapter over EventSimulator.
+
+    step() runs the events of [t, t + 1) and returns the metrics
+    Environment.step would: the sender's metrics for the interval plus
+    delivered_packets, time, congestion_drops, wireless_drops and
+    inferred_loss. Agents drive it exactly like Environment
+    (env.sender.adjust_rate applies from the next tick's send).
+    avg_rtt is the mean of the interval's (unrounded) RTT samples.
+    """
+
+    def __init__(self, sender: Sender, link: Link, receiver: Receiver):
+        self.sender = sender
+        self.link = link
+        self.receiver = receiver
+        self.sim = EventSimulator(sender, link, receiver)
+        self.time = 0
+
+    def step(self):
+        sim = self.sim
+        sim.reset_counters()
+        sim.run_until(self.time + 1)
+
+        metrics = self.sender.get_metrics()
+        metrics["throughput"] = sim.acks_received
+        metrics["delivered_packets"] = sim.delivered
+        metrics.update({
+            "time": self.time,
+            "congestion_drops": sim.congestion_drops,
+            "wireless_drops": sim.wireless_drops,
+            "inferred_loss": sim.inferred_loss,
+        })
+
+        self.time += 1
+        return metrics
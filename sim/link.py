@@ -1,6 +1,11 @@
 import random
 from collections import deque
-from sim.packet import Packet
+from sim.packet import Packet, Cohort, CROSS_SEQ
+from sim.rng import binomial, take_uniforms
+
+
+# every queued cross-traffic packet (packet mode) is this one object
+CROSS_PACKET = Packet(send_time=-1, seq=CROSS_SEQ)
 
 
 class Link:
@@ -10,6 +15,15 @@ class Link:
     - finite queue
     - random wireless loss
     - queue-induced delay (RTT increase)
+
+    In cohort mode the queue holds Cohorts, `queued` counts the
+    packets they represent, and wireless loss is one binomial draw
+    per transmitted cohort.
+
+    Cross traffic added with inject() shares the queue (so it adds
+    queueing delay and takes capacity and queue space) but leaves the
+    link towards its own receivers: it is never delivered, and its
+    wireless losses are not counted in wireless_drops.
     """
 
     def __init__(
@@ -18,19 +32,28 @@ class Link:
         queue_limit: int,
         base_rtt: float,
         noise_prob: float,
+        cohort: bool = False,
+        rng=None,
     ):
         self.capacity = capacity              # packets per timestep
         self.queue_limit = queue_limit        # max packets in queue
         self.base_rtt = base_rtt
         self.noise_prob = noise_prob
+        self.cohort = cohort
+        self.rng = rng if rng is not None else random   # wireless loss draws
 
         self.queue = deque()                  # FIFO queue
+        self.queued = 0                       # packets in queue (cohort mode)
+        self.cross_queued = 0                 # cross-traffic packets in queue
 
     def enqueue(self, packets):
         """
         Add incoming packets to the queue.
         Returns number of packets dropped due to congestion.
         """
+        if self.cohort:
+            return self._enqueue_cohorts(packets)
+
         dropped = 0
         for pkt in packets:
             if len(self.queue) < self.queue_limit:
@@ -39,6 +62,40 @@ class Link:
                 dropped += 1  # congestion loss
         return dropped
 
+    def inject(self, count):
+        """
+        Add `count` cross-traffic packets at the tail of the queue.
+        Returns number of them dropped due to congestion.
+        """
+        if self.cohort:
+            space = self.queue_limit - self.queued
+        else:
+            space = self.queue_limit - len(self.queue)
+        admitted = max(0, min(count, space))
+
+        if admitted:
+            if self.cohort:
+                self.queue.append(Cohort(send_time=-1, seq=CROSS_SEQ, count=admitted))
+                self.queued += admitted
+            else:
+                self.queue.extend([CROSS_PACKET] * admitted)
+            self.cross_queued += admitted
+        return count - admitted
+
+    def _enqueue_cohorts(self, cohorts):
+        dropped = 0
+        for cohort in cohorts:
+            space = self.queue_limit - self.queued
+            if space <= 0:
+                dropped += cohort.count
+                continue
+            if cohort.count > space:
+                dropped += cohort.count - space
+                cohort = cohort.split(space)
+            self.queue.append(cohort)
+            self.queued += cohort.count
+        return dropped
+
     def step(self):
         """
         Process one timestep.
@@ -47,6 +104,11 @@ class Link:
           current_rtt: float
           wireless_drops: int
         """
+        if self.cohort:
+            return self._step_cohorts()
+        if self.cross_queued:
+            return self._step_with_cross()
+
         delivered = []
         wireless_drops = 0
 
@@ -55,14 +117,68 @@ class Link:
         current_rtt = self.base_rtt + queue_delay
 
         # Transmit up to capacity packets
-        for _ in range(min(self.capacity, len(self.queue))):
+        n = min(self.capacity, len(self.queue))
+        for u in take_uniforms(self.rng, n):
             pkt = self.queue.popleft()
 
             # Wireless loss
-            if random.random() < self.noise_prob:
+            if u < self.noise_prob:
+                wireless_drops += 1
+                continue
+
+            delivered.append(pkt)
+
+        return delivered, current_rtt, wireless_drops
+
+    def _step_with_cross(self):
+        delivered = []
+        wireless_drops = 0
+
+        queue_delay = len(self.queue) / self.capacity
+        current_rtt = self.base_rtt + queue_delay
+
+        n = min(self.capacity, len(self.queue))
+        for u in take_uniforms(self.rng, n):
+            pkt = self.queue.popleft()
+
+            if pkt.seq == CROSS_SEQ:
+                self.cross_queued -= 1
+                continue
+
+            if u < self.noise_prob:
                 wireless_drops += 1
                 continue
 
             delivered.append(pkt)
 
-        return delivered, current_rtt, wireless_drops
\ No newline at end of file
+        return delivered, current_rtt, wireless_drops
+
+    def _step_cohorts(self):
+        delivered = []
+        wireless_drops = 0
+
+        queue_delay = self.queued / self.capacity
+        current_rtt = self.base_rtt + queue_delay
+
+        budget = min(self.capacity, self.queued)
+        self.queued -= budget
+        while budget > 0:
+            head = self.queue[0]
+            if head.count <= budget:
+                cohort = self.queue.popleft()
+            else:
+                cohort = head.split(budget)
+            budget -= cohort.count
+
+            if cohort.seq == CROSS_SEQ:
+                self.cross_queued -= cohort.count
+                continue
+
+            drops = binomial(self.rng, cohort.count, self.noise_prob)
+            if drops:
+                wireless_drops += drops
+                cohort.count -= drops
+            if cohort.count:
+                delivered.append(cohort)
+
+        return delivered, current_rtt, wireless_drops
@@ -0,0 +1,146 @@
+from itertools import chain, islice
+
+from sim.sender import Sender
+from sim.link import Link
+from sim.receiver import Receiver
+
+
+# Flow i numbers its packets from i << FLOW_SHIFT, so the flow of any
+# packet (or cohort) is seq >> FLOW_SHIFT: ACK demultiplexing and
+# per-flow queue accounting are one shift per packet, with no lookup.
+FLOW_SHIFT = 40
+
+
+class MultiFlowEnvironment:
+    """
+    N Senders sharing one Link and one Receiver (the return path).
+
+    Each step every sender sends, the link serves the shared FIFO
+    queue, and ACKs are demultiplexed back to their flow. Flows enqueue
+    in a rotating order (flow t % N first at step t), so no flow is
+    systematically at the tail when the queue overflows.
+
+    step() returns one metrics dict per flow, with the keys
+    Environment.step returns plus `queued` (the flow's packets in the
+    link queue after this step). Senders must be fresh; they are given
+    their flow's sequence space here.
+    """
+
+    def __init__(self, senders, link: Link, receiver: Receiver):
+        self.senders = list(senders)
+        self.link = link
+        self.receiver = receiver
+        self.n_flows = len(self.senders)
+
+        self.cohort = link.cohort
+        if receiver.cohort != self.cohort or any(s.cohort != self.cohort for s in self.senders):
+            raise ValueError(
+                "Senders, Link and Receiver must all use the same cohort mode"
+            )
+
+        for flow, sender in enumerate(self.senders):
+            if sender.next_seq or sender.in_flight:
+                raise ValueError("MultiFlowEnvironment needs senders that have not sent yet")
+            sender.next_seq = flow << FLOW_SHIFT
+
+        self.queued = [0] * self.n_flows      # per-flow packets in the link queue
+        self.time = 0
+
+    def _departures(self):
+        """
+        Per-flow packets the link will take off the queue head this
+        step (delivered or lost to noise), read before link.step().
+        """
+        n = self.n_flows
+        dep = [0] * n
+        link = self.link
+        queue = link.queue
+
+        if self.cohort:
+            budget = min(link.capacity, link.queued)
+            for cohort in queue:
+                if budget <= 0:
+                    break
+                taken = min(cohort.count, budget)
+                budget -= taken
+                flow = cohort.seq >> FLOW_SHIFT
+                if flow >= 0:                   # not cross traffic
+                    dep[flow] += taken
+        else:
+            for pkt in islice(queue, min(link.capacity, len(queue))):
+                flow = pkt.seq >> FLOW_SHIFT
+                if flow >= 0:
+                    dep[flow] += 1
+        return dep
+
+    def step(self):
+        t = self.time
+        n = self.n_flows
+        senders = self.senders
+        link = self.link
+        cohort = self.cohort
+
+        # 1-2. Senders send, enqueue in rotating order
+        congestion_drops = [0] * n
+        start = t % n
+        for flow in chain(range(start, n), range(start)):
+            packets = senders[flow].send(t)
+            if packets:
+                sent = sum(c.count for c in packets) if cohort else len(packets)
+                dropped = link.enqueue(packets)
+                congestion_drops[flow] = dropped
+                self.queued[flow] += sent - dropped
+
+        # 3. Link serves the shared queue
+        departures = self._departures()
+        delivered, rtt, _ = link.step()
+
+        delivered_count = [0] * n
+        if cohort:
+            for c in delivered:
+                delivered_count[c.seq >> FLOW_SHIFT] += c.count
+        else:
+            for pkt in delivered:
+                delivered_count[pkt.seq >> FLOW_SHIFT] += 1
+
+        # 4-5. Shared return path
+        self.receiver.receive(delivered, current_time=t, rtt=rtt)
+        acked = self.receiver.get_acks(t)
+
+        per_flow_acks = [[] for _ in range(n)]
+        for pkt in acked:
+            per_flow_acks[pkt.seq >> FLOW_SHIFT].append(pkt)
+
+        # 6-8. Per-flow ACK processing, loss inference, metrics
+        results = []
+        for flow, sender in enumerate(senders):
+            acks = per_flow_acks[flow]
+            sender.receive_acks(acks, t)
+            inferred_loss = sender.detect_loss(t)
+            self.queued[flow] -= departures[flow]
+
+            metrics = sender.get_metrics()
+            metrics["throughput"] = sum(c.count for c in acks) if cohort else len(acks)
+            metrics["delivered_packets"] = delivered_count[flow]
+            metrics.update({
+                "time": t,
+                "congestion_drops": congestion_drops[flow],
+                "wireless_drops": departures[flow] - delivered_count[flow],
+                "inferred_loss": inferred_loss,
+                "queued": self.queued[flow],
+            })
+            results.append(metrics)
+
+        self.time += 1
+        return results
+
+
+def make_multiflow(n_flows, capacity, queue_limit, base_rtt, noise_prob,
+                   initial_rate=1, cohort=False, rng=None, **receiver_args):
+    """
+    MultiFlowEnvironment of n_flows fresh senders on one new link.
+    """
+    senders = [Sender(initial_rate, cohort=cohort) for _ in range(n_flows)]
+    link = Link(capacity, queue_limit, base_rtt, noise_prob, cohort=cohort, rng=rng)
+    receiver = Receiver(cohort=cohort, rng=rng, **receiver_args)
+    return MultiFlowEnvironment(senders, link, receiver)
@@ -1,10 +1,46 @@
+# seq of packets that belong to no simulated sender (cross traffic)
+CROSS_SEQ = -1
+
+
 class Packet:
     """
     Minimal packet abstraction for the simulator.
 
-    A packet only knows when it was sent.
+    A packet only knows when it was sent and its sequence number.
     RTT is inferred when an ACK is received.
+
+    Slotted: a long run holds many of these at once (in flight, queued
+    and awaiting ACK), and a per-instance __dict__ would dominate their
+    size.
     """
 
-    def __init__(self, send_time: int):
+    __slots__ = ("send_time", "seq")
+
+    def __init__(self, send_time: int, seq: int):
         self.send_time = send_time
+        self.seq = seq              # monotonically increasing per sender
+
+
+class Cohort:
+    """
+    A group of packets sent in the same timestep, travelling together.
+
+    Used by the cohort (fluid) mode of Sender/Link/Receiver in place of
+    one Packet per unit of send_rate. Every piece split off a cohort
+    keeps its send_time and seq, so the sender can match ACKs back to
+    the original send.
+    """
+
+    __slots__ = ("send_time", "seq", "count")
+
+    def __init__(self, send_time: int, seq: int, count: int):
+        self.send_time = send_time
+        self.seq = seq              # one seq per cohort, per sender
+        self.count = count          # packets represented
+
+    def split(self, count: int):
+        """
+        Detach the first `count` packets as a new cohort.
+        """
+        self.count -= count
+        return Cohort(self.send_time, self.seq, count)
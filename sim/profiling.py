@@ -0,0 +1,149 @@
+import time
+
+
+# Environment.step stages, in execution order
+STAGES = (
+    "send",
+    "enqueue",
+    "link_step",
+    "receive",
+    "get_acks",
+    "receive_acks",
+    "detect_loss",
+    "get_metrics",
+)
+
+# wall-time histogram bins: bin b holds samples in [2**(b-1), 2**b) ns
+N_BINS = 40
+
+
+def due_count(receiver, current_time):
+    """
+    Packets whose ACKs get_acks(current_time) will pop, before ACK loss.
+    """
+    if current_time < receiver.next_due:
+        return 0
+    wheel = receiver.pending_acks
+    total = 0
+    for t in range(receiver.next_due, current_time + 1):
+        bucket = wheel.get(t)
+        if not bucket:
+            continue
+        if not receiver.cohort:
+            total += len(bucket)
+        elif receiver.preserve_order:
+            total += sum(c.count for _, c in bucket)
+        else:
+            total += sum(c.count for c in bucket)
+    return total
+
+
+class StageProfiler:
+    """
+    Per-stage wall time and counters for Environment.step.
+
+    Pass one to Environment(profiler=...) (or set env.profiler); step()
+    then times each stage. With no profiler the cost is a None check
+    per stage.
+
+    Per stage: call count, total and max ns, and a log2 histogram of
+    per-call wall time. Counters, summed over all profiled steps:
+      packets_created   packets the sender emitted
+      acks_scheduled    delivered packets handed to the receiver
+      acks_delivered    ACKs that reached the sender
+      acks_dropped      ACKs lost on the way back
+      queue_high_water  largest link queue seen after enqueue
+    One profiler may be shared by several environments.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.steps = 0
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.total_ns = dict.fromkeys(STAGES, 0)
+        self.max_ns = dict.fromkeys(STAGES, 0)
+        self.histograms = {stage: [0] * N_BINS for stage in STAGES}
+        self.counters = {
+            "packets_created": 0,
+            "acks_scheduled": 0,
+            "acks_delivered": 0,
+            "acks_dropped": 0,
+            "queue_high_water": 0,
+        }
+
+    now = staticmethod(time.perf_counter_ns)
+
+    def add(self, stage, ns):
+        self.calls[stage] += 1
+        self.total_ns[stage] += ns
+        if ns > self.max_ns[stage]:
+            self.max_ns[stage] = ns
+        self.histograms[stage][min(ns.bit_length(), N_BINS - 1)] += 1
+
+    def count(self, name, n):
+        self.counters[name] += n
+
+    def high_water(self, queued):
+        if queued > self.counters["queue_high_water"]:
+            self.counters["queue_high_water"] = queued
+
+    # --------------------------------------------------
+    # Reporting
+    # --------------------------------------------------
+
+    def percentile(self, stage, q):
+        """
+        Upper bound (ns) of the histogram bin holding the q-quantile,
+        q in [0, 1]; 0 if the stage never ran.
+        """
+        hist = self.histograms[stage]
+        n = sum(hist)
+        if n == 0:
+            return 0
+        rank = q * n
+        seen = 0
+        for b, c in enumerate(hist):
+            seen += c
+            if seen >= rank and c:
+                return 1 << b
+        return 1 << (N_BINS - 1)
+
+    def stats(self):
+        """
+        {stage: {calls, total_ns, mean_ns, max_ns, p50_ns, p99_ns, share}}
+        where share is the stage's fraction of all profiled time.
+        """
+        grand = sum(self.total_ns.values()) or 1
+        out = {}
+        for stage in STAGES:
+            calls = self.calls[stage]
+            total = self.total_ns[stage]
+            out[stage] = {
+                "calls": calls,
+                "total_ns": total,
+                "mean_ns": total / calls if calls else 0.0,
+                "max_ns": self.max_ns[stage],
+                "p50_ns": self.percentile(stage, 0.5),
+                "p99_ns": self.percentile(stage, 0.99),
+                "share": total / grand,
+            }
+        return out
+
+    def summary(self):
+        """
+        Text table of stats() followed by the counters.
+        """
+        lines = [
+            f"{'Stage':<13} | {'Calls':>8} | {'Mean ns':>10} | {'p50 ns':>10} | {'p99 ns':>10} | {'Max ns':>11} | {'Share':>6}",
+            "-" * 90,
+        ]
+        for stage, s in self.stats().items():
+            lines.append(
+                f"{stage:<13} | {s['calls']:>8} | {s['mean_ns']:>10,.0f} | "
+                f"{s['p50_ns']:>10,} | {s['p99_ns']:>10,} | {s['max_ns']:>11,} | {s['share']:>6.1%}"
+            )
+        lines.append("")
+        lines.append(f"{self.steps} steps; " + ", ".join(f"{k}={v}" for k, v in self.counters.items()))
+        return "\n".join(lines)
@@ -1,41 +1,165 @@
+import heapq
+import math
 import random
+from sim.rng import binomial, take_uniforms
 
 class Receiver:
     """
     Receiver generates ACKs for delivered packets.
     ACKs are delayed by RTT before reaching the sender.
     ACKs themselves may be lost or jittered (wireless realism).
+
+    Pending ACKs live in a timing wheel keyed by integer ack_time,
+    so get_acks only touches the buckets that are due.
+
+    In cohort mode a delivered Cohort is split across the ack_times its
+    jitter can reach and ACK loss is one binomial draw per cohort.
     """
 
-    def __init__(self, ack_loss_prob=0.01, ack_jitter=0.5):
-        self.pending_acks = []  # list of (ack_time, packet)
+    def __init__(self, ack_loss_prob=0.01, ack_jitter=0.5, preserve_order=False, cohort=False, rng=None):
+        self.pending_acks = {}  # ack_time -> list of packets (or cohorts)
         self.ack_loss_prob = ack_loss_prob
         self.ack_jitter = ack_jitter
+        self.rng = rng if rng is not None else random   # jitter / ACK loss draws
+
+        # When several buckets fall due in one call, deliver ACKs in the
+        # order their packets were received instead of ack_time order.
+        # Costs one tuple per ACK; with get_acks called every timestep
+        # only one bucket is ever due and both orders coincide.
+        self.preserve_order = preserve_order
+        self._order = 0
+        self.cohort = cohort
+
+        # Earliest ack_time that may still be pending
+        self.next_due = 0
 
     def receive(self, packets, current_time, rtt):
         """
         Called when packets arrive from the link.
         """
-        for pkt in packets:
-            jitter = random.uniform(-self.ack_jitter, self.ack_jitter)
+        if self.cohort:
+            self._receive_cohorts(packets, current_time, rtt)
+            return
+
+        wheel = self.pending_acks
+        lo, hi = -self.ack_jitter, self.ack_jitter
+        # same arithmetic as random.uniform(lo, hi)
+        for pkt, u in zip(packets, take_uniforms(self.rng, len(packets))):
+            jitter = lo + (hi - lo) * u
             ack_time = current_time + max(1, int(round(rtt + jitter)))
-            self.pending_acks.append((ack_time, pkt))
+
+            if self.preserve_order:
+                pkt = (self._order, pkt)
+                self._order += 1
+
+            bucket = wheel.get(ack_time)
+            if bucket is None:
+                wheel[ack_time] = [pkt]
+            else:
+                bucket.append(pkt)
+
+        # every ACK scheduled here is due at current_time + 1 or later
+        self.next_due = min(self.next_due, current_time + 1)
+
+    def _receive_cohorts(self, cohorts, current_time, rtt):
+        if not cohorts:
+            return
+        offsets = self._ack_offset_probs(rtt)
+
+        for cohort in cohorts:
+            remaining = cohort.count
+            mass = 1.0
+            for i, (offset, prob) in enumerate(offsets):
+                if i == len(offsets) - 1:
+                    n = remaining
+                else:
+                    n = binomial(self.rng, remaining, min(1.0, prob / mass))
+                    mass -= prob
+                if not n:
+                    continue
+                remaining -= n
+                piece = cohort if n == cohort.count else cohort.split(n)
+                self._schedule(current_time + offset, piece)
+
+        self.next_due = min(self.next_due, current_time + 1)
+
+    def _ack_offset_probs(self, rtt):
+        """
+        Distribution of max(1, round(rtt + U(-jitter, jitter))),
+        as a list of (offset, probability).
+        """
+        j = self.ack_jitter
+        if j <= 0:
+            return [(max(1, int(round(rtt))), 1.0)]
+
+        lo, hi = rtt - j, rtt + j
+        probs = {}
+        for k in range(math.floor(lo + 0.5), math.floor(hi + 0.5) + 1):
+            width = min(hi, k + 0.5) - max(lo, k - 0.5)
+            if width > 0:
+                offset = max(1, k)
+                probs[offset] = probs.get(offset, 0.0) + width / (2 * j)
+        return list(probs.items())
+
+    def _schedule(self, ack_time, item):
+        if self.preserve_order:
+            item = (self._order, item)
+            self._order += 1
+
+        bucket = self.pending_acks.get(ack_time)
+        if bucket is None:
+            self.pending_acks[ack_time] = [item]
+        else:
+            bucket.append(item)
 
     def get_acks(self, current_time):
         """
         Return ACKed packets whose ACK time has arrived.
         Some ACKs may be lost due to wireless noise.
         """
+        wheel = self.pending_acks
+        start = self.next_due
+        if current_time < start:
+            return []
+        self.next_due = current_time + 1
+
+        if not wheel:
+            return []
+
+        if current_time - start < len(wheel):
+            due = [wheel.pop(t) for t in range(start, current_time + 1) if t in wheel]
+        else:
+            due_times = sorted(t for t in wheel if t <= current_time)
+            due = [wheel.pop(t) for t in due_times]
+
+        if not due:
+            return []
+        if len(due) == 1:
+            entries = due[0]
+        elif self.preserve_order:
+            entries = list(heapq.merge(*due))
+        else:
+            entries = [pkt for bucket in due for pkt in bucket]
+
+        if self.preserve_order:
+            entries = [pkt for _, pkt in entries]
+
+        if self.cohort:
+            return self._filter_cohort_acks(entries)
+
         arrived = []
-        remaining = []
+        for pkt, u in zip(entries, take_uniforms(self.rng, len(entries))):
+            if u >= self.ack_loss_prob:
+                arrived.append(pkt)
+            # else: ACK lost
 
-        for ack_time, pkt in self.pending_acks:
-            if ack_time <= current_time:
-                if random.random() >= self.ack_loss_prob:
-                    arrived.append(pkt)
-                # else: ACK lost
-            else:
-                remaining.append((ack_time, pkt))
+        return arrived
 
-        self.pending_acks = remaining
+    def _filter_cohort_acks(self, cohorts):
+        arrived = []
+        for cohort in cohorts:
+            lost = binomial(self.rng, cohort.count, self.ack_loss_prob)
+            if lost < cohort.count:
+                cohort.count -= lost
+                arrived.append(cohort)
         return arrived
@@ -0,0 +1,165 @@
+import json
+import os
+
+import numpy as np
+
+from sim.environment import Environment
+from sim.link import Link
+from sim.receiver import Receiver
+from sim.rng import ArrayStream
+
+
+CONDITIONS_FILE = "conditions.json"
+TRACE_META_FILE = "trace.json"      # written by metrics.trace.TraceRecorder
+
+# uniforms provisioned per unit of capacity per step by generate_conditions:
+# a wireless-loss draw, an ACK jitter draw and an ACK loss draw per
+# delivered packet, plus slack for bursts of ACKs falling due together
+UNIFORMS_PER_PACKET = 4
+
+
+def _load_column(path, name):
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+
+class TraceReplay:
+    """
+    Open-loop replay of a recorded metrics trace.
+
+    Reads a TraceRecorder directory written with format="npy"; every
+    column is a read-only memory map, so a trace of any length costs
+    only the pages actually touched, and workers replaying the same
+    file share them through the OS page cache.
+
+    step() returns the recorded metrics of the next step, with the keys
+    Environment.step uses for them. Actions do not feed back: this
+    evaluates what a policy would have decided on the recorded
+    observations (recorded_action() gives what was actually done).
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, TRACE_META_FILE)) as f:
+            meta = json.load(f)
+        if meta["format"] != "npy":
+            raise ValueError(
+                f"replay needs a trace recorded with format='npy', got {meta['format']!r}"
+            )
+
+        self.length = meta["rows"]
+        self.columns = {name: _load_column(path, name) for name in meta["columns"]}
+        self._metric_columns = [
+            (name, col) for name, col in self.columns.items() if name != "action"
+        ]
+        self.time = 0
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def done(self):
+        return self.time >= self.length
+
+    def step(self):
+        t = self.time
+        if t >= self.length:
+            raise IndexError("trace exhausted")
+        metrics = {name: col[t].item() for name, col in self._metric_columns}
+        self.time = t + 1
+        return metrics
+
+    def recorded_action(self):
+        """
+        Action recorded for the step last returned by step().
+        """
+        return self.columns["action"][self.time - 1].item()
+
+
+def write_conditions(
+    path,
+    capacity,
+    uniforms,
+    queue_limit,
+    base_rtt,
+    noise_prob,
+    ack_loss_prob=0.01,
+    ack_jitter=0.5,
+):
+    """
+    Store link conditions for ConditionsReplay:
+      capacity: per-step link capacity (int array, one entry per step)
+      uniforms: the uniform draws consumed, in order, by the link's
+                wireless loss and the receiver's ACK jitter / ACK loss
+    plus the fixed link and receiver parameters.
+    """
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "capacity.npy"), np.asarray(capacity, dtype=np.int64))
+    np.save(os.path.join(path, "uniforms.npy"), np.asarray(uniforms, dtype=np.float64))
+    with open(os.path.join(path, CONDITIONS_FILE), "w") as f:
+        json.dump(
+            {
+                "steps": len(capacity),
+                "queue_limit": queue_limit,
+                "base_rtt": base_rtt,
+                "noise_prob": noise_prob,
+                "ack_loss_prob": ack_loss_prob,
+                "ack_jitter": ack_jitter,
+            },
+            f,
+            indent=2,
+        )
+
+
+def generate_conditions(path, capacity, queue_limit, base_rtt, noise_prob, seed=None, **receiver_args):
+    """
+    write_conditions with uniforms drawn from a seeded NumPy Generator,
+    UNIFORMS_PER_PACKET per unit of capacity per step.
+    """
+    capacity = np.asarray(capacity, dtype=np.int64)
+    n = int(capacity.sum()) * UNIFORMS_PER_PACKET
+    uniforms = np.random.default_rng(seed).random(n)
+    write_conditions(path, capacity, uniforms, queue_limit, base_rtt, noise_prob, **receiver_args)
+
+
+class ConditionsReplay(Environment):
+    """
+    Closed-loop Environment over recorded link conditions.
+
+    The Link and Receiver are built from the conditions directory and
+    draw all their randomness from its memory-mapped uniforms (through
+    sim.rng.ArrayStream); the link capacity is set from the per-step
+    capacity column. The sender and its controller are live, so any
+    agent can be evaluated on exactly the same conditions, and two
+    runs of the same agent are identical.
+
+    Packet mode only. Raises IndexError when the steps or the uniforms
+    run out.
+    """
+
+    def __init__(self, path, sender, recorder=None, block_size=4096):
+        with open(os.path.join(path, CONDITIONS_FILE)) as f:
+            cond = json.load(f)
+
+        self.capacity = _load_column(path, "capacity")
+        self.uniforms = _load_column(path, "uniforms")
+        self.steps = cond["steps"]
+
+        rng = ArrayStream(self.uniforms, block_size=block_size)
+        link = Link(
+            capacity=int(self.capacity[0]),
+            queue_limit=cond["queue_limit"],
+            base_rtt=cond["base_rtt"],
+            noise_prob=cond["noise_prob"],
+            rng=rng,
+        )
+        receiver = Receiver(
+            ack_loss_prob=cond["ack_loss_prob"],
+            ack_jitter=cond["ack_jitter"],
+            rng=rng,
+        )
+        super().__init__(sender, link, receiver, recorder)
+
+    def step(self):
+        if self.time >= self.steps:
+            raise IndexError("conditions exhausted")
+        self.link.capacity = int(self.capacity[self.time])
+        return super().step()
@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+
+
+def binomial(rng, n, p):
+    """
+    Draw Binomial(n, p) using `rng`, a `random`-compatible source.
+
+    Uses the source's own sampler when it has one; otherwise counts
+    geometric gaps between successes, which costs O(n * min(p, 1 - p))
+    uniform draws rather than n.
+    """
+    if n <= 0 or p <= 0:
+        return 0
+    if p >= 1:
+        return n
+
+    sampler = getattr(rng, "binomialvariate", None)
+    if sampler is not None:
+        return sampler(n, p)
+
+    if p > 0.5:
+        return n - binomial(rng, n, 1 - p)
+
+    log_q = math.log1p(-p)
+    successes = 0
+    trial = 0
+    while True:
+        # trials up to and including the next success ~ Geometric(p)
+        trial += int(math.log(1.0 - rng.random()) / log_q) + 1
+        if trial > n:
+            return successes
+        successes += 1
+
+
+class UniformStream:
+    """
+    `random`-compatible source that replays a fixed sequence of uniforms.
+
+    choice() consumes one uniform u and returns seq[int(u * len(seq))],
+    the rule the vectorized agents use, so a scalar agent fed column i
+    of a batch's uniforms makes the same draws as batch row i.
+    """
+
+    def __init__(self, uniforms):
+        self.uniforms = list(uniforms)
+        self.pos = 0
+
+    def random(self):
+        u = self.uniforms[self.pos]
+        self.pos += 1
+        return u
+
+    def take(self, k):
+        """
+        The next k uniforms as a list, in the order random() would
+        return them.
+        """
+        start = self.pos
+        self.pos += k
+        return self.uniforms[start:self.pos]
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def randint(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+
+class _BlockStream(UniformStream):
+    """
+    UniformStream whose list is refilled block_size uniforms at a time
+    from draw(k) (an array of up to k uniforms), so random()/take()
+    stay list reads.
+    """
+
+    def __init__(self, draw, block_size=4096):
+        self.draw = draw
+        self.block_size = block_size
+        super().__init__(())
+
+    def _refill(self, need):
+        rest = self.uniforms[self.pos:]
+        self.uniforms = rest + self.draw(max(self.block_size, need - len(rest))).tolist()
+        self.pos = 0
+
+    def random(self):
+        if self.pos == len(self.uniforms):
+            self._refill(1)
+            if not self.uniforms:
+                raise IndexError("uniform stream exhausted")
+        u = self.uniforms[self.pos]
+        self.pos += 1
+        return u
+
+    def take(self, k):
+        if self.pos + k > len(self.uniforms):
+            self._refill(k)
+            if k > len(self.uniforms):
+                raise IndexError("uniform stream exhausted")
+        return super().take(k)
+
+
+class BufferedRNG(_BlockStream):
+    """
+    `random`-compatible source backed by a NumPy Generator.
+
+    Uniforms are drawn block_size at a time and handed out from a
+    plain list, so the per-packet draws in Link and Receiver (which go
+    through take()) are list reads rather than Generator calls.
+    Binomials go straight to the Generator.
+    """
+
+    def __init__(self, seed=None, block_size=4096):
+        self.generator = np.random.default_rng(seed)
+        super().__init__(self.generator.random, block_size)
+
+    def binomialvariate(self, n, p):
+        return int(self.generator.binomial(n, p))
+
+
+class ArrayStream(_BlockStream):
+    """
+    `random`-compatible source replaying uniforms stored in an array,
+    typically a read-only memory map of a recorded .npy file.
+
+    Only block_size values are copied out at a time, so the array is
+    never loaded whole; processes replaying the same file share its
+    pages through the OS cache.
+    """
+
+    def __init__(self, array, block_size=4096, start=0):
+        self.array = array
+        self.next = start           # next array index to copy out
+        super().__init__(self._read, block_size)
+
+    def _read(self, k):
+        block = self.array[self.next:self.next + k]
+        self.next += len(block)
+        return block
+
+
+def take_uniforms(rng, k):
+    """
+    k uniforms from `rng` as a list, in the order k rng.random() calls
+    would return them. Sources with a take() method serve them as one
+    block.
+    """
+    take = getattr(rng, "take", None)
+    if take is not None:
+        return take(k)
+    draw = rng.random
+    return [draw() for _ in range(k)]
@@ -0,0 +1,182 @@
+import itertools
+
+import numpy as np
+
+from sim.environment import Environment
+
+
+# --------------------------------------------------
+# Schedule builders
+#
+# Each returns one value per step as a NumPy array; Scenario stores
+# them and the per-step cost is a list read per scheduled field.
+# --------------------------------------------------
+
+def step_schedule(steps, initial, changes=()):
+    """
+    Piecewise-constant schedule: `initial`, then changes as
+    (step, value) pairs (or a {step: value} dict) taking effect at
+    that step and holding until the next change.
+    """
+    if isinstance(changes, dict):
+        changes = changes.items()
+    values = np.full(steps, initial, dtype=np.float64)
+    for t, value in sorted(changes):
+        values[t:] = value
+    return values
+
+
+def _sojourns(steps, leave_prob, next_state, start, rng):
+    """
+    State per step of a discrete-time Markov chain, built one sojourn
+    at a time: in state i the chain stays Geometric(leave_prob[i])
+    steps, then moves to next_state(i).
+    """
+    states = np.empty(steps, dtype=np.int64)
+    t, state = 0, start
+    while True:
+        p = leave_prob[state]
+        stay = rng.geometric(p) if p > 0 else steps
+        states[t:t + stay] = state
+        t += stay
+        if t >= steps:
+            return states
+        state = next_state(state)
+
+
+def markov_modulated(steps, levels, transition, rng=None, start=0):
+    """
+    Markov-modulated schedule: levels[i] while the chain is in state i.
+    transition is the per-step transition matrix (rows sum to 1).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    levels = np.asarray(levels)
+    transition = np.asarray(transition, dtype=np.float64)
+
+    leave = 1.0 - np.diag(transition)
+    jump = transition.copy()
+    np.fill_diagonal(jump, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        jump = jump / jump.sum(axis=1, keepdims=True)
+
+    def next_state(i):
+        return rng.choice(len(levels), p=jump[i])
+
+    return levels[_sojourns(steps, leave, next_state, start, rng)]
+
+
+def gilbert_elliott(steps, p_good_bad, p_bad_good, loss_good, loss_bad, rng=None):
+    """
+    Gilbert-Elliott bursty loss as a per-step noise_prob schedule: a
+    two-state (good/bad) Markov channel, starting good, with loss
+    probability loss_good or loss_bad while in each state.
+    """
+    transition = [[1 - p_good_bad, p_good_bad], [p_bad_good, 1 - p_bad_good]]
+    return markov_modulated(steps, [loss_good, loss_bad], transition, rng)
+
+
+def on_off(steps, rate, mean_on, mean_off, rng=None, poisson=True):
+    """
+    On/off cross traffic, in packets per step: geometric on and off
+    periods with the given means (in steps), starting off. While on,
+    sends Poisson(rate) packets per step (exactly `rate` with
+    poisson=False).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    leave = np.array([1.0 / mean_off, 1.0 / mean_on])
+    on = _sojourns(steps, leave, lambda i: 1 - i, 0, rng).astype(bool)
+
+    if poisson:
+        packets = rng.poisson(rate, steps)
+    else:
+        packets = np.full(steps, int(rate))
+    return np.where(on, packets, 0)
+
+
+# --------------------------------------------------
+# Scenario
+# --------------------------------------------------
+
+def _as_schedule(values, steps, dtype):
+    if np.isscalar(values):
+        values = np.full(steps, values)
+    elif not hasattr(values, "__len__"):        # generator / iterator
+        values = np.fromiter(itertools.islice(values, steps), dtype=np.float64)
+    values = np.asarray(values)
+    if len(values) < steps:
+        raise ValueError(f"schedule has {len(values)} entries, scenario needs {steps}")
+    return values[:steps].astype(dtype).tolist()
+
+
+class Scenario:
+    """
+    Time-varying link conditions, precomputed per step.
+
+    capacity, base_rtt and noise_prob override the Link's attribute of
+    the same name each step; cross_traffic is the number of competing
+    packets injected into the link queue each step (see Link.inject).
+    Each may be None (leave the link as constructed), a scalar, an
+    array, or an iterator/generator yielding at least `steps` values.
+
+    Schedules are converted once to Python lists, so apply() is a few
+    list reads and attribute stores per step.
+    """
+
+    FIELDS = (("capacity", int), ("base_rtt", float), ("noise_prob", float))
+
+    def __init__(self, steps, capacity=None, base_rtt=None, noise_prob=None, cross_traffic=None):
+        self.steps = steps
+        given = {"capacity": capacity, "base_rtt": base_rtt, "noise_prob": noise_prob}
+        self.schedules = {
+            name: _as_schedule(given[name], steps, dtype)
+            for name, dtype in self.FIELDS
+            if given[name] is not None
+        }
+        self._fields = list(self.schedules.items())
+
+        self.cross_traffic = None
+        if cross_traffic is not None:
+            self.cross_traffic = _as_schedule(cross_traffic, steps, int)
+
+    def apply(self, link, t):
+        """
+        Set step t's conditions on link and inject its cross traffic.
+        Returns cross-traffic packets dropped at the queue.
+        """
+        for name, values in self._fields:
+            setattr(link, name, values[t])
+        if self.cross_traffic is not None:
+            count = self.cross_traffic[t]
+            if count:
+                return link.inject(count)
+        return 0
+
+
+class ScenarioEnvironment(Environment):
+    """
+    Environment whose link follows a Scenario.
+
+    step() applies the scenario for the current timestep before the
+    usual send/enqueue/transmit cycle (so cross traffic arriving in a
+    step queues ahead of the sender's packets) and adds to the metrics:
+      capacity: link capacity this step
+      cross_drops: cross-traffic packets dropped at the queue
+    congestion_drops and wireless_drops stay the sender's own.
+
+    Raises IndexError past the end of the scenario.
+    """
+
+    def __init__(self, sender, link, receiver, scenario, recorder=None):
+        super().__init__(sender, link, receiver, recorder)
+        self.scenario = scenario
+
+    def step(self):
+        if self.time >= self.scenario.steps:
+            raise IndexError("scenario exhausted")
+        cross_drops = self.scenario.apply(self.link, self.time)
+        capacity = self.link.capacity
+
+        metrics = super().step()
+        metrics["capacity"] = capacity
+        metrics["cross_drops"] = cross_drops
+        return metrics
@@ -1,28 +1,54 @@
-from sim.packet import Packet
+from collections import deque
+
+from sim.packet import Packet, Cohort
 
 
 class Sender:
     """
     Sender maintains sending rate, tracks packets in flight,
     estimates RTT, and infers loss using an adaptive timeout.
+
+    In cohort mode each timestep's packets are sent as a single
+    Cohort and in_flight maps its seq to the outstanding count.
+
+    Besides the per-timestep counts, get_metrics() reports rttvar, the
+    number of packets in flight and ack_interarrival: an EWMA (gain
+    1/8, as srtt) of the time between ACK arrivals, where a batch of n
+    ACKs arriving `gap` after the previous batch counts as gap / n.
     """
 
-    def __init__(self, initial_rate: int):
+    def __init__(self, initial_rate: int, cohort: bool = False):
         self.send_rate = initial_rate
+        self.cohort = cohort
 
-        # Packets currently in flight
-        self.in_flight = []
+        # Packets currently in flight, keyed by sequence number
+        # (cohort mode: cohort seq -> packets still outstanding)
+        self.in_flight = {}
+        self.next_seq = 0
+
+        # Per-timestep send buckets (send_time, first_seq, end_seq, live),
+        # oldest first. Sequence numbers within a bucket are contiguous.
+        # Packet mode: live holds the bucket's packets still in flight
+        # (seq -> packet; ACKs remove them), so expiry touches only
+        # packets that actually expire. Cohort mode: live is None.
+        self.send_buckets = deque()
+        self.live_at = {}           # send_time -> live (packet mode)
 
         # Per-timestep metrics
         self.acked_packets = 0
         self.lost_packets = 0
-        self.rtt_samples = []
+        self.rtt_sum = 0
+        self.rtt_count = 0
 
         # -------- RTT / RTO estimation (TCP-like) --------
         self.srtt = None
         self.rttvar = None
         self.rto = 10  # conservative initial timeout
 
+        # -------- ACK inter-arrival (EWMA) --------
+        self.ack_interarrival = 0.0
+        self.last_ack_time = None
+
     # --------------------------------------------------
     # Sending
     # --------------------------------------------------
@@ -31,13 +57,33 @@ class Sender:
         """
         Create packets to send this timestep.
         """
+        if self.cohort:
+            return self._send_cohort(current_time)
+
         packets = []
+        live = {}
+        seq = self.next_seq
         for _ in range(self.send_rate):
-            pkt = Packet(send_time=current_time)
+            pkt = Packet(send_time=current_time, seq=seq)
             packets.append(pkt)
-            self.in_flight.append(pkt)
+            live[seq] = pkt
+            seq += 1
+        if live:
+            self.in_flight.update(live)
+            self.send_buckets.append((current_time, self.next_seq, seq, live))
+            self.live_at[current_time] = live
+        self.next_seq = seq
         return packets
 
+    def _send_cohort(self, current_time):
+        if self.send_rate <= 0:
+            return []
+        seq = self.next_seq
+        self.in_flight[seq] = self.send_rate
+        self.send_buckets.append((current_time, seq, seq + 1, None))
+        self.next_seq = seq + 1
+        return [Cohort(send_time=current_time, seq=seq, count=self.send_rate)]
+
     # --------------------------------------------------
     # ACK processing + RTT estimation
     # --------------------------------------------------
@@ -46,13 +92,28 @@ class Sender:
         """
         Process ACKed packets and update RTT estimates.
         """
+        before = self.acked_packets
+        if self.cohort:
+            self._receive_cohort_acks(acked_packets, current_time)
+        else:
+            self._receive_packet_acks(acked_packets, current_time)
+
+        n = self.acked_packets - before
+        if n:
+            if self.last_ack_time is not None:
+                sample = (current_time - self.last_ack_time) / n
+                self.ack_interarrival += 0.125 * (sample - self.ack_interarrival)
+            self.last_ack_time = current_time
+
+    def _receive_packet_acks(self, acked_packets, current_time):
         for pkt in acked_packets:
-            if pkt in self.in_flight:
-                self.in_flight.remove(pkt)
+            if self.in_flight.pop(pkt.seq, None) is not None:
                 self.acked_packets += 1
+                del self.live_at[pkt.send_time][pkt.seq]
 
                 rtt = current_time - pkt.send_time
-                self.rtt_samples.append(rtt)
+                self.rtt_sum += rtt
+                self.rtt_count += 1
 
                 # ----- TCP-style RTT estimation -----
                 if self.srtt is None:
@@ -72,6 +133,51 @@ class Sender:
                 self.rto = self.srtt + 4 * self.rttvar
                 self.rto = min(max(self.rto, 2), 50)
 
+    def _receive_cohort_acks(self, acked_cohorts, current_time):
+        in_flight = self.in_flight
+        for cohort in acked_cohorts:
+            outstanding = in_flight.get(cohort.seq)
+            if outstanding is None:
+                continue
+
+            n = min(cohort.count, outstanding)
+            if n == outstanding:
+                del in_flight[cohort.seq]
+            else:
+                in_flight[cohort.seq] = outstanding - n
+            self.acked_packets += n
+
+            rtt = current_time - cohort.send_time
+            self.rtt_sum += n * rtt
+            self.rtt_count += n
+            self._update_rtt_estimate(rtt, n)
+
+    def _update_rtt_estimate(self, rtt, n):
+        """
+        Apply n identical RTT samples at once.
+
+        Closed form of n rounds of the per-packet update: the srtt error
+        decays as (1 - alpha)^k, so rttvar picks up a geometric sum.
+        """
+        alpha = 0.125
+        beta = 0.25
+
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+            n -= 1
+
+        if n > 0:
+            a = (1 - alpha) ** n
+            b = (1 - beta) ** n
+            err = abs(self.srtt - rtt)
+
+            self.rttvar = b * self.rttvar + beta * err * (a - b) / (beta - alpha)
+            self.srtt = rtt + a * (self.srtt - rtt)
+
+        self.rto = self.srtt + 4 * self.rttvar
+        self.rto = min(max(self.rto, 2), 50)
+
     # --------------------------------------------------
     # Loss detection via adaptive timeout
     # --------------------------------------------------
@@ -80,18 +186,24 @@ class Sender:
         """
         Infer packet loss using adaptive RTO.
         """
-        still_in_flight = []
+        timeout = self.rto
+        in_flight = self.in_flight
+        buckets = self.send_buckets
         lost = 0
 
-        timeout = self.rto
+        # Buckets are in send_time order, so expired packets always
+        # form a prefix: only the expired head buckets are visited.
+        while buckets and current_time - buckets[0][0] > timeout:
+            send_time, first_seq, _, live = buckets.popleft()
+            if live is None:
+                lost += in_flight.pop(first_seq, 0)
+                continue
 
-        for pkt in self.in_flight:
-            if current_time - pkt.send_time > timeout:
-                lost += 1
-            else:
-                still_in_flight.append(pkt)
+            del self.live_at[send_time]
+            for seq in live:
+                del in_flight[seq]
+            lost += len(live)
 
-        self.in_flight = still_in_flight
         self.lost_packets += lost
         return lost
 
@@ -104,21 +216,30 @@ class Sender:
         Return observable metrics for this timestep.
         """
         avg_rtt = (
-            sum(self.rtt_samples) / len(self.rtt_samples)
-            if self.rtt_samples else 0
+            self.rtt_sum / self.rtt_count
+            if self.rtt_count else 0
         )
 
+        if self.cohort:
+            in_flight = sum(self.in_flight.values())
+        else:
+            in_flight = len(self.in_flight)
+
         metrics = {
             "throughput": self.acked_packets,
             "avg_rtt": avg_rtt,
             "loss": self.lost_packets,
             "send_rate": self.send_rate,
+            "rttvar": self.rttvar if self.rttvar is not None else 0.0,
+            "in_flight": in_flight,
+            "ack_interarrival": self.ack_interarrival,
         }
 
         # Reset timestep metrics
         self.acked_packets = 0
         self.lost_packets = 0
-        self.rtt_samples = []
+        self.rtt_sum = 0
+        self.rtt_count = 0
 
         return metrics
 